@@ -0,0 +1,126 @@
+"""Benchmark building the repository summary and its directory/file scopes.
+
+Builds N synthetic FileSummary objects spread over D directories, then
+aggregates them the previous way, copying every record into repo-level
+and per-directory lists, and with the SymbolStore, whose repository and
+directory scopes are views over the files' own lists. Reports aggregation time, the memory held once aggregation is
+done (records included), and the time to iterate every directory scope.
+
+Usage:
+    python benchmarks/bench_aggregation.py [--files N] [--dirs D]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from functools import partial
+
+from cbig.core.models import FileSummary, Dependency, Function, Class, Comment
+from cbig.core.processor import CBIGProcessor
+
+KINDS = ("dependencies", "functions", "classes", "comments")
+
+
+def make_summaries(files: int, dirs: int):
+    """Build file summaries keyed by relative path, as the processor holds them."""
+    summaries = {}
+    for i in range(files):
+        file_path = f"src/pkg{i % dirs}/module_{i}.py"
+        symbol_file = f"/repo/{file_path}"
+        summaries[file_path] = FileSummary(
+            file_path=file_path,
+            language="python",
+            loc=200,
+            dependencies=[
+                Dependency(language="python", name=name, source="pip")
+                for name in ("os", "typing", f"pkg{i % dirs}.util")
+            ],
+            functions=[
+                Function(
+                    language="python", file=symbol_file, name=f"handle_{j}",
+                    signature=f"def handle_{j}(self, request_{i})", line_start=j * 10 + 1,
+                    line_end=j * 10 + 9, docstring=f"Handle request {i}.{j}.",
+                    is_method=True, class_name=f"Service{i}"
+                )
+                for j in range(20)
+            ],
+            classes=[
+                Class(
+                    language="python", file=symbol_file, name=f"Service{i}", kind="class",
+                    line_start=1, line_end=200, inherits="Base", implements=[], doc="A service."
+                )
+            ],
+            comments=[
+                Comment(language="python", file=symbol_file, line_start=j, line_end=j, text=f"# note {i}.{j}")
+                for j in range(5)
+            ],
+        )
+    return summaries
+
+
+def legacy_aggregate(file_summaries):
+    """Repo lists plus per-directory lists, as _build_repo_summary and _build_scopes did."""
+    repo = {kind: [] for kind in KINDS}
+    scopes = {"dir": {}, "file": {}}
+    for summary in file_summaries.values():
+        for kind in KINDS:
+            repo[kind].extend(getattr(summary, kind))
+    for file_path, summary in file_summaries.items():
+        scopes["file"][file_path] = {kind: getattr(summary, kind) for kind in KINDS}
+    for file_path, summary in file_summaries.items():
+        dir_path = CBIGProcessor._scope_dir(file_path)
+        if dir_path not in scopes["dir"]:
+            scopes["dir"][dir_path] = {kind: [] for kind in KINDS}
+        for kind in KINDS:
+            scopes["dir"][dir_path][kind].extend(getattr(summary, kind))
+    return repo, scopes
+
+
+def store_aggregate(processor, file_summaries):
+    """The SymbolStore built by _build_repo_summary, whose scopes are views."""
+    summary = processor._build_repo_summary(file_summaries)
+    return summary, summary.scopes
+
+
+def bench(label: str, aggregate, files: int, dirs: int):
+    # Timed without tracemalloc, which slows allocation down
+    file_summaries = make_summaries(files, dirs)
+    start = time.perf_counter()
+    result, scopes = aggregate(file_summaries)
+    aggregated = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rows = sum(1 for sections in scopes["dir"].values() for kind in KINDS for _ in sections[kind])
+    iterated = time.perf_counter() - start
+    del file_summaries, result, scopes
+
+    gc.collect()
+    tracemalloc.start()
+    file_summaries = make_summaries(files, dirs)
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = aggregate(file_summaries)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(
+        f"{label:>9}: aggregate {aggregated:6.3f}s  held {held / 2**20:7.1f} MB "
+        f"(records alone {before / 2**20:.1f} MB)  iterate dir scopes {iterated:6.3f}s  ({rows:,} rows)"
+    )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=5000)
+    arg_parser.add_argument("--dirs", type=int, default=100)
+    args = arg_parser.parse_args()
+
+    bench("lists", legacy_aggregate, args.files, args.dirs)
+    processor = CBIGProcessor({"path": "."})
+    bench("views", partial(store_aggregate, processor), args.files, args.dirs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark analyzing release archives in place against extracting them first.
+
+Writes a .tar.gz and a .zip of N small Python modules, then analyzes each
+archive twice: extracted to a temporary directory and walked (the previous
+way to analyze an archive), and read in place with --path pointing at the
+archive. Checks that both find the same files, and reports the time of each.
+Extraction cost depends on the disk, so pass --dir to work on the disk the
+artifacts normally live on. With --cache, both ways share a warm cache,
+as when re-analyzing artifacts whose files were mostly seen before, and
+parsing drops out of the comparison.
+
+Usage:
+    python benchmarks/bench_archive_input.py [--files N] [--dir DIR] [--repeat R] [--cache]
+"""
+
+import argparse
+import io
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from cbig.core.processor import CBIGProcessor
+
+MODULE = '''"""Module {i}."""
+
+import os
+from typing import List
+
+
+class Handler{i}:
+    """Handles requests for module {i}."""
+
+    def run(self, items: List[str]) -> int:
+        return len([item for item in items if os.path.exists(item)])
+
+
+def helper_{i}(value: int) -> int:
+    return value * {i}
+'''
+
+
+def write_archives(directory: Path, files: int):
+    """Write release.tar.gz and release.zip holding the same source tree."""
+    members = [
+        (f"release-1.0/src/pkg{i // 100}/module_{i}.py", MODULE.format(i=i).encode("utf-8"))
+        for i in range(files)
+    ]
+    with tarfile.open(directory / "release.tar.gz", "w:gz") as tar:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    with zipfile.ZipFile(directory / "release.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+
+
+def analyze(path: Path, cache_dir) -> int:
+    config = {"path": str(path), "write_md": False, "format": "md", "cache_dir": cache_dir}
+    return CBIGProcessor(config).process().summary["total_files"]
+
+
+def extract_and_analyze(archive_path: Path, directory: Path, cache_dir) -> int:
+    target = Path(tempfile.mkdtemp(prefix="extract-", dir=directory))
+    try:
+        shutil.unpack_archive(archive_path, target)
+        return analyze(target, cache_dir)
+    finally:
+        shutil.rmtree(target, ignore_errors=True)
+
+
+def bench(label: str, run, repeat: int):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:>16}: {best:7.3f}s  ({found:,} files)")
+    return best, found
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=5000)
+    arg_parser.add_argument("--dir", help="Where to write and extract the archives (default: a temporary directory)")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--cache", action="store_true", help="Analyze with a warm cache")
+    args = arg_parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp(prefix="cbig-bench-archive-", dir=args.dir))
+    try:
+        write_archives(directory, args.files)
+        cache_dir = None
+        if args.cache:
+            cache_dir = str(directory / "cache")
+            analyze(directory / "release.zip", cache_dir)
+        for name in ("release.tar.gz", "release.zip"):
+            archive_path = directory / name
+            before, extracted = bench(
+                f"{name} extract", lambda: extract_and_analyze(archive_path, directory, cache_dir), args.repeat
+            )
+            after, streamed = bench(f"{name} in place", lambda: analyze(archive_path, cache_dir), args.repeat)
+            if extracted != streamed:
+                raise SystemExit(f"{name}: extracting found {extracted} files, reading in place {streamed}")
+            print(f"Speedup: {before / after:.1f}x")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
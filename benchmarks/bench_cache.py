@@ -0,0 +1,128 @@
+"""Benchmark warm cache loads for the packed and pickle record stores.
+
+Writes N synthetic FileSummary records into a fresh cache directory with
+each store, then reopens the cache and times loading every record back.
+Reported separately: opening the index, reading raw records, and
+materializing FileSummary objects.
+
+Usage:
+    python benchmarks/bench_cache.py [--entries N] [--dir DIR]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import msgpack
+
+from cbig.cache.index import CacheIndex
+from cbig.cache.stores import PickleStore, SegmentStore
+from cbig.core.models import FileSummary, Dependency, Function, Class
+
+
+def make_summary(i: int) -> FileSummary:
+    """Build a small but realistic FileSummary."""
+    file_path = f"pkg{i % 100}/module_{i}.py"
+    return FileSummary(
+        file_path=file_path,
+        language="python",
+        loc=120,
+        dependencies=[
+            Dependency(language="python", name="os", source="pip"),
+            Dependency(language="python", name=f"pkg{i % 100}.util", source="pip"),
+        ],
+        functions=[
+            Function(
+                language="python", file=file_path, name=f"func_{j}",
+                signature=f"def func_{j}(self, value)", line_start=j * 10 + 1,
+                line_end=j * 10 + 9, docstring="Do the thing.",
+                is_method=True, class_name=f"Class{i}"
+            )
+            for j in range(3)
+        ],
+        classes=[
+            Class(
+                language="python", file=file_path, name=f"Class{i}",
+                kind="class", inherits="Base", line_start=1,
+                line_end=40, doc="A class."
+            )
+        ],
+    )
+
+
+def keys(count: int):
+    return [f"{i:064x}" for i in range(count)]
+
+
+def bench_segments(cache_dir: Path, summaries):
+    index = CacheIndex(cache_dir / "index.db")
+    store = SegmentStore(cache_dir, index)
+    for key, summary in zip(keys(len(summaries)), summaries):
+        store.write(key, summary)
+    store.close()
+    index.close()
+
+    start = time.perf_counter()
+    index = CacheIndex(cache_dir / "index.db")
+    store = SegmentStore(cache_dir, index)
+    locations = index.blobs()
+    opened = time.perf_counter()
+
+    raw = 0
+    for key in keys(len(summaries)):
+        segment, offset, length = locations[key]
+        with store._lock:
+            mapped = store._map_locked(segment, offset + length)
+            msgpack.unpackb(mapped[offset:offset + length])
+        raw += 1
+    raw_done = time.perf_counter()
+
+    for key, summary in zip(keys(len(summaries)), summaries):
+        store.read(key, summary.file_path, summary.file_path)
+    loaded = time.perf_counter()
+
+    store.close()
+    index.close()
+    return opened - start, raw_done - opened, loaded - raw_done
+
+
+def bench_pickle(cache_dir: Path, summaries):
+    store = PickleStore(cache_dir)
+    for key, summary in zip(keys(len(summaries)), summaries):
+        store.write(key, summary)
+
+    start = time.perf_counter()
+    store = PickleStore(cache_dir)
+    for key, summary in zip(keys(len(summaries)), summaries):
+        store.read(key, summary.file_path, summary.file_path)
+    return 0.0, None, time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--entries", type=int, default=100_000)
+    arg_parser.add_argument("--dir", default=None, help="Scratch directory (default: a temp dir)")
+    args = arg_parser.parse_args()
+
+    summaries = [make_summary(i) for i in range(args.entries)]
+    scratch = Path(args.dir or tempfile.mkdtemp(prefix="cbig-bench-"))
+
+    try:
+        for label, bench in (("packed", bench_segments), ("pickle", bench_pickle)):
+            cache_dir = scratch / label
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            open_time, raw_time, load_time = bench(cache_dir, summaries)
+            line = f"{label:>7}: open {open_time:6.3f}s"
+            if raw_time is not None:
+                line += f"  raw records {raw_time:6.3f}s"
+            line += f"  FileSummary load {load_time:6.3f}s  ({args.entries:,} entries)"
+            print(line)
+    finally:
+        if not args.dir:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
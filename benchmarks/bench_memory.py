@@ -0,0 +1,180 @@
+"""Benchmark peak memory of holding parse results for a large repository.
+
+Generates a synthetic Python corpus with N functions, parses every file and
+keeps all summaries alive, as a run does until its outputs are written.
+Each mode runs in a fresh process so peak RSS is measured independently:
+
+    baseline  parse every file, keep nothing
+    pydantic  keep results as pydantic models, as cbig used to
+    records   keep the NamedTuple records the parsers build
+
+Usage:
+    python benchmarks/bench_memory.py [--functions N] [--per-file N] [--dir DIR]
+
+Peak RSS comes from resource.getrusage, so this runs on Unix only.
+"""
+
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from cbig.core.processor import parse_file
+from cbig.parsers.registry import ParserRegistry
+
+MODES = ("baseline", "pydantic", "records")
+
+
+class LegacyDependency(BaseModel):
+    language: str
+    name: str
+    version: Optional[str] = None
+    source: Optional[str] = None
+    group: Optional[str] = None
+    artifact: Optional[str] = None
+
+
+class LegacyFunction(BaseModel):
+    language: str
+    file: str
+    name: str
+    signature: str
+    line_start: int
+    line_end: int
+    docstring: Optional[str] = None
+    is_method: bool = False
+    class_name: Optional[str] = None
+
+
+class LegacyClass(BaseModel):
+    language: str
+    file: str
+    name: str
+    kind: str
+    inherits: Optional[str] = None
+    implements: List[str] = Field(default_factory=list)
+    line_start: int
+    line_end: int
+    doc: Optional[str] = None
+
+
+class LegacyComment(BaseModel):
+    language: str
+    file: str
+    line_start: int
+    line_end: int
+    text: str
+
+
+class LegacyFileSummary(BaseModel):
+    """FileSummary as it was when parse results were validated into pydantic models."""
+    file_path: str
+    language: str
+    loc: int
+    dependencies: List[LegacyDependency] = Field(default_factory=list)
+    functions: List[LegacyFunction] = Field(default_factory=list)
+    classes: List[LegacyClass] = Field(default_factory=list)
+    comments: List[LegacyComment] = Field(default_factory=list)
+
+
+def write_corpus(root: Path, functions: int, per_file: int) -> int:
+    """Write Python modules holding `functions` methods in total; returns the file count."""
+    files = 0
+    for start in range(0, functions, per_file):
+        count = min(per_file, functions - start)
+        lines = ["import os", "from typing import Optional", ""]
+        lines += [f"class Service{files}(object):", f'    """Service number {files}."""', ""]
+        for i in range(start, start + count):
+            lines += [
+                f"    # Handler {i}",
+                f"    def handle_{i}(self, request, timeout: Optional[int] = None):",
+                f'        """Handle request kind {i} and return its response."""',
+                f"        return os.fspath(request) + str({i})",
+                "",
+            ]
+        package = root / f"pkg{files % 100}"
+        package.mkdir(exist_ok=True)
+        (package / f"module_{files}.py").write_text("\n".join(lines), encoding="utf-8")
+        files += 1
+    return files
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run(mode: str, root: Path):
+    """Parse the corpus in this process and print its peak RSS as JSON."""
+    registry = ParserRegistry()
+    kept = []
+    symbols = 0
+    start = time.perf_counter()
+    for path in sorted(root.rglob("*.py")):
+        summary = parse_file(path, root, "python", registry, include_comments=True)
+        symbols += len(summary.functions)
+        if mode == "records":
+            kept.append(summary)
+        elif mode == "pydantic":
+            kept.append(LegacyFileSummary(
+                file_path=summary.file_path,
+                language=summary.language,
+                loc=summary.loc,
+                dependencies=[dep._asdict() for dep in summary.dependencies],
+                functions=[func._asdict() for func in summary.functions],
+                classes=[dict(cls._asdict(), implements=list(cls.implements)) for cls in summary.classes],
+                comments=[comment._asdict() for comment in summary.comments],
+            ))
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"functions": symbols, "seconds": elapsed, "peak_rss_mb": peak_rss_mb()}))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--functions", type=int, default=100_000)
+    arg_parser.add_argument("--per-file", type=int, default=50)
+    arg_parser.add_argument("--dir", help="Where to write the corpus (default: a temporary directory)")
+    arg_parser.add_argument("--run", choices=MODES, help=argparse.SUPPRESS)
+    arg_parser.add_argument("--corpus", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.run:
+        run(args.run, Path(args.corpus))
+        return
+
+    root = Path(args.dir or tempfile.mkdtemp(prefix="cbig-bench-memory-"))
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        files = write_corpus(root, args.functions, args.per_file)
+        print(f"Corpus: {files} files, {args.functions:,} functions in {root}")
+
+        results = {}
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--run", mode, "--corpus", str(root)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+            result = results[mode]
+            print(f"{mode:>9}: peak RSS {result['peak_rss_mb']:8.1f} MB  {result['seconds']:7.2f}s")
+
+        baseline = results["baseline"]["peak_rss_mb"]
+        for mode in ("pydantic", "records"):
+            held = results[mode]["peak_rss_mb"] - baseline
+            print(f"Held by {mode}: {held:.1f} MB ({held * 1024 * 1024 / args.functions:.0f} bytes/function)")
+    finally:
+        if not args.dir:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
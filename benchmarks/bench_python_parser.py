@@ -0,0 +1,207 @@
+"""Benchmark tree-sitter extraction throughput of PythonParser.
+
+Compares query-driven extraction (queries/python.scm, matched by the C
+query engine) against the previous implementation, which walked every
+node of the tree in Python with a TreeCursor. Trees are parsed once up
+front so only extraction is timed.
+
+Usage:
+    python benchmarks/bench_python_parser.py [CORPUS_DIR] [--repeat N]
+
+CORPUS_DIR defaults to the standard library of the running interpreter.
+"""
+
+import argparse
+import sysconfig
+import time
+from pathlib import Path
+
+from cbig.core.models import Dependency, Function, Class, Comment
+from cbig.parsers.python_parser import PythonParser
+
+
+def text(node) -> str:
+    return node.text.decode("utf-8", errors="replace")
+
+
+def legacy_docstring(node):
+    """First string expression statement of a definition's body, as before."""
+    for child in node.children:
+        if child.type == 'block':
+            for stmt in child.children:
+                if stmt.type == 'expression_statement':
+                    for expr_child in stmt.children:
+                        if expr_child.type == 'string':
+                            return text(expr_child).strip('\'"')
+            break
+    return None
+
+
+def legacy_extract(tree, file_path: str):
+    """Single TreeCursor pass over every node, as it was before query-driven extraction."""
+    imports = []
+    functions = []
+    classes = []
+    comments = []
+
+    def dependency(name):
+        return Dependency(language='python', name=name, version=None, source='pip')
+
+    class_stack = []
+    function_depths = []
+
+    cursor = tree.walk()
+    depth = 0
+    while True:
+        node = cursor.node
+        node_type = node.type
+
+        if node_type == 'import_statement':
+            for child in node.children:
+                if child.type == 'dotted_name' or child.type == 'identifier':
+                    imports.append(dependency(text(child)))
+        elif node_type == 'import_from_statement':
+            for child in node.children:
+                if child.type == 'dotted_name' or child.type == 'identifier':
+                    if text(child) != 'import':
+                        imports.append(dependency(text(child)))
+                        break
+        elif node_type == 'function_definition':
+            if not function_depths:
+                name = params = None
+                for child in node.children:
+                    if child.type == 'identifier':
+                        name = text(child)
+                    elif child.type == 'parameters':
+                        params = text(child)
+                class_name = class_stack[-1][1] if class_stack else None
+                functions.append(Function(
+                    language='python',
+                    file=file_path,
+                    name=name,
+                    signature=f"def {name}{params or '()'}",
+                    line_start=node.start_point[0] + 1,
+                    line_end=node.end_point[0] + 1,
+                    docstring=legacy_docstring(node),
+                    is_method=class_name is not None,
+                    class_name=class_name
+                ))
+            function_depths.append(depth)
+        elif node_type == 'class_definition':
+            name = None
+            inherits = None
+            for child in node.children:
+                if child.type == 'identifier' and name is None:
+                    name = text(child)
+                elif child.type == 'argument_list':
+                    bases = text(child).strip('()')
+                    if bases:
+                        inherits = bases.split(',')[0].strip()
+            classes.append(Class(
+                language='python',
+                file=file_path,
+                name=name,
+                kind='class',
+                inherits=inherits,
+                implements=[],
+                line_start=node.start_point[0] + 1,
+                line_end=node.end_point[0] + 1,
+                doc=legacy_docstring(node)
+            ))
+            class_stack.append((depth, name))
+        elif node_type == 'comment':
+            comments.append(Comment(
+                language='python',
+                file=file_path,
+                line_start=node.start_point[0] + 1,
+                line_end=node.end_point[0] + 1,
+                text=text(node)
+            ))
+
+        if cursor.goto_first_child():
+            depth += 1
+            continue
+        while True:
+            while class_stack and class_stack[-1][0] >= depth:
+                class_stack.pop()
+            while function_depths and function_depths[-1] >= depth:
+                function_depths.pop()
+            if cursor.goto_next_sibling():
+                break
+            if not cursor.goto_parent():
+                return {
+                    'dependencies': imports,
+                    'functions': functions,
+                    'classes': classes,
+                    'comments': comments
+                }
+            depth -= 1
+
+
+def count_nodes(tree) -> int:
+    """Count every node in a tree."""
+    cursor = tree.walk()
+    count = 1
+    while True:
+        if cursor.goto_first_child() or cursor.goto_next_sibling():
+            count += 1
+            continue
+        while True:
+            if not cursor.goto_parent():
+                return count
+            if cursor.goto_next_sibling():
+                count += 1
+                break
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("corpus", nargs="?", default=sysconfig.get_paths()["stdlib"])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    parser = PythonParser()
+    if not parser.tree_sitter_enabled:
+        raise SystemExit("tree-sitter is not available")
+    grammar = parser.grammar
+
+    corpus = []
+    total_nodes = 0
+    for path in sorted(Path(args.corpus).rglob("*.py")):
+        try:
+            content = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        tree = grammar.parse(content.encode("utf-8"))
+        total_nodes += count_nodes(tree)
+        corpus.append((tree, str(path)))
+
+    print(f"Corpus: {args.corpus}")
+    print(f"Files: {len(corpus)}, nodes: {total_nodes:,}")
+
+    mismatches = 0
+    for tree, file_path in corpus:
+        if legacy_extract(tree, file_path) != parser._extract_ts(grammar, tree, file_path):
+            mismatches += 1
+    print(f"Result mismatches: {mismatches}")
+
+    timings = {}
+    for label, extract in (
+        ("cursor walk (before)", legacy_extract),
+        ("query (after)", lambda tree, path: parser._extract_ts(grammar, tree, path)),
+    ):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for tree, file_path in corpus:
+                extract(tree, file_path)
+            best = min(best, time.perf_counter() - start)
+        timings[label] = best
+        print(f"{label:>20}: {best:8.3f}s  {total_nodes / best:14,.0f} nodes/sec")
+
+    before, after = timings.values()
+    print(f"Speedup: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark regex vs tree-sitter extraction throughput per language.
+
+Runs every file of a corpus through both backends of the Java,
+JavaScript/TypeScript, Rust and HTML parsers and reports files/sec and
+MB/sec for each. Files are read and decoded up front so only parsing
+and extraction are timed: the regex backend gets text, tree-sitter the
+raw bytes as the pipeline hands them over. The tree-sitter figures
+include building the tree.
+
+Usage:
+    python benchmarks/bench_regex_vs_tree_sitter.py CORPUS_DIR [--repeat N] [--language LANG]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from cbig.parsers.html_parser import HTMLParser
+from cbig.parsers.java_parser import JavaParser
+from cbig.parsers.javascript_parser import JavaScriptParser
+from cbig.parsers.rust_parser import RustParser
+
+PARSERS = {
+    "java": (JavaParser, (".java",)),
+    "javascript": (JavaScriptParser, (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx")),
+    "rust": (RustParser, (".rs",)),
+    "html": (HTMLParser, (".html", ".htm")),
+}
+
+
+def load_corpus(root: Path, suffixes):
+    """Read every file under root with one of the suffixes, as (text, bytes, path)."""
+    corpus = []
+    for path in sorted(root.rglob("*")):
+        if path.suffix.lower() not in suffixes or not path.is_file():
+            continue
+        try:
+            data = path.read_bytes()
+        except OSError:
+            continue
+        corpus.append((data.decode("utf-8", errors="ignore"), data, str(path)))
+    return corpus
+
+
+def best_time(parse, corpus, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content, data, file_path in corpus:
+            parse(content, data, file_path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("corpus")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--language", choices=sorted(PARSERS), action="append")
+    args = arg_parser.parse_args()
+
+    print(f"Corpus: {args.corpus}")
+    for language in args.language or sorted(PARSERS):
+        parser_class, suffixes = PARSERS[language]
+        parser = parser_class()
+        if not parser.tree_sitter_enabled:
+            print(f"{language}: tree-sitter grammar not available, skipped")
+            continue
+
+        # Files without a grammar (TypeScript without tree-sitter-typescript) only have the regex path
+        corpus = [
+            entry for entry in load_corpus(Path(args.corpus), suffixes)
+            if parser._select_grammar(entry[2]) is not None
+        ]
+        if not corpus:
+            continue
+        megabytes = sum(len(data) for _, data, _ in corpus) / 1e6
+
+        print(f"{language}: {len(corpus)} files, {megabytes:.1f} MB")
+        timings = {}
+        for label, parse in (
+            ("regex", lambda content, data, file_path: parser._parse_with_regex(content, file_path)),
+            ("tree-sitter", lambda content, data, file_path: parser._parse_with_tree_sitter(
+                parser._select_grammar(file_path), data, file_path)),
+        ):
+            elapsed = best_time(parse, corpus, args.repeat)
+            timings[label] = elapsed
+            print(f"{label:>14}: {elapsed:8.3f}s  {len(corpus) / elapsed:10,.0f} files/sec  "
+                  f"{megabytes / elapsed:7.2f} MB/sec")
+
+        print(f"{'tree-sitter':>14}: {timings['regex'] / timings['tree-sitter']:.2f}x the regex throughput")
+
+
+if __name__ == "__main__":
+    main()
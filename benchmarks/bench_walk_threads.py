@@ -0,0 +1,97 @@
+"""Benchmark concurrent directory traversal (--walk-threads) on a deep tree.
+
+Builds a synthetic tree of the given depth and fan-out with a few files per
+directory, then scans it with FileWalker at several walk_threads settings.
+Network filesystems pay a round trip per directory listing. To reproduce
+that locally, --latency-ms adds a sleep to every os.scandir call; pass 0 to
+time the real filesystem, e.g. on an NFS mount given with --dir.
+
+Usage:
+    python benchmarks/bench_walk_threads.py [--depth D] [--fanout F] [--files N]
+        [--latency-ms MS] [--threads 1,4,16] [--dir DIR]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from cbig.core.walker import FileWalker
+
+
+def write_tree(root: Path, depth: int, fanout: int, files: int) -> int:
+    """Write a tree `depth` levels deep, `fanout` directories wide; returns the directory count."""
+    directories = 0
+    level = [root]
+    for _ in range(depth + 1):
+        next_level = []
+        for directory in level:
+            directory.mkdir(parents=True, exist_ok=True)
+            directories += 1
+            for i in range(files):
+                (directory / f"module_{i}.py").write_text("x = 1\n", encoding="utf-8")
+            next_level.extend(directory / f"d{i}" for i in range(fanout))
+        level = next_level
+    return directories
+
+
+def with_latency(latency: float):
+    """Make every os.scandir call wait `latency` seconds first, as a remote listing does."""
+    scandir = os.scandir
+
+    def slow_scandir(path="."):
+        time.sleep(latency)
+        return scandir(path)
+
+    os.scandir = slow_scandir
+    return scandir
+
+
+def bench(root: Path, threads: int):
+    walker = FileWalker(walk_threads=threads)
+    start = time.perf_counter()
+    found = [entry.path for entry in walker.scan(root)]
+    return time.perf_counter() - start, found
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--depth", type=int, default=6)
+    arg_parser.add_argument("--fanout", type=int, default=4)
+    arg_parser.add_argument("--files", type=int, default=5)
+    arg_parser.add_argument("--latency-ms", type=float, default=2.0)
+    arg_parser.add_argument("--threads", default="1,4,16,32")
+    arg_parser.add_argument("--dir", help="Where to build the tree (default: a temporary directory)")
+    args = arg_parser.parse_args()
+
+    root = Path(args.dir or tempfile.mkdtemp(prefix="cbig-bench-walk-threads-"))
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        if not any(root.iterdir()):
+            directories = write_tree(root, args.depth, args.fanout, args.files)
+            print(f"Tree: {directories:,} directories, {directories * args.files:,} files in {root}")
+
+        original = with_latency(args.latency_ms / 1000)
+        try:
+            baseline = None
+            for threads in (int(value) for value in args.threads.split(",")):
+                elapsed, found = bench(root, threads)
+                if baseline is None:
+                    baseline = (elapsed, found)
+                elif found != baseline[1]:
+                    raise SystemExit(f"walk_threads={threads} found different files")
+                print(
+                    f"walk_threads={threads:>3}: {elapsed:7.3f}s  ({len(found):,} files, "
+                    f"{baseline[0] / elapsed:.1f}x)"
+                )
+        finally:
+            os.scandir = original
+    finally:
+        if not args.dir:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
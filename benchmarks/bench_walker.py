@@ -0,0 +1,121 @@
+"""Benchmark file discovery on a large synthetic tree.
+
+Builds a tree of N entries (files and directories): a source tree of small
+packages, a gitignored directory and a node_modules directory, which
+together hold a third of the entries. Then it walks the tree with the
+previous os.walk-based walker and with FileWalker.scan, checks that both
+find the same files, and reports the time of each.
+
+Usage:
+    python benchmarks/bench_walker.py [--entries N] [--dir DIR] [--repeat R]
+
+The request-sized tree is --entries 500000.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import pathspec
+
+from cbig.core.walker import FileWalker, SOURCE_EXTENSIONS
+
+FILES_PER_DIR = 20
+EXTENSIONS = (".py", ".js", ".ts", ".go", ".md", ".png", ".lock")
+
+
+class LegacyWalker(FileWalker):
+    """FileWalker.walk as it was: os.walk, Path objects and per-pattern matching for every file."""
+
+    def walk(self, root_path: Path):
+        # Only the root .gitignore was read
+        gitignore_spec = pathspec.PathSpec.from_lines('gitwildmatch', self._read_patterns(root_path / ".gitignore"))
+        for current_dir, dirs, files in os.walk(root_path):
+            current_path = Path(current_dir)
+            relative_dir = current_path.relative_to(root_path)
+            if str(relative_dir) != "." and self.exclude_spec.match_file(str(relative_dir) + "/"):
+                dirs.clear()
+                continue
+            for file_name in files:
+                file_path = current_path / file_name
+                relative_path = file_path.relative_to(root_path)
+                if self.exclude_spec.match_file(str(relative_path)):
+                    continue
+                # The extension set was rebuilt for every file
+                if file_path.suffix.lower() not in set(SOURCE_EXTENSIONS):
+                    continue
+                if self._legacy_gitignored(relative_path, gitignore_spec):
+                    continue
+                yield file_path
+
+    @staticmethod
+    def _legacy_gitignored(relative_path: Path, gitignore_spec: pathspec.PathSpec) -> bool:
+        if gitignore_spec.match_file(str(relative_path)):
+            return True
+        for parent in relative_path.parents:
+            if str(parent) != "." and gitignore_spec.match_file(str(parent) + "/"):
+                return True
+        return False
+
+
+def write_tree(root: Path, entries: int) -> int:
+    """Write about `entries` files and directories under root; returns the count written."""
+    (root / ".gitignore").write_text("generated/\n*.lock\n", encoding="utf-8")
+    written = 1
+    budgets = {"src": entries * 2 // 3, "generated": entries // 6, "node_modules": entries // 6}
+    for top, budget in budgets.items():
+        count = 0
+        package = 0
+        while count < budget:
+            directory = root / top / f"pkg{package // 50}" / f"mod{package}"
+            directory.mkdir(parents=True)
+            count += 1 if package % 50 else 2
+            for i in range(min(FILES_PER_DIR, budget - count)):
+                (directory / f"file{i}{EXTENSIONS[i % len(EXTENSIONS)]}").touch()
+                count += 1
+            package += 1
+        written += count + 1
+    return written
+
+
+def bench(label: str, walk, root: Path, repeat: int):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = sum(1 for _ in walk(root))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:>7}: {best:7.3f}s  ({found:,} files)")
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--entries", type=int, default=100_000)
+    arg_parser.add_argument("--dir", help="Where to build the tree (default: a temporary directory)")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    root = Path(args.dir or tempfile.mkdtemp(prefix="cbig-bench-walker-"))
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        if not any(root.iterdir()):
+            print(f"Tree: {write_tree(root, args.entries):,} entries in {root}")
+
+        legacy, walker = LegacyWalker(), FileWalker()
+        if list(legacy.walk(root)) != list(walker.walk(root)):
+            raise SystemExit("walkers disagree")
+
+        before = bench("os.walk", legacy.walk, root, args.repeat)
+        after = bench("scandir", walker.scan, root, args.repeat)
+        print(f"Speedup: {before / after:.1f}x")
+    finally:
+        if not args.dir:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""SQLite-backed index of cache entries."""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterable, Iterator, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 4
+
+# Entry fields stored as columns, in table order after the path
+ENTRY_FIELDS = ("content_hash", "file_size", "mtime_ns", "inode", "cached_at_ns")
+
+# Record access times are only rewritten when older than this, so warm runs
+# do not turn every hit into an index write
+ACCESS_RESOLUTION_NS = 3600 * 1_000_000_000
+
+
+class CacheIndex:
+    """
+    Maps file paths to cache entries in a single WAL-mode SQLite database.
+
+    The index also records where each packed cache record lives, as a
+    (segment, offset, length) triple per cache key, and when the record
+    was last read, for LRU eviction, and the content hash of every git
+    blob id seen, so files listed by git need not be hashed. All tables
+    are read into memory once on first use, so lookups never touch the
+    database.
+
+    Writes are buffered in memory and committed in batches inside one
+    transaction, so a cold run costs O(n) I/O instead of rewriting the
+    whole index per file. A lock serializes access from worker threads;
+    WAL mode and a busy timeout let several cbig processes share a cache.
+    """
+
+    def __init__(self, db_path: Path, batch_size: int = 500):
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._blobs: Optional[Dict[str, Tuple[int, int, int]]] = None
+        self._blob_access: Dict[str, int] = {}
+        self._git_blobs: Dict[str, str] = {}
+        self._pending_entries: Dict[str, Dict[str, Any]] = {}
+        self._pending_blobs: Dict[str, Tuple[int, int, int]] = {}
+        self._pending_git_blobs: Dict[str, str] = {}
+
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create tables on first use, discarding an index from an older schema."""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        with self._conn:
+            if 0 < version < SCHEMA_VERSION:
+                logger.info("Cache index schema changed, starting a fresh index")
+                self._conn.execute("DROP TABLE IF EXISTS entries")
+                self._conn.execute("DROP TABLE IF EXISTS blobs")
+                self._conn.execute("DROP TABLE IF EXISTS git_blobs")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    path TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    file_size INTEGER,
+                    mtime_ns INTEGER,
+                    inode INTEGER,
+                    cached_at_ns INTEGER
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS blobs (
+                    cache_key TEXT PRIMARY KEY,
+                    segment INTEGER NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    last_access_ns INTEGER NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS git_blobs (
+                    blob_id TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _load_locked(self):
+        """Read the tables into memory if not done yet."""
+        if self._entries is not None:
+            return
+
+        self._entries = {
+            row[0]: dict(zip(ENTRY_FIELDS, row[1:]))
+            for row in self._conn.execute(f"SELECT path, {', '.join(ENTRY_FIELDS)} FROM entries")
+        }
+        self._blobs = {}
+        for row in self._conn.execute("SELECT cache_key, segment, offset, length, last_access_ns FROM blobs"):
+            self._blobs[row[0]] = (row[1], row[2], row[3])
+            self._blob_access[row[0]] = row[4]
+        self._git_blobs = dict(self._conn.execute("SELECT blob_id, content_hash FROM git_blobs"))
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """Return the entry for a path."""
+        with self._lock:
+            self._load_locked()
+            entry = self._entries.get(path)
+        return dict(entry) if entry is not None else None
+
+    def put(self, path: str, entry: Dict[str, Any]):
+        """Record an entry; the write is flushed once a batch is full."""
+        with self._lock:
+            self._load_locked()
+            self._entries[path] = self._pending_entries[path] = dict(entry)
+            self._maybe_flush_locked()
+
+    def get_blob(self, cache_key: str) -> Optional[Tuple[int, int, int]]:
+        """Return the (segment, offset, length) of a packed record."""
+        with self._lock:
+            self._load_locked()
+            return self._blobs.get(cache_key)
+
+    def put_blob(self, cache_key: str, location: Tuple[int, int, int]):
+        """Record where a packed record was written."""
+        with self._lock:
+            self._load_locked()
+            self._blobs[cache_key] = self._pending_blobs[cache_key] = location
+            self._blob_access[cache_key] = time.time_ns()
+            self._maybe_flush_locked()
+
+    def touch_blob(self, cache_key: str):
+        """Note that a packed record was read."""
+        now = time.time_ns()
+        with self._lock:
+            self._load_locked()
+            if cache_key not in self._blobs:
+                return
+            if now - self._blob_access.get(cache_key, 0) < ACCESS_RESOLUTION_NS:
+                return
+            self._blob_access[cache_key] = now
+            self._pending_blobs[cache_key] = self._blobs[cache_key]
+            self._maybe_flush_locked()
+
+    def get_git_blob(self, blob_id: str) -> Optional[str]:
+        """Return the content hash of a git blob id, if known."""
+        with self._lock:
+            self._load_locked()
+            return self._git_blobs.get(blob_id)
+
+    def put_git_blob(self, blob_id: str, content_hash: str):
+        """Record the content hash of a git blob id."""
+        with self._lock:
+            self._load_locked()
+            if self._git_blobs.get(blob_id) == content_hash:
+                return
+            self._git_blobs[blob_id] = self._pending_git_blobs[blob_id] = content_hash
+            self._maybe_flush_locked()
+
+    def blob_stats(self) -> Dict[str, Tuple[int, int]]:
+        """Return (length, last_access_ns) for every packed record."""
+        with self._lock:
+            self._load_locked()
+            return {
+                key: (location[2], self._blob_access.get(key, 0))
+                for key, location in self._blobs.items()
+            }
+
+    def _maybe_flush_locked(self):
+        pending = len(self._pending_entries) + len(self._pending_blobs) + len(self._pending_git_blobs)
+        if pending >= self.batch_size:
+            self._flush_locked()
+
+    def flush(self):
+        """Commit all queued writes in one transaction."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending_entries and not self._pending_blobs and not self._pending_git_blobs:
+            return
+
+        entry_rows = [
+            (path,) + tuple(entry.get(field) for field in ENTRY_FIELDS)
+            for path, entry in self._pending_entries.items()
+        ]
+        blob_rows = [
+            (key,) + location + (self._blob_access.get(key, 0),)
+            for key, location in self._pending_blobs.items()
+        ]
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO entries (path, {', '.join(ENTRY_FIELDS)}) "
+                f"VALUES ({', '.join('?' * (len(ENTRY_FIELDS) + 1))})",
+                entry_rows
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO blobs (cache_key, segment, offset, length, last_access_ns) "
+                "VALUES (?, ?, ?, ?, ?)",
+                blob_rows
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO git_blobs (blob_id, content_hash) VALUES (?, ?)",
+                self._pending_git_blobs.items()
+            )
+        self._pending_entries.clear()
+        self._pending_blobs.clear()
+        self._pending_git_blobs.clear()
+
+    def count(self) -> int:
+        """Return the number of indexed entries."""
+        with self._lock:
+            self._load_locked()
+            return len(self._entries)
+
+    def content_hashes(self) -> set:
+        """Return the set of content hashes referenced by any entry."""
+        with self._lock:
+            self._load_locked()
+            return {entry["content_hash"] for entry in self._entries.values()}
+
+    def blobs(self) -> Dict[str, Tuple[int, int, int]]:
+        """Return a copy of the packed record locations."""
+        with self._lock:
+            self._load_locked()
+            return dict(self._blobs)
+
+    def move_blobs(self, moved: Dict[str, Tuple[int, int, int]], removed: Iterable[str]):
+        """
+        Update the locations of moved records and drop removed ones, in one transaction.
+
+        Rows for any other key are left alone, access times included.
+        """
+        removed = list(removed)
+        with self._lock:
+            self._load_locked()
+            self._flush_locked()
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE blobs SET segment = ?, offset = ?, length = ? WHERE cache_key = ?",
+                    [location + (key,) for key, location in moved.items()]
+                )
+                self._conn.executemany("DELETE FROM blobs WHERE cache_key = ?", [(key,) for key in removed])
+            self._blobs.update(moved)
+            for key in removed:
+                self._blobs.pop(key, None)
+                self._blob_access.pop(key, None)
+
+    def reload(self):
+        """Commit queued writes and re-read the tables, picking up other processes' writes."""
+        with self._lock:
+            self._flush_locked()
+            self._entries = None
+            self._blob_access = {}
+            self._load_locked()
+
+    def prune_entries(self, keep) -> int:
+        """
+        Delete path entries and git blob ids whose content hash fails `keep`.
+
+        Returns the number of path entries removed.
+        """
+        with self._lock:
+            self._load_locked()
+            self._flush_locked()
+            stale = [path for path, entry in self._entries.items() if not keep(entry["content_hash"])]
+            stale_blob_ids = [blob_id for blob_id, content_hash in self._git_blobs.items() if not keep(content_hash)]
+            with self._conn:
+                self._conn.executemany("DELETE FROM entries WHERE path = ?", [(path,) for path in stale])
+                self._conn.executemany(
+                    "DELETE FROM git_blobs WHERE blob_id = ?", [(blob_id,) for blob_id in stale_blob_ids]
+                )
+            for path in stale:
+                del self._entries[path]
+            for blob_id in stale_blob_ids:
+                del self._git_blobs[blob_id]
+            return len(stale)
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Iterate over (path, entry) pairs."""
+        with self._lock:
+            self._load_locked()
+            items = [(path, dict(entry)) for path, entry in self._entries.items()]
+        return iter(items)
+
+    def clear(self):
+        """Remove all entries and record locations."""
+        with self._lock:
+            self._entries = {}
+            self._blobs = {}
+            self._blob_access = {}
+            self._git_blobs = {}
+            self._pending_entries.clear()
+            self._pending_blobs.clear()
+            self._pending_git_blobs.clear()
+            with self._conn:
+                self._conn.execute("DELETE FROM entries")
+                self._conn.execute("DELETE FROM blobs")
+                self._conn.execute("DELETE FROM git_blobs")
+
+    def import_json(self, metadata_file: Path) -> int:
+        """
+        Import entries from a legacy metadata.json index.
+
+        Returns the number of entries imported.
+        """
+        with open(metadata_file, 'r') as f:
+            metadata = json.load(f)
+
+        imported = 0
+        for path, entry in metadata.get("entries", {}).items():
+            # Legacy cache keys were plain content hashes. Entries from before
+            # stat validation have no mtime_ns/inode and are re-hashed on first
+            # lookup; their pickled records predate parser fingerprints and miss
+            if not entry.get("cache_key"):
+                continue
+            self.put(path, {"content_hash": entry["cache_key"], **entry})
+            imported += 1
+
+        self.flush()
+        return imported
+
+    def close(self):
+        """Flush pending writes and close the database."""
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
@@ -1,110 +1,297 @@
 """Cache manager for storing and retrieving parsed file results."""
 
 import hashlib
-import json
-import pickle
+import re
+import tarfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterator
 import logging
 import os
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 from cbig.core.models import FileSummary
+from cbig.cache.index import CacheIndex
+from cbig.cache.stores import PickleStore, SegmentStore, MSGPACK_AVAILABLE
 
 logger = logging.getLogger(__name__)
 
+VALIDATION_MODES = ("stat", "hash")
+
+# Files modified this close to the time they were cached may share an mtime
+# with a later edit on coarse-grained filesystems, so they are always re-hashed
+RACY_WINDOW_NS = 2_000_000_000
+
+SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": 1024 ** 2, "mb": 1024 ** 2, "g": 1024 ** 3, "gb": 1024 ** 3}
+AGE_UNITS = {"": 86400, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as "500MB" or "2g" into bytes."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([a-z]*)\s*", value.lower())
+    if not match or match.group(2) not in SIZE_UNITS:
+        raise ValueError(f"Invalid size '{value}'. Use e.g. 500MB or 2GB")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def parse_age(value: str) -> float:
+    """Parse an age such as "30d" or "12h" into seconds; a bare number means days."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([a-z]?)\s*", value.lower())
+    if not match or match.group(2) not in AGE_UNITS:
+        raise ValueError(f"Invalid age '{value}'. Use e.g. 12h, 30d or 4w")
+    return float(match.group(1)) * AGE_UNITS[match.group(2)]
+
+
+class CacheLock:
+    """
+    Advisory lock on a cache directory, shared between cbig processes.
+    
+    Every process using the cache holds it shared while the cache is
+    open. Maintenance that rewrites or deletes records (gc, compaction,
+    clear) upgrades it to exclusive, so it never runs while another
+    process is appending records or holds their locations in memory.
+    Without fcntl (Windows) no locking is done.
+    """
+    
+    def __init__(self, lock_path: Path):
+        self._file = open(lock_path, 'a+b')
+        self._flock(fcntl.LOCK_SH if fcntl else None)
+    
+    def _flock(self, operation):
+        if fcntl is not None and operation is not None:
+            fcntl.flock(self._file.fileno(), operation)
+    
+    @contextmanager
+    def exclusive(self, wait: bool = True) -> Iterator[bool]:
+        """
+        Hold the lock exclusively for the duration of the block; yields whether it was acquired.
+        
+        flock upgrades are not atomic: the shared lock is dropped first,
+        so it is taken again if the upgrade fails and when the block ends.
+        """
+        if fcntl is None:
+            yield True
+            return
+        try:
+            self._flock(fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._flock(fcntl.LOCK_SH)
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            self._flock(fcntl.LOCK_SH)
+    
+    def close(self):
+        self._file.close()
+
 
 class CacheManager:
     """Manages caching of parsed file results to avoid re-parsing unchanged files."""
     
-    def __init__(self, cache_dir: Path):
+    def __init__(self, cache_dir: Path, validation: str = "stat"):
+        if validation not in VALIDATION_MODES:
+            raise ValueError(f"Unknown cache validation mode: {validation}")
+        
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.validation = validation
         
-        # Cache metadata
+        # Held shared while the cache is open, exclusive while records are rewritten
+        self.lock = CacheLock(self.cache_dir / "lock")
+        
+        # Content hashes computed by get() on a miss, reused by put()
+        self._pending_hashes: Dict[str, tuple] = {}
+        
+        # Cache index, migrated from the legacy metadata.json on first open
         self.metadata_file = self.cache_dir / "metadata.json"
-        self.metadata = self._load_metadata()
+        self.index = CacheIndex(self.cache_dir / "index.db")
+        if self.metadata_file.exists():
+            self.migrate_json_metadata()
+        
+        # Packed segment records when msgpack is available, else one pickle per entry
+        self.legacy_store = PickleStore(self.cache_dir)
+        if MSGPACK_AVAILABLE:
+            self.store = SegmentStore(self.cache_dir, self.index)
+        else:
+            logger.debug("msgpack not available, using pickle cache records")
+            self.store = self.legacy_store
         
         logger.debug(f"Cache manager initialized with directory: {self.cache_dir}")
     
-    def _load_metadata(self) -> Dict[str, Any]:
-        """Load cache metadata."""
-        if self.metadata_file.exists():
-            try:
-                with open(self.metadata_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load cache metadata: {e}")
-        
-        return {
-            "version": "1.0.0",
-            "entries": {}
-        }
-    
-    def _save_metadata(self):
-        """Save cache metadata."""
+    def migrate_json_metadata(self) -> int:
+        """
+        Import entries from a legacy metadata.json into the SQLite index.
+        
+        The JSON file is renamed to metadata.json.migrated afterwards.
+        Returns the number of entries imported.
+        """
+        if not self.metadata_file.exists():
+            return 0
+        
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            imported = self.index.import_json(self.metadata_file)
         except Exception as e:
-            logger.error(f"Failed to save cache metadata: {e}")
+            logger.warning(f"Failed to migrate cache metadata: {e}")
+            return 0
+        
+        self.metadata_file.rename(self.metadata_file.with_name("metadata.json.migrated"))
+        logger.info(f"Migrated {imported} cache entries from {self.metadata_file.name}")
+        return imported
+    
+    def flush(self):
+        """Commit pending index writes."""
+        self.index.flush()
     
-    def _get_file_hash(self, file_path: Path) -> str:
-        """Calculate SHA-256 hash of file content."""
+    def close(self):
+        """Flush pending index writes and release the database."""
+        self.store.close()
+        self.lock.close()
+        self.index.close()
+    
+    @staticmethod
+    def _stat_signature(stat_result: os.stat_result) -> tuple:
+        """Return the (size, mtime_ns, inode) triple used for stat validation."""
+        return (stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino)
+    
+    def _stat_matches(self, entry: Dict[str, Any], signature: tuple) -> bool:
+        """
+        Check whether an index entry can be trusted from stat info alone.
+        
+        Entries written within RACY_WINDOW_NS of the file's mtime are never
+        trusted, since a later edit could leave size and mtime unchanged.
+        """
+        if self.validation != "stat":
+            return False
+        
+        size, mtime_ns, inode = signature
+        return (
+            entry.get("file_size") == size and
+            entry.get("mtime_ns") == mtime_ns and
+            entry.get("inode") == inode and
+            mtime_ns < entry.get("cached_at_ns", 0) - RACY_WINDOW_NS
+        )
+    
+    def _record_stat(self, entry: Dict[str, Any], signature: tuple):
+        """Store stat validation fields on an index entry."""
+        size, mtime_ns, inode = signature
+        entry["file_size"] = size
+        entry["mtime_ns"] = mtime_ns
+        entry["inode"] = inode
+        entry["cached_at_ns"] = time.time_ns()
+    
+    def _get_file_hash(self, file_path: Path, read: Optional[Callable[[], bytes]] = None) -> str:
+        """Calculate SHA-256 hash of file content, using `read` to fetch it if given."""
         try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
+            if read is not None:
+                content = read()
+            else:
+                with open(file_path, 'rb') as f:
+                    content = f.read()
             return hashlib.sha256(content).hexdigest()
         except Exception as e:
             logger.error(f"Failed to calculate hash for {file_path}: {e}")
             return ""
     
-    def _get_cache_key(self, file_path: Path) -> str:
-        """Generate cache key for a file."""
-        # Use relative path and hash for cache key
-        file_hash = self._get_file_hash(file_path)
-        return f"{file_hash}"
+    def _git_blob_hash(self, blob_id: Optional[str]) -> Optional[str]:
+        """
+        The content hash recorded for a git blob id.
+        
+        Git vouches for blob ids with stat info of its own, so they are
+        only trusted in "stat" validation mode.
+        """
+        if blob_id is None or self.validation != "stat":
+            return None
+        return self.index.get_git_blob(blob_id)
+    
+    def _record_git_blob(self, blob_id: Optional[str], content_hash: str):
+        """Remember a blob id's content hash, so the next file with that blob is not hashed."""
+        if blob_id is not None and self.validation == "stat":
+            self.index.put_git_blob(blob_id, content_hash)
     
-    def _get_cache_file_path(self, cache_key: str) -> Path:
-        """Get the cache file path for a given cache key."""
-        # Use first 2 chars of hash for subdirectory to avoid too many files in one dir
-        subdir = cache_key[:2]
-        cache_subdir = self.cache_dir / subdir
-        cache_subdir.mkdir(exist_ok=True)
-        return cache_subdir / f"{cache_key}.pkl"
+    @staticmethod
+    def _get_cache_key(content_hash: str, fingerprint: str) -> str:
+        """
+        Generate the record key for a file's content and parse settings.
+        
+        The fingerprint names the language, parser version and extraction
+        options, so changing any of them misses only the affected records.
+        """
+        fingerprint_hash = hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()[:16]
+        return f"{content_hash}-{fingerprint_hash}"
     
-    def get(self, file_path: Path) -> Optional[FileSummary]:
+    def get(
+        self,
+        file_path: Path,
+        fingerprint: str = "",
+        relative_path: Optional[str] = None,
+        stat_result: Optional[os.stat_result] = None,
+        read: Optional[Callable[[], bytes]] = None,
+        blob_id: Optional[str] = None,
+        on_disk: bool = True
+    ) -> Optional[FileSummary]:
         """
         Retrieve cached result for a file.
         
+        Records are content-addressed: any cache holding a record for the
+        same content and parse settings serves the file, whatever path or
+        checkout it was cached from. The per-path index only remembers stat
+        info so that, in "stat" validation mode, unchanged files are not
+        read or hashed. The returned summary is bound to `relative_path`
+        (default: the file path itself) and `file_path`.
+        
+        Callers that already stat'ed or read the file pass `stat_result`
+        and a `read` callable returning its bytes, so the file is not
+        touched again. Callers that know the git blob id of the file's
+        content pass `blob_id`: in "stat" mode, a blob id whose content
+        hash is already known stands in for stat validation and hashing.
+        Files that are not on disk (archive members, git objects) pass
+        `on_disk=False`: they have no stat info to trust, so they are
+        hashed unless their blob id is known, and nothing is recorded for
+        their path.
+        
         Returns None if no valid cache entry exists.
         """
         try:
-            cache_key = self._get_cache_key(file_path)
-            if not cache_key:
-                return None
-            
-            # Check if entry exists in metadata
             str_path = str(file_path)
-            if str_path not in self.metadata["entries"]:
-                return None
+            content_hash = self._git_blob_hash(blob_id)
+            trusted = content_hash is not None
+            if not trusted:
+                entry = self.index.get(str_path) if on_disk else None
+                signature = self._stat_signature(stat_result or file_path.stat()) if on_disk else None
+                trusted = entry is not None and self._stat_matches(entry, signature)
+                if trusted:
+                    content_hash = entry["content_hash"]
+                else:
+                    content_hash = self._get_file_hash(file_path, read)
+                    if not content_hash:
+                        return None
+                    self._pending_hashes[str_path] = (signature, content_hash)
+                self._record_git_blob(blob_id, content_hash)
             
-            entry = self.metadata["entries"][str_path]
-            
-            # Verify cache key matches (file hasn't changed)
-            if entry.get("cache_key") != cache_key:
-                logger.debug(f"Cache miss for {file_path}: file changed")
-                return None
-            
-            # Check if cache file exists
-            cache_file = self._get_cache_file_path(cache_key)
-            if not cache_file.exists():
-                logger.debug(f"Cache miss for {file_path}: cache file not found")
+            # Load cached result
+            result = self.store.read(
+                self._get_cache_key(content_hash, fingerprint),
+                relative_path if relative_path is not None else str_path,
+                str_path
+            )
+            if result is None:
+                logger.debug(f"Cache miss for {file_path}")
                 return None
             
-            # Load cached result
-            with open(cache_file, 'rb') as f:
-                result = pickle.load(f)
+            if not trusted and on_disk:
+                # Remember stat info so the next run can skip hashing
+                entry = {"content_hash": content_hash}
+                self._record_stat(entry, signature)
+                self.index.put(str_path, entry)
             
+            self._pending_hashes.pop(str_path, None)
             logger.debug(f"Cache hit for {file_path}")
             return result
             
@@ -112,59 +299,161 @@ class CacheManager:
             logger.warning(f"Cache retrieval failed for {file_path}: {e}")
             return None
     
-    def put(self, file_path: Path, result: FileSummary):
-        """Store result in cache."""
+    def put(
+        self,
+        file_path: Path,
+        result: FileSummary,
+        fingerprint: str = "",
+        stat_result: Optional[os.stat_result] = None,
+        read: Optional[Callable[[], bytes]] = None,
+        blob_id: Optional[str] = None,
+        on_disk: bool = True
+    ):
+        """Store result in cache; `stat_result`, `read`, `blob_id` and `on_disk` are as for get()."""
         try:
-            cache_key = self._get_cache_key(file_path)
-            if not cache_key:
-                return
+            str_path = str(file_path)
+            signature = self._stat_signature(stat_result or file_path.stat()) if on_disk else None
             
-            # Save result to cache file
-            cache_file = self._get_cache_file_path(cache_key)
-            with open(cache_file, 'wb') as f:
-                pickle.dump(result, f)
+            # Reuse the hash from a preceding get() if the file is unchanged
+            pending = self._pending_hashes.pop(str_path, None)
+            content_hash = self._git_blob_hash(blob_id)
+            if content_hash is None and pending and pending[0] == signature:
+                content_hash = pending[1]
+            elif content_hash is None:
+                content_hash = self._get_file_hash(file_path, read)
+            if not content_hash:
+                return
+            self._record_git_blob(blob_id, content_hash)
             
-            # Update metadata
-            str_path = str(file_path)
-            self.metadata["entries"][str_path] = {
-                "cache_key": cache_key,
-                "file_size": file_path.stat().st_size,
-                "modified_time": file_path.stat().st_mtime,
-                "cached_at": os.path.getmtime(cache_file)
-            }
+            # Save result to the record store
+            self.store.write(self._get_cache_key(content_hash, fingerprint), result)
             
-            self._save_metadata()
+            # Update index
+            if on_disk:
+                entry = {"content_hash": content_hash}
+                self._record_stat(entry, signature)
+                self.index.put(str_path, entry)
             logger.debug(f"Cached result for {file_path}")
             
         except Exception as e:
             logger.error(f"Cache storage failed for {file_path}: {e}")
     
     def clear(self):
-        """Clear all cache entries."""
+        """Clear all cache entries, once no other process is using the cache."""
         try:
-            # Remove all cache files
-            for cache_file in self.cache_dir.rglob("*.pkl"):
-                cache_file.unlink()
-            
-            # Reset metadata
-            self.metadata = {
-                "version": "1.0.0",
-                "entries": {}
-            }
-            self._save_metadata()
+            with self.lock.exclusive():
+                # Remove all cache records
+                self.store.clear()
+                self.legacy_store.clear()
+                
+                # Reset index
+                self.index.clear()
             
             logger.info("Cache cleared")
             
         except Exception as e:
             logger.error(f"Failed to clear cache: {e}")
     
+    def export_archive(self, archive_path: Path) -> int:
+        """
+        Pack every cached record into a single tarball.
+        
+        Per-path stat info is machine-specific and is not exported.
+        Returns the number of records written.
+        """
+        self.flush()
+        with tarfile.open(archive_path, "w:gz") as tar:
+            count = self.store.export_to(tar)
+        logger.info(f"Exported {count} cache records to {archive_path}")
+        return count
+    
+    def import_archive(self, archive_path: Path) -> int:
+        """
+        Merge the records from a tarball made by export_archive.
+        
+        Records already present are kept. Returns the number of records added.
+        """
+        with tarfile.open(archive_path, "r:*") as tar:
+            count = self.store.import_from(tar)
+        self.flush()
+        logger.info(f"Imported {count} cache records from {archive_path}")
+        return count
+    
+    def gc(
+        self,
+        max_size: Optional[int] = None,
+        max_age: Optional[float] = None,
+        wait: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Evict cached records to respect an age limit and a size cap.
+        
+        Records not read for more than `max_age` seconds are dropped first;
+        then the least recently used records are dropped until the rest fit
+        in `max_size` bytes. Path entries whose content no longer has any
+        record are pruned as well. Returns get_stats() plus the number of
+        records evicted and bytes freed.
+        
+        Runs under the exclusive cache lock, waiting for other processes
+        using the cache to finish; with `wait=False` nothing is evicted if
+        any are.
+        """
+        self.flush()
+        with self.lock.exclusive(wait) as locked:
+            if not locked:
+                logger.info("Cache is in use by another process, skipping eviction")
+                stats = self.get_stats()
+                stats["evicted_records"] = stats["freed_bytes"] = 0
+                return stats
+            return self._gc_locked(max_size, max_age)
+    
+    def _gc_locked(self, max_size: Optional[int], max_age: Optional[float]) -> Dict[str, Any]:
+        # Pick up records other processes wrote since the index was loaded
+        self.index.reload()
+        size_before = self._disk_size()
+        records = self.store.record_stats()
+        
+        # Oldest access first
+        by_access = sorted(records.items(), key=lambda item: item[1][1])
+        evicted = []
+        if max_age is not None:
+            cutoff = time.time_ns() - int(max_age * 1_000_000_000)
+            while len(evicted) < len(by_access) and by_access[len(evicted)][1][1] < cutoff:
+                evicted.append(by_access[len(evicted)][0])
+        
+        if max_size is not None:
+            live_size = sum(size for _, (size, _) in by_access[len(evicted):])
+            for cache_key, (size, _) in by_access[len(evicted):]:
+                if live_size <= max_size:
+                    break
+                evicted.append(cache_key)
+                live_size -= size
+        
+        # Compaction also reclaims space held by superseded records
+        if evicted or (max_size is not None and size_before > max_size):
+            self.store.evict(evicted)
+        
+        evicted_keys = set(evicted)
+        remaining = {cache_key.split("-", 1)[0] for cache_key in records if cache_key not in evicted_keys}
+        self.index.prune_entries(lambda content_hash: content_hash in remaining)
+        
+        stats = self.get_stats()
+        stats["evicted_records"] = len(evicted)
+        stats["freed_bytes"] = max(size_before - stats.get("total_size_bytes", size_before), 0)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} cache records, freed {stats['freed_bytes']} bytes")
+        return stats
+    
+    def _disk_size(self) -> int:
+        return sum(f.stat().st_size for f in self.store.files())
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         try:
-            total_entries = len(self.metadata["entries"])
+            total_entries = self.index.count()
             
             # Count actual cache files
-            cache_files = list(self.cache_dir.rglob("*.pkl"))
+            cache_files = self.store.files()
             total_files = len(cache_files)
             
             # Calculate total size
@@ -172,6 +461,7 @@ class CacheManager:
             
             return {
                 "total_entries": total_entries,
+                "total_records": len(self.store.record_stats()),
                 "total_files": total_files,
                 "total_size_bytes": total_size,
                 "total_size_mb": round(total_size / (1024 * 1024), 2),
@@ -183,27 +473,24 @@ class CacheManager:
             return {}
     
     def cleanup_orphaned(self):
-        """Remove orphaned cache files that are no longer referenced."""
+        """Remove cached records whose content is no longer referenced by the index."""
         try:
-            # Get all referenced cache keys
-            referenced_keys = set()
-            for entry in self.metadata["entries"].values():
-                referenced_keys.add(entry.get("cache_key"))
-            
-            # Find orphaned cache files
-            orphaned = []
-            for cache_file in self.cache_dir.rglob("*.pkl"):
-                cache_key = cache_file.stem
-                if cache_key not in referenced_keys:
-                    orphaned.append(cache_file)
-            
-            # Remove orphaned files
-            for cache_file in orphaned:
-                cache_file.unlink()
-                logger.debug(f"Removed orphaned cache file: {cache_file}")
+            with self.lock.exclusive():
+                self.index.reload()
+                
+                # Get all referenced content hashes
+                referenced_hashes = self.index.content_hashes()
+                
+                def is_referenced(cache_key: str) -> bool:
+                    return cache_key.split("-", 1)[0] in referenced_hashes
+                
+                orphaned = self.store.remove_unreferenced(is_referenced)
+                if self.store is not self.legacy_store:
+                    # Pickle records left behind by older versions are never read
+                    orphaned += self.legacy_store.remove_unreferenced(lambda cache_key: False)
             
             if orphaned:
-                logger.info(f"Cleaned up {len(orphaned)} orphaned cache files")
+                logger.info(f"Cleaned up {orphaned} orphaned cache records")
             
         except Exception as e:
-            logger.error(f"Cache cleanup failed: {e}")
\ No newline at end of file
+            logger.error(f"Cache cleanup failed: {e}")
@@ -0,0 +1,539 @@
+"""Storage backends for cached FileSummary records."""
+
+import io
+import json
+import mmap
+import os
+import pickle
+import re
+import shutil
+import tarfile
+import threading
+import time
+from itertools import repeat
+from operator import attrgetter
+from pathlib import Path
+from typing import Optional, Dict, Tuple, Callable, Iterable
+import logging
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from cbig.core.models import FileSummary, Dependency, Function, Class, Comment
+from cbig.core.interning import StringTable, interned_fields
+from cbig.cache.index import CacheIndex, ACCESS_RESOLUTION_NS
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the record layout below changes; segments written with another
+# format are ignored rather than misread
+RECORD_FORMAT = 3
+SEGMENT_MAGIC = b"CBIGSEG" + bytes([RECORD_FORMAT])
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+MANIFEST_NAME = "manifest.json"
+CACHE_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}(-[0-9a-f]{16})?$")
+
+# Records are path-independent so they can be shared between checkouts: the
+# file path and each symbol's "file" are filled in when a record is read.
+# Symbols are stored column by column, in record field order without "file".
+RECORD_TYPES = (Dependency, Function, Class, Comment)
+RECORD_FIELDS = {
+    record: tuple(field for field in record._fields if field != "file")
+    for record in RECORD_TYPES
+}
+# Column positions of names, paths and languages, stored as string table indexes
+RECORD_STRINGS = {
+    record: [
+        (position, interned[field])
+        for position, field in enumerate(RECORD_FIELDS[record])
+        if field in interned
+    ]
+    for record, interned in ((record, interned_fields(record)) for record in RECORD_TYPES)
+}
+_record_values = {record: attrgetter(*fields) for record, fields in RECORD_FIELDS.items()}
+_file_positions = {
+    record: record._fields.index("file") for record in RECORD_TYPES if "file" in record._fields
+}
+
+
+def _pack_records(record, records, ids) -> list:
+    """Transpose records into columns, replacing repeated strings by their id."""
+    if not records:
+        return []
+    columns = [list(column) for column in zip(*map(_record_values[record], records))]
+    for position, kind in RECORD_STRINGS[record]:
+        if kind == "str":
+            columns[position] = list(map(ids, columns[position]))
+        else:
+            columns[position] = [list(map(ids, values)) for values in columns[position]]
+    return columns
+
+
+def _unpack_records(record, columns: list, strings: list, symbol_file: str) -> list:
+    """Rebuild records from columns written by _pack_records."""
+    if not columns:
+        return []
+    lookup = strings.__getitem__
+    for position, kind in RECORD_STRINGS[record]:
+        if kind == "str":
+            columns[position] = map(lookup, columns[position])
+        else:
+            columns[position] = [tuple(map(lookup, values)) for values in columns[position]]
+    if record in _file_positions:
+        columns.insert(_file_positions[record], repeat(symbol_file))
+    return list(map(record._make, zip(*columns)))
+
+
+def encode_summary(summary: FileSummary) -> bytes:
+    """
+    Pack a FileSummary into msgpack.
+
+    The record starts with its own string table; the language and the
+    names, kinds and sources of its symbols refer to it by index, so a
+    string repeated across symbols is stored once.
+    """
+    strings = StringTable()
+    ids = strings.__getitem__
+    return msgpack.packb((
+        ids(summary.language),
+        summary.loc,
+        _pack_records(Dependency, summary.dependencies, ids),
+        _pack_records(Function, summary.functions, ids),
+        _pack_records(Class, summary.classes, ids),
+        _pack_records(Comment, summary.comments, ids),
+        strings.strings,
+    ))
+
+
+def decode_summary(data, file_path: str, symbol_file: str) -> FileSummary:
+    """Unpack a record written by encode_summary, binding it to a file."""
+    language, loc, deps, funcs, classes, comments, strings = msgpack.unpackb(data)
+    return FileSummary(
+        file_path=file_path,
+        language=strings[language],
+        loc=loc,
+        dependencies=_unpack_records(Dependency, deps, strings, symbol_file),
+        functions=_unpack_records(Function, funcs, strings, symbol_file),
+        classes=_unpack_records(Class, classes, strings, symbol_file),
+        comments=_unpack_records(Comment, comments, strings, symbol_file),
+    )
+
+
+def bind_summary(summary: FileSummary, file_path: str, symbol_file: str) -> FileSummary:
+    """Point a cached summary and its symbols at the file being analyzed."""
+    summary.file_path = file_path
+    summary.functions = [func._replace(file=symbol_file) for func in summary.functions]
+    summary.classes = [cls._replace(file=symbol_file) for cls in summary.classes]
+    summary.comments = [comment._replace(file=symbol_file) for comment in summary.comments]
+    return summary
+
+
+def _add_bytes(tar: tarfile.TarFile, name: str, data: bytes):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(data))
+
+
+def _read_manifest(tar: tarfile.TarFile, store: str) -> dict:
+    """Read and check the manifest of a cache archive."""
+    try:
+        member = tar.getmember(MANIFEST_NAME)
+    except KeyError:
+        raise ValueError("Cache archive has no manifest") from None
+    if not member.isfile():
+        raise ValueError("Cache archive has no manifest")
+    manifest = json.load(tar.extractfile(member))
+    if manifest.get("store") != store:
+        raise ValueError(f"Cache archive holds {manifest.get('store')} records, this cache uses {store}")
+    return manifest
+
+
+class PickleStore:
+    """Legacy layout: one pickle file per cache key under cache_dir/xx/."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    def _get_cache_file_path(self, cache_key: str) -> Path:
+        """Get the cache file path for a given cache key."""
+        # Use first 2 chars of hash for subdirectory to avoid too many files in one dir
+        subdir = cache_key[:2]
+        cache_subdir = self.cache_dir / subdir
+        cache_subdir.mkdir(exist_ok=True)
+        return cache_subdir / f"{cache_key}.pkl"
+
+    def read(self, cache_key: str, file_path: str, symbol_file: str) -> Optional[FileSummary]:
+        """Load the record for a cache key bound to a file, or None if absent."""
+        cache_file = self._get_cache_file_path(cache_key)
+        if not cache_file.exists():
+            return None
+
+        with open(cache_file, 'rb') as f:
+            summary = pickle.load(f)
+
+        # The file mtime doubles as the record's last access time
+        now = time.time_ns()
+        if now - cache_file.stat().st_mtime_ns >= ACCESS_RESOLUTION_NS:
+            os.utime(cache_file, ns=(now, now))
+
+        return bind_summary(summary, file_path, symbol_file)
+
+    def write(self, cache_key: str, result: FileSummary):
+        """Store the record for a cache key."""
+        with open(self._get_cache_file_path(cache_key), 'wb') as f:
+            pickle.dump(result, f)
+
+    def files(self):
+        """Return the files holding cached records."""
+        return list(self.cache_dir.rglob("*.pkl"))
+
+    def remove_unreferenced(self, is_referenced: Callable[[str], bool]) -> int:
+        """Delete records whose key is not referenced; returns the count removed."""
+        orphaned = [f for f in self.files() if not is_referenced(f.stem)]
+        for cache_file in orphaned:
+            cache_file.unlink()
+            logger.debug(f"Removed orphaned cache file: {cache_file}")
+        return len(orphaned)
+
+    def record_stats(self) -> Dict[str, Tuple[int, int]]:
+        """Return (size, last_access_ns) for every record."""
+        stats = {}
+        for cache_file in self.files():
+            st = cache_file.stat()
+            stats[cache_file.stem] = (st.st_size, st.st_mtime_ns)
+        return stats
+
+    def evict(self, cache_keys: Iterable[str]):
+        """Delete the records for the given keys."""
+        for cache_key in cache_keys:
+            self._get_cache_file_path(cache_key).unlink(missing_ok=True)
+
+    def clear(self):
+        """Remove all records."""
+        for cache_file in self.files():
+            cache_file.unlink()
+
+    def export_to(self, tar: tarfile.TarFile) -> int:
+        """Add every record to a tar archive; returns the record count."""
+        files = self.files()
+        for cache_file in files:
+            tar.add(cache_file, arcname=f"records/{cache_file.name}")
+        _add_bytes(tar, MANIFEST_NAME, json.dumps({"store": "pickle"}).encode('utf-8'))
+        return len(files)
+
+    def import_from(self, tar: tarfile.TarFile) -> int:
+        """
+        Copy records missing from this cache out of a tar archive.
+
+        Pickle records execute code when loaded; only import archives you trust.
+        """
+        _read_manifest(tar, "pickle")
+        imported = 0
+        for member in tar.getmembers():
+            name = member.name
+            if not (member.isfile() and name.startswith("records/") and name.endswith(".pkl")):
+                continue
+            cache_key = name[len("records/"):-len(".pkl")]
+            if not CACHE_KEY_PATTERN.match(cache_key):
+                continue
+            cache_file = self._get_cache_file_path(cache_key)
+            if cache_file.exists():
+                continue
+            with tar.extractfile(member) as src, open(cache_file, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            imported += 1
+        return imported
+
+    def close(self):
+        """Nothing to release."""
+
+
+class SegmentStore:
+    """
+    Packed layout: msgpack records appended to a few segment files.
+
+    Record locations live in the CacheIndex, so a lookup is one in-memory
+    dict probe plus a slice of a memory-mapped segment. Each writer holds
+    an advisory lock on the segment it appends to, so concurrent cbig
+    processes never interleave writes within a segment. Writes are
+    unbuffered, so a record is in the segment before its location can
+    reach the index. Reads are noted in the index for LRU eviction.
+    """
+
+    def __init__(self, cache_dir: Path, index: CacheIndex):
+        self.segments_dir = Path(cache_dir) / "segments"
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        self.index = index
+        self._lock = threading.Lock()
+        self._maps: Dict[int, Optional[mmap.mmap]] = {}
+        self._writer = None
+        self._writer_segment: Optional[int] = None
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.segments_dir / f"seg-{segment:06d}.bin"
+
+    def _segment_ids(self):
+        ids = []
+        for path in self.segments_dir.glob("seg-*.bin"):
+            try:
+                ids.append(int(path.stem[4:]))
+            except ValueError:
+                continue
+        return sorted(ids)
+
+    def _map_locked(self, segment: int, end: int) -> Optional[mmap.mmap]:
+        """Return a mapping of a segment that covers at least `end` bytes."""
+        mapped = self._maps.get(segment)
+        if mapped is not None and len(mapped) >= end:
+            return mapped
+
+        # Not mapped yet, or the segment grew since it was mapped
+        if mapped is not None:
+            mapped.close()
+        self._maps.pop(segment, None)
+
+        try:
+            with open(self._segment_path(segment), 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if mapped[:len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+            mapped.close()
+            return None
+
+        self._maps[segment] = mapped
+        return mapped
+
+    def read(self, cache_key: str, file_path: str, symbol_file: str) -> Optional[FileSummary]:
+        """Load the record for a cache key bound to a file, or None if absent."""
+        location = self.index.get_blob(cache_key)
+        if location is None:
+            return None
+
+        segment, offset, length = location
+        with self._lock:
+            mapped = self._map_locked(segment, offset + length)
+            if mapped is None or len(mapped) < offset + length:
+                return None
+            data = mapped[offset:offset + length]
+
+        self.index.touch_blob(cache_key)
+        return decode_summary(data, file_path, symbol_file)
+
+    def write(self, cache_key: str, result: FileSummary):
+        """Append the record for a cache key to the active segment."""
+        data = encode_summary(result)
+        with self._lock:
+            if self._writer is None:
+                self._open_writer_locked()
+            elif self._writer.tell() + len(data) > SEGMENT_MAX_BYTES:
+                self._open_writer_locked(reuse=False)
+            offset = self._writer.tell()
+            self._writer.write(data)
+            segment = self._writer_segment
+
+        self.index.put_blob(cache_key, (segment, offset, len(data)))
+
+    def _open_writer_locked(self, reuse: bool = True):
+        """Open a segment for appending, reusing the newest one if it is free."""
+        self._close_writer_locked()
+        segment_ids = self._segment_ids()
+
+        if reuse and segment_ids:
+            segment = segment_ids[-1]
+            path = self._segment_path(segment)
+            if path.stat().st_size < SEGMENT_MAX_BYTES:
+                writer = open(path, 'r+b', buffering=0)
+                if writer.read(len(SEGMENT_MAGIC)) == SEGMENT_MAGIC and self._try_lock(writer):
+                    writer.seek(0, 2)
+                    self._writer, self._writer_segment = writer, segment
+                    return
+                writer.close()
+
+        segment, writer = self._create_segment(segment_ids)
+        self._try_lock(writer)
+        writer.write(SEGMENT_MAGIC)
+        self._writer, self._writer_segment = writer, segment
+
+    def _create_segment(self, segment_ids):
+        """Create the next unused segment file; returns (segment, unbuffered file)."""
+        segment = segment_ids[-1] + 1 if segment_ids else 0
+        while True:
+            try:
+                return segment, open(self._segment_path(segment), 'xb', buffering=0)
+            except FileExistsError:
+                segment += 1
+
+    @staticmethod
+    def _try_lock(f) -> bool:
+        """Take a non-blocking exclusive lock on an open segment."""
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _close_writer_locked(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._writer_segment = None
+
+    def _close_maps_locked(self):
+        for mapped in self._maps.values():
+            if mapped is not None:
+                mapped.close()
+        self._maps.clear()
+
+    def files(self):
+        """Return the files holding cached records."""
+        return [self._segment_path(segment) for segment in self._segment_ids()]
+
+    def remove_unreferenced(self, is_referenced: Callable[[str], bool]) -> int:
+        """
+        Drop records whose key is not referenced and compact the segments.
+
+        Live records are copied into fresh segments and the old segment
+        files are deleted. Returns the number of records dropped.
+        """
+        blobs = self.index.blobs()
+        live = {key: location for key, location in blobs.items() if is_referenced(key)}
+        removed = len(blobs) - len(live)
+        self.compact(live)
+        return removed
+
+    def record_stats(self) -> Dict[str, Tuple[int, int]]:
+        """Return (size, last_access_ns) for every record."""
+        return self.index.blob_stats()
+
+    def evict(self, cache_keys: Iterable[str]):
+        """Drop the records for the given keys and compact the segments."""
+        evicted = set(cache_keys)
+        self.compact({
+            key: location for key, location in self.index.blobs().items()
+            if key not in evicted
+        })
+
+    def compact(self, live: Dict[str, Tuple[int, int, int]]):
+        """
+        Rewrite the given records into new segments and delete the old ones.
+
+        The caller holds the cache's exclusive lock and has reloaded the
+        index, so no other process is appending to a segment and `live`
+        plus the records being dropped cover every record in the old
+        segments. Only those records' index rows are touched: live ones
+        are moved, the rest of the rows in the old segments deleted.
+        """
+        with self._lock:
+            old_segments = self._segment_ids()
+            rewritten = set(old_segments)
+
+            # Read every live record before any segment is replaced
+            records = []
+            for key, (segment, offset, length) in sorted(live.items(), key=lambda item: item[1]):
+                mapped = self._map_locked(segment, offset + length)
+                if mapped is not None and len(mapped) >= offset + length:
+                    records.append((key, mapped[offset:offset + length]))
+
+            self._close_maps_locked()
+            self._open_writer_locked(reuse=False)
+
+            moved = {}
+            for key, data in records:
+                if self._writer.tell() + len(data) > SEGMENT_MAX_BYTES:
+                    self._open_writer_locked(reuse=False)
+                moved[key] = (self._writer_segment, self._writer.tell(), len(data))
+                self._writer.write(data)
+
+            # Dropped, evicted and unreadable records of the rewritten segments
+            removed = [
+                key for key, location in self.index.blobs().items()
+                if location[0] in rewritten and key not in moved
+            ]
+            self.index.move_blobs(moved, removed)
+
+            for segment in old_segments:
+                self._segment_path(segment).unlink(missing_ok=True)
+
+    def export_to(self, tar: tarfile.TarFile) -> int:
+        """Add every segment holding a live record to a tar archive; returns the record count."""
+        blobs = self.index.blobs()
+        for segment in sorted({location[0] for location in blobs.values()}):
+            tar.add(self._segment_path(segment), arcname=f"segments/{segment}")
+
+        manifest = {
+            "store": "packed",
+            "format": RECORD_FORMAT,
+            "blobs": {key: list(location) for key, location in blobs.items()}
+        }
+        _add_bytes(tar, MANIFEST_NAME, json.dumps(manifest).encode('utf-8'))
+        return len(blobs)
+
+    def import_from(self, tar: tarfile.TarFile) -> int:
+        """
+        Copy records missing from this cache out of a tar archive.
+
+        Imported segments are renumbered after the existing ones, so an
+        archive can be merged into a cache that is already in use.
+        """
+        manifest = _read_manifest(tar, "packed")
+        if manifest.get("format") != RECORD_FORMAT:
+            raise ValueError(f"Cache archive uses record format {manifest.get('format')}, expected {RECORD_FORMAT}")
+
+        existing = self.index.blobs()
+        wanted = {
+            key: tuple(location) for key, location in manifest.get("blobs", {}).items()
+            if key not in existing
+        }
+
+        renumbered = {}
+        with self._lock:
+            for old_segment in sorted({location[0] for location in wanted.values()}):
+                try:
+                    member = tar.getmember(f"segments/{old_segment}")
+                except KeyError:
+                    continue
+                if not member.isfile():
+                    continue
+                with tar.extractfile(member) as src:
+                    if src.read(len(SEGMENT_MAGIC)) != SEGMENT_MAGIC:
+                        continue
+                    segment, dst = self._create_segment(self._segment_ids())
+                    with dst:
+                        dst.write(SEGMENT_MAGIC)
+                        shutil.copyfileobj(src, dst)
+                renumbered[old_segment] = segment
+
+        imported = 0
+        for key, (old_segment, offset, length) in wanted.items():
+            if old_segment in renumbered:
+                self.index.put_blob(key, (renumbered[old_segment], offset, length))
+                imported += 1
+        return imported
+
+    def clear(self):
+        """Remove all records."""
+        with self._lock:
+            self._close_writer_locked()
+            self._close_maps_locked()
+            for segment in self._segment_ids():
+                self._segment_path(segment).unlink(missing_ok=True)
+
+    def close(self):
+        """Close the active segment and release mappings."""
+        with self._lock:
+            self._close_writer_locked()
+            self._close_maps_locked()
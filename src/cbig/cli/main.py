@@ -5,12 +5,16 @@ from typing import Optional, List
 from pathlib import Path
 import sys
 import os
+import tarfile
 from rich.console import Console
 from rich.logging import RichHandler
 import logging
 
-from cbig.core.processor import CBIGProcessor
+from cbig.core.processor import CBIGProcessor, EXECUTORS, LARGE_FILE_POLICIES
+from cbig.core.walker import WALKER_MODES
+from cbig.core.inputs import InputError
 from cbig.core.models import LANGUAGE_CONFIGS
+from cbig.cache.manager import CacheManager, VALIDATION_MODES, parse_size, parse_age
 
 app = typer.Typer(
     name="cbig",
@@ -18,6 +22,12 @@ app = typer.Typer(
     rich_markup_mode="rich"
 )
 
+cache_app = typer.Typer(
+    name="cache",
+    help="Inspect and maintain the AST cache"
+)
+app.add_typer(cache_app, name="cache")
+
 console = Console()
 
 
@@ -42,7 +52,7 @@ def main(
     path: str = typer.Option(
         ".",
         "--path", "-p",
-        help="Root path (local directory, git URL, or archive)"
+        help="Root path (local directory, archive (.tar.gz, .zip, ...), bare git repository or file:// git URL)"
     ),
     language: Optional[str] = typer.Option(
         None,
@@ -94,6 +104,11 @@ def main(
         "--out", "-o",
         help="File path for structured report"
     ),
+    string_table: bool = typer.Option(
+        False,
+        "--string-table",
+        help="Write names, paths and languages once in a strings table and refer to them by index (json/yaml)"
+    ),
     summary: bool = typer.Option(
         True,
         "--summary/--no-summary",
@@ -129,6 +144,31 @@ def main(
         "--max-workers", "-j",
         help="Parallel workers (default = CPU count)"
     ),
+    executor: str = typer.Option(
+        "thread",
+        "--executor",
+        help="Parse executor: thread or process (process scales parsing across cores)"
+    ),
+    walker: str = typer.Option(
+        "scandir",
+        "--walker",
+        help="File discovery: scandir (walk the tree) or git (list files from the git index; blob ids spare cache hashing)"
+    ),
+    walk_threads: int = typer.Option(
+        1,
+        "--walk-threads",
+        help="Directories listed concurrently while walking (helps on NFS and other high-latency filesystems)"
+    ),
+    max_file_size: Optional[str] = typer.Option(
+        None,
+        "--max-file-size",
+        help="Do not parse files larger than this (e.g. 5MB); see --large-files"
+    ),
+    large_files: str = typer.Option(
+        "summarize",
+        "--large-files",
+        help="Files above --max-file-size: summarize (count lines only) or skip"
+    ),
     cache_dir: Optional[str] = typer.Option(
         None,
         "--cache-dir",
@@ -139,6 +179,31 @@ def main(
         "--clear-cache",
         help="Clear cache before processing"
     ),
+    cache_validation: str = typer.Option(
+        "stat",
+        "--cache-validation",
+        help="Cache validation: stat (trust size/mtime/inode) or hash (always hash content)"
+    ),
+    cache_max_size: Optional[str] = typer.Option(
+        None,
+        "--cache-max-size",
+        help="Evict least recently used cache records above this size (e.g. 2GB)"
+    ),
+    cache_max_age: Optional[str] = typer.Option(
+        None,
+        "--cache-max-age",
+        help="Evict cache records not used for this long (e.g. 30d, 12h)"
+    ),
+    since: Optional[str] = typer.Option(
+        None,
+        "--since",
+        help="Only re-analyze files changed since this git revision (needs --snapshot)"
+    ),
+    snapshot: Optional[str] = typer.Option(
+        None,
+        "--snapshot",
+        help="Snapshot file: written by full runs, read by --since runs"
+    ),
     verbose: bool = typer.Option(
         False,
         "--verbose", "-v",
@@ -158,6 +223,14 @@ def main(
         cbig -p . --by-dir --output-dir docs/     # Per-directory markdown
         cbig -p src/user.py --by-file              # Single file analysis
         cbig -p . --format yaml -o report.yaml    # Structured output only
+        cbig -p . -j 16 --executor process         # Parse on 16 worker processes
+        cbig -p . --max-file-size 5MB --large-files skip  # Leave out huge generated files
+        cbig -p . --cache-dir .cache --cache-max-size 1GB  # Bounded cache
+        cbig -p . --walker git --cache-dir .cache  # Files and blob ids from the git index
+        cbig -p /mnt/nfs/repo --walk-threads 16    # List directories concurrently on NFS
+        cbig -p release-1.2.tar.gz -f json -o r.json  # Read an archive without extracting it
+        cbig -p file:///srv/git/project.git        # Read HEAD from a repository's object store
+        cbig -p . --snapshot snap.json --since main  # Re-analyze files changed since main
     """
     setup_logging(verbose, quiet)
     logger = logging.getLogger(__name__)
@@ -183,6 +256,38 @@ def main(
             section, field = sort_rule.split("=", 1)
             sort_options[section] = field
         
+        if executor not in EXECUTORS:
+            console.print(f"[red]Error: Unknown executor '{executor}'. Use one of: {', '.join(EXECUTORS)}[/red]")
+            raise typer.Exit(1)
+        
+        if walker not in WALKER_MODES:
+            console.print(f"[red]Error: Unknown walker '{walker}'. Use one of: {', '.join(WALKER_MODES)}[/red]")
+            raise typer.Exit(1)
+        
+        if walk_threads < 1:
+            console.print("[red]Error: --walk-threads must be at least 1[/red]")
+            raise typer.Exit(1)
+        
+        if large_files not in LARGE_FILE_POLICIES:
+            console.print(f"[red]Error: Unknown large file policy '{large_files}'. Use one of: {', '.join(LARGE_FILE_POLICIES)}[/red]")
+            raise typer.Exit(1)
+        
+        if cache_validation not in VALIDATION_MODES:
+            console.print(f"[red]Error: Unknown cache validation '{cache_validation}'. Use one of: {', '.join(VALIDATION_MODES)}[/red]")
+            raise typer.Exit(1)
+        
+        if since and not snapshot:
+            console.print("[red]Error: --since needs --snapshot pointing at the snapshot of a full run[/red]")
+            raise typer.Exit(1)
+        
+        try:
+            max_size_bytes = parse_size(cache_max_size) if cache_max_size else None
+            max_age_seconds = parse_age(cache_max_age) if cache_max_age else None
+            max_file_bytes = parse_size(max_file_size) if max_file_size else None
+        except ValueError as e:
+            console.print(f"[red]Error: {e}[/red]")
+            raise typer.Exit(1)
+        
         # Set max_workers to CPU count if not specified
         if max_workers is None:
             max_workers = os.cpu_count()
@@ -204,6 +309,7 @@ def main(
             "output_dir": output_dir,
             "format": format,
             "out": out,
+            "string_table": string_table,
             "sections": {
                 "summary": summary,
                 "deps": deps,
@@ -213,8 +319,18 @@ def main(
             },
             "sort_options": sort_options,
             "max_workers": max_workers,
+            "executor": executor,
+            "walker": walker,
+            "walk_threads": walk_threads,
+            "max_file_size": max_file_bytes,
+            "large_files": large_files,
             "cache_dir": cache_dir,
-            "clear_cache": clear_cache
+            "clear_cache": clear_cache,
+            "cache_validation": cache_validation,
+            "cache_max_size": max_size_bytes,
+            "cache_max_age": max_age_seconds,
+            "since": since,
+            "snapshot": snapshot
         }
         
         # Create and run processor
@@ -229,6 +345,8 @@ def main(
         
         sys.exit(0)
         
+    except typer.Exit:
+        raise
     except KeyboardInterrupt:
         console.print("[yellow]⚠️  Operation cancelled by user[/yellow]")
         sys.exit(1)
@@ -238,6 +356,9 @@ def main(
     except PermissionError as e:
         console.print(f"[red]Error: Permission denied: {e}[/red]")
         sys.exit(3)
+    except InputError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(3)
     except Exception as e:
         logger.exception("Unexpected error occurred")
         console.print(f"[red]Error: {e}[/red]")
@@ -264,5 +385,112 @@ def languages():
         console.print()
 
 
+@cache_app.command("migrate")
+def cache_migrate(
+    cache_dir: str = typer.Option(
+        ...,
+        "--cache-dir",
+        help="Cache directory to migrate"
+    )
+):
+    """Migrate a cache from the legacy metadata.json layout to the SQLite index."""
+    setup_logging()
+    cache_path = Path(cache_dir)
+    if not (cache_path / "metadata.json").exists():
+        console.print(f"[yellow]No legacy metadata.json in {cache_path}, nothing to migrate[/yellow]")
+        raise typer.Exit(0)
+    
+    manager = CacheManager(cache_path)
+    stats = manager.get_stats()
+    manager.close()
+    console.print(f"[green]✅ Cache migrated[/green]")
+    console.print(f"Indexed entries: {stats.get('total_entries', 0)}")
+
+
+@cache_app.command("export")
+def cache_export(
+    cache_dir: str = typer.Option(
+        ...,
+        "--cache-dir",
+        help="Cache directory to export"
+    ),
+    output: str = typer.Option(
+        ...,
+        "--output", "-o",
+        help="Tarball to write (e.g. cbig-cache.tar.gz)"
+    )
+):
+    """Pack all cached records into a single tarball for sharing between checkouts."""
+    setup_logging()
+    manager = CacheManager(Path(cache_dir))
+    count = manager.export_archive(Path(output))
+    manager.close()
+    console.print(f"[green]✅ Exported {count} cache records to {output}[/green]")
+
+
+@cache_app.command("import")
+def cache_import(
+    cache_dir: str = typer.Option(
+        ...,
+        "--cache-dir",
+        help="Cache directory to import into (created if missing)"
+    ),
+    input: str = typer.Option(
+        ...,
+        "--input", "-i",
+        help="Tarball written by 'cbig cache export'"
+    )
+):
+    """Merge the records of an exported cache tarball into a cache directory."""
+    setup_logging()
+    manager = CacheManager(Path(cache_dir))
+    try:
+        count = manager.import_archive(Path(input))
+    except (ValueError, tarfile.TarError) as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+    finally:
+        manager.close()
+    console.print(f"[green]✅ Imported {count} cache records into {cache_dir}[/green]")
+
+
+@cache_app.command("gc")
+def cache_gc(
+    cache_dir: str = typer.Option(
+        ...,
+        "--cache-dir",
+        help="Cache directory to collect"
+    ),
+    max_size: Optional[str] = typer.Option(
+        None,
+        "--max-size",
+        help="Evict least recently used records above this size (e.g. 2GB)"
+    ),
+    max_age: Optional[str] = typer.Option(
+        None,
+        "--max-age",
+        help="Evict records not used for this long (e.g. 30d, 12h)"
+    )
+):
+    """Evict old or least recently used cache records and report cache statistics."""
+    setup_logging()
+    try:
+        max_size_bytes = parse_size(max_size) if max_size else None
+        max_age_seconds = parse_age(max_age) if max_age else None
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+    
+    manager = CacheManager(Path(cache_dir))
+    stats = manager.gc(max_size=max_size_bytes, max_age=max_age_seconds)
+    manager.close()
+    
+    console.print(f"[green]✅ Evicted {stats.get('evicted_records', 0)} records, freed {stats.get('freed_bytes', 0):,} bytes[/green]")
+    console.print(f"Entries: {stats.get('total_entries', 0)}")
+    console.print(f"Records: {stats.get('total_records', 0)}")
+    console.print(f"Files: {stats.get('total_files', 0)}")
+    console.print(f"Size: {stats.get('total_size_mb', 0)} MB")
+
+
 if __name__ == "__main__":
-    app()
\ No newline at end of file
+    app()
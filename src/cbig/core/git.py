@@ -0,0 +1,205 @@
+"""Thin wrappers around the git command line."""
+
+import os
+import subprocess
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Index modes of entries that are not regular files
+SYMLINK_MODE = "120000"
+GITLINK_MODE = "160000"
+
+
+class GitError(RuntimeError):
+    """Raised when a git command fails or git is not available."""
+
+
+def run_git(root_path: Path, *args: str) -> bytes:
+    """Run a git command in root_path and return its raw stdout."""
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=root_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False
+        )
+    except FileNotFoundError:
+        raise GitError("git executable not found")
+
+    if result.returncode != 0:
+        message = result.stderr.decode('utf-8', errors='replace').strip()
+        raise GitError(f"git {' '.join(args)} failed: {message}")
+    return result.stdout
+
+
+def _split_z(output: bytes) -> List[str]:
+    return [item.decode('utf-8', errors='surrogateescape') for item in output.split(b"\0") if item]
+
+
+def resolve_revision(root_path: Path, revision: str = "HEAD") -> str:
+    """Return the commit id a revision points at."""
+    output = run_git(root_path, "rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}")
+    return output.decode('ascii').strip()
+
+
+def changed_paths(root_path: Path, revision: str) -> Tuple[List[str], List[str]]:
+    """
+    List paths that differ between a revision and the working tree.
+
+    Covers committed, staged, unstaged and untracked (but not ignored)
+    changes. Renames are reported as a delete plus an add. Paths are
+    relative to root_path, and only paths under it are returned.
+
+    Returns (changed, deleted).
+    """
+    fields = _split_z(run_git(
+        root_path, "diff", "--name-status", "--no-renames", "--relative", "-z", revision, "--"
+    ))
+
+    changed, deleted = [], []
+    # -z output alternates status and path
+    for status, path in zip(fields[0::2], fields[1::2]):
+        (deleted if status == "D" else changed).append(path)
+
+    changed.extend(_split_z(run_git(root_path, "ls-files", "--others", "--exclude-standard", "-z")))
+    return changed, deleted
+
+
+def list_files(root_path: Path) -> List[Tuple[str, Optional[str]]]:
+    """
+    List the files git sees under root_path, with their blob ids.
+
+    Tracked files come first, in index order, then untracked files that
+    are not ignored. A tracked file gets its index blob id if its working
+    tree content matches the index; modified, conflicted, symlinked and
+    untracked files get None. Submodules are left out. Paths are relative
+    to root_path.
+    """
+    modified = set(_split_z(run_git(root_path, "ls-files", "--modified", "-z")))
+
+    files = {}
+    for line in _split_z(run_git(root_path, "ls-files", "--stage", "-z")):
+        info, path = line.split("\t", 1)
+        mode, blob_id, stage = info.split(" ")
+        if mode == GITLINK_MODE:
+            continue
+        # Conflicted paths are listed once per stage
+        if stage != "0" or mode == SYMLINK_MODE or path in modified or path in files:
+            blob_id = None
+        files[path] = blob_id
+
+    for path in _split_z(run_git(root_path, "ls-files", "--others", "--exclude-standard", "-z")):
+        files.setdefault(path, None)
+    return list(files.items())
+
+
+def list_tree(git_dir: Path, revision: str = "HEAD") -> List[Tuple[str, str, int]]:
+    """
+    List the files of a revision as (path, blob id, size), from the object store.
+
+    Works in bare repositories, since no work tree is involved. Symlinks
+    and submodules are left out. Paths are relative to the repository root.
+    """
+    files = []
+    for line in _split_z(run_git(git_dir, "ls-tree", "-r", "-l", "-z", "--full-tree", revision, "--")):
+        info, path = line.split("\t", 1)
+        mode, object_type, blob_id, size = info.split()
+        if object_type != "blob" or mode == SYMLINK_MODE:
+            continue
+        files.append((path, blob_id, int(size)))
+    return files
+
+
+def is_bare_repository(path: Path) -> bool:
+    """Whether path is a git directory itself (a bare repository), without running git."""
+    return (path / "HEAD").is_file() and (path / "objects").is_dir() and (path / "refs").is_dir()
+
+
+class BlobReader:
+    """
+    Reads blobs from a repository's object store through `git cat-file --batch`.
+
+    One git process serves every read. Reads may come from several
+    threads; they are serialized on the process's pipes.
+    """
+
+    def __init__(self, git_dir: Path):
+        try:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=git_dir,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            raise GitError("git executable not found")
+        self._lock = threading.Lock()
+
+    def read(self, blob_id: str) -> bytes:
+        """Return a blob's content."""
+        with self._lock:
+            self._process.stdin.write(blob_id.encode('ascii') + b"\n")
+            self._process.stdin.flush()
+            # "<id> blob <size>", or "<id> missing"
+            header = self._process.stdout.readline().split()
+            if len(header) != 3:
+                raise GitError(f"git cat-file cannot read blob {blob_id}")
+            data = self._process.stdout.read(int(header[2]))
+            self._process.stdout.read(1)
+        return data
+
+    def close(self):
+        """Stop the git process."""
+        with self._lock:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process.stdout.close()
+
+
+def find_repository(path: Path) -> Optional[Tuple[Path, Path]]:
+    """
+    Find the git work tree containing path, without running git.
+
+    Returns (work tree root, common git directory), or None outside a
+    repository. A .git file, as in linked work trees and submodules, is
+    followed to the git directory it names.
+    """
+    path = path.resolve()
+    for directory in (path, *path.parents):
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            return directory, dot_git
+        if dot_git.is_file():
+            try:
+                content = dot_git.read_text(encoding='utf-8').strip()
+                if not content.startswith("gitdir:"):
+                    return None
+                git_dir = (directory / content[len("gitdir:"):].strip()).resolve()
+                # Linked work trees share info/ and config with the main repository
+                common_dir = git_dir / "commondir"
+                if common_dir.is_file():
+                    git_dir = (git_dir / common_dir.read_text(encoding='utf-8').strip()).resolve()
+            except OSError:
+                return None
+            return directory, git_dir
+    return None
+
+
+def global_excludes_file(root_path: Path) -> Path:
+    """The core.excludesFile git uses in root_path, or its default location."""
+    try:
+        configured = run_git(root_path, "config", "--path", "--get", "core.excludesFile")
+    except GitError:
+        # Unset, or git is not installed
+        configured = b""
+    configured = configured.decode('utf-8', errors='surrogateescape').strip()
+    if configured:
+        return root_path / configured
+    config_home = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    return Path(config_home) / "git" / "ignore"
@@ -0,0 +1,180 @@
+"""Inputs read in place rather than walked on disk: archives and git object stores."""
+
+import os
+import stat
+from abc import ABC, abstractmethod
+import tarfile
+import zipfile
+from functools import partial
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+import logging
+
+from cbig.core.git import BlobReader, GitError, is_bare_repository, list_tree
+from cbig.core.walker import FileWalker, WalkEntry
+
+logger = logging.getLogger(__name__)
+
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+ZIP_SUFFIXES = (".zip",)
+
+
+class InputError(ValueError):
+    """Raised when --path names an archive or repository that cannot be read."""
+
+
+def is_archive(path: Path) -> bool:
+    """Whether a path names a tar or zip archive, by its suffix."""
+    return path.name.lower().endswith(TAR_SUFFIXES + ZIP_SUFFIXES)
+
+
+def member_stat(size: int) -> os.stat_result:
+    """A stat result for a regular file of `size` bytes that is not on disk."""
+    return os.stat_result((stat.S_IFREG | 0o644, 0, 0, 1, 0, 0, size, 0, 0, 0))
+
+
+def _member_path(name: str) -> Optional[str]:
+    """A member name as a '/'-separated relative path, or None if it points outside the archive."""
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or ".." in parts:
+        return None
+    return "/".join(parts)
+
+
+class StoredInput(ABC):
+    """
+    Files read from an archive or object store instead of a directory.
+
+    `root` stands in for the tree's root directory: files are named
+    root / their path inside the input, and scan() yields WalkEntry
+    records whose `load` returns their bytes.
+    """
+
+    def __init__(self, root: Path, walker: FileWalker):
+        self.root = root
+        self.walker = walker
+
+    @abstractmethod
+    def scan(self) -> Iterator[WalkEntry]:
+        """Yield a WalkEntry per file that passes the walker's patterns."""
+
+    def close(self):
+        """Release whatever the input holds open."""
+
+
+class ArchiveInput(StoredInput):
+    """
+    A tar or zip archive, read without extracting it.
+
+    Tar archives are streamed in one pass: a compressed tar cannot be
+    read out of order cheaply, so each member's bytes are read as it goes
+    by and handed over in memory. Zip archives have a central directory,
+    so members are listed up front and each is decompressed on first use,
+    by whichever worker parses it.
+    """
+
+    def __init__(self, archive_path: Path, walker: FileWalker):
+        super().__init__(archive_path, walker)
+        self._zip = None
+        if archive_path.name.lower().endswith(ZIP_SUFFIXES):
+            try:
+                self._zip = zipfile.ZipFile(archive_path)
+            except zipfile.BadZipFile as e:
+                raise InputError(f"Cannot read {archive_path}: {e}") from e
+
+    def scan(self) -> Iterator[WalkEntry]:
+        if self._zip is not None:
+            yield from self._scan_zip()
+        else:
+            yield from self._scan_tar()
+
+    def _scan_tar(self) -> Iterator[WalkEntry]:
+        try:
+            with tarfile.open(self.root, mode="r|*") as tar:
+                for member in tar:
+                    if not member.isfile():
+                        continue
+                    relative = _member_path(member.name)
+                    if relative is None or not self.walker.matches(relative):
+                        continue
+                    data = tar.extractfile(member).read()
+                    yield WalkEntry(self.root / relative, member_stat(member.size), None, lambda data=data: data)
+        except (tarfile.TarError, EOFError) as e:
+            raise InputError(f"Cannot read {self.root}: {e}") from e
+
+    def _scan_zip(self) -> Iterator[WalkEntry]:
+        for info in self._zip.infolist():
+            # Unix modes are kept in the high bits of external_attr
+            if info.is_dir() or stat.S_ISLNK(info.external_attr >> 16):
+                continue
+            relative = _member_path(info.filename)
+            if relative is None or not self.walker.matches(relative):
+                continue
+            yield WalkEntry(self.root / relative, member_stat(info.file_size), None, partial(self._zip.read, info))
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+
+
+class GitObjectInput(StoredInput):
+    """
+    The files of a git revision, read from the repository's object store.
+
+    Works on bare repositories: the file list comes from the revision's
+    tree and file contents from a single `git cat-file --batch` process,
+    so nothing is checked out. Every file comes with its blob id, which
+    the cache uses to skip files it has seen before without reading them.
+    """
+
+    def __init__(self, git_dir: Path, walker: FileWalker, revision: str = "HEAD"):
+        super().__init__(git_dir, walker)
+        self.revision = revision
+        try:
+            self._reader = BlobReader(git_dir)
+        except (GitError, OSError) as e:
+            raise InputError(f"Cannot read {git_dir}: {e}") from e
+
+    def scan(self) -> Iterator[WalkEntry]:
+        try:
+            listed = list_tree(self.root, self.revision)
+        except GitError as e:
+            raise InputError(f"Cannot list {self.revision} of {self.root}: {e}") from e
+        for relative, blob_id, size in listed:
+            if self.walker.matches(relative):
+                yield WalkEntry(self.root / relative, member_stat(size), blob_id, partial(self._reader.read, blob_id))
+
+    def close(self):
+        self._reader.close()
+
+
+def open_input(path: str, walker: FileWalker) -> Optional[StoredInput]:
+    """
+    Open --path as a stored input, if it is one.
+
+    Tar and zip archives give an ArchiveInput; bare repositories and
+    file:// URLs (of bare or non-bare repositories) give a GitObjectInput
+    reading HEAD. Anything else is None, to be walked on disk. Remote git
+    URLs are not fetched and raise InputError.
+    """
+    if "://" in path:
+        url = urlparse(path)
+        if url.scheme != "file":
+            raise InputError(
+                f"Cannot analyze {path}: only file:// git URLs are supported, "
+                f"clone remote repositories with `git clone --bare` first"
+            )
+        git_dir = Path(url2pathname(url.path)).resolve()
+        logger.info(f"Reading HEAD of {git_dir} from its object store")
+        return GitObjectInput(git_dir, walker)
+
+    local_path = Path(path)
+    if local_path.is_file() and is_archive(local_path):
+        logger.info(f"Reading {local_path} without extracting it")
+        return ArchiveInput(local_path.resolve(), walker)
+    if local_path.is_dir() and is_bare_repository(local_path):
+        logger.info(f"Reading HEAD of bare repository {local_path} from its object store")
+        return GitObjectInput(local_path.resolve(), walker)
+    return None
@@ -0,0 +1,54 @@
+"""String tables for the repeated strings of symbol records."""
+
+from typing import Dict, List, Optional, get_type_hints
+
+from cbig.core.models import Dependency, Function, Class, Comment
+
+# Fields whose values are mostly distinct (free text, function and class
+# names). A table entry per value would share little, so they stay inline.
+INLINE_FIELDS = {
+    Dependency: set(),
+    Function: {"name", "signature", "docstring"},
+    Class: {"name", "doc"},
+    Comment: {"text"}
+}
+
+
+def _field_kind(record, field: str, hint) -> Optional[str]:
+    """'str' for a field of repeated strings, 'seq' for a sequence of them, None otherwise."""
+    if field in INLINE_FIELDS[record] or hint is int or hint is bool:
+        return None
+    if hint is str or hint == Optional[str]:
+        return "str"
+    return "seq"
+
+
+def interned_fields(record) -> Dict[str, str]:
+    """The fields of a record type whose strings go in a StringTable, and their kind."""
+    hints = get_type_hints(record)
+    kinds = {field: _field_kind(record, field, hints[field]) for field in record._fields}
+    return {field: kind for field, kind in kinds.items() if kind}
+
+
+class StringTable(dict):
+    """
+    A string dictionary for serialized output: each string once, by id.
+
+    Maps each string to a dense id, with id 0 standing for None. Cache
+    records and --string-table reports write `strings` once and refer to
+    it by id. Lookups of known strings are plain dict lookups, so columns
+    are filled with map(table.__getitem__, values).
+    """
+
+    def __init__(self):
+        super().__init__({None: 0})
+        self.strings: List[Optional[str]] = [None]
+
+    def __missing__(self, value: str) -> int:
+        string_id = self[value] = len(self.strings)
+        self.strings.append(value)
+        return string_id
+
+    def id(self, value: Optional[str]) -> int:
+        """Return the id of a string, adding it on first use."""
+        return self[value]
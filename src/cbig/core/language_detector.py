@@ -6,6 +6,7 @@ from typing import Optional, List, Dict
 import logging
 
 from cbig.core.models import LANGUAGE_CONFIGS
+from cbig.core.work import FileWork
 
 logger = logging.getLogger(__name__)
 
@@ -40,9 +41,23 @@ class LanguageDetector:
         
         Uses extension-based detection with content-based heuristics for ambiguous cases.
         """
-        if not file_path.is_file():
+        return self.detect(FileWork(file_path))
+    
+    def detect(self, work: FileWork) -> Optional[str]:
+        """
+        Detect the language of a work record and store it on the record.
+        
+        Heuristics look at the record's bytes, so a file they read is not
+        read again for hashing or parsing.
+        """
+        work.language = self._detect(work)
+        return work.language
+    
+    def _detect(self, work: FileWork) -> Optional[str]:
+        if not work.is_file():
             return None
         
+        file_path = work.path
         extension = file_path.suffix.lower()
         
         # Direct extension mapping
@@ -52,7 +67,7 @@ class LanguageDetector:
             # Apply content heuristics if available
             if extension in self.content_heuristics:
                 try:
-                    refined_language = self.content_heuristics[extension](file_path)
+                    refined_language = self.content_heuristics[extension](work)
                     if refined_language:
                         language = refined_language
                 except Exception as e:
@@ -62,15 +77,14 @@ class LanguageDetector:
         
         # Special cases for files without extensions
         if not extension:
-            return self._detect_extensionless_file(file_path)
+            return self._detect_extensionless_file(work)
         
         return None
     
-    def _detect_js_variant(self, file_path: Path) -> Optional[str]:
+    def _detect_js_variant(self, work: FileWork) -> Optional[str]:
         """Detect JavaScript variants (.js could be Node, React, etc.)."""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read(2048)  # Read first 2KB
+            content = work.text_head()  # First 2KB
             
             # Look for React JSX patterns
             jsx_patterns = [
@@ -101,14 +115,13 @@ class LanguageDetector:
         except Exception:
             return 'javascript'
     
-    def _detect_ts_variant(self, file_path: Path) -> Optional[str]:
+    def _detect_ts_variant(self, work: FileWork) -> Optional[str]:
         """Detect TypeScript variants (.ts vs .tsx)."""
-        if file_path.suffix.lower() == '.tsx':
+        if work.path.suffix.lower() == '.tsx':
             return 'typescript'
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read(2048)
+            content = work.text_head()
             
             # Look for JSX in TypeScript
             jsx_patterns = [
@@ -126,11 +139,10 @@ class LanguageDetector:
         except Exception:
             return 'typescript'
     
-    def _detect_c_variant(self, file_path: Path) -> Optional[str]:
+    def _detect_c_variant(self, work: FileWork) -> Optional[str]:
         """Detect C vs C++ for .h files."""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read(2048)
+            content = work.text_head()
             
             # Look for C++ specific patterns
             cpp_patterns = [
@@ -154,9 +166,9 @@ class LanguageDetector:
         except Exception:
             return 'c'
     
-    def _detect_extensionless_file(self, file_path: Path) -> Optional[str]:
+    def _detect_extensionless_file(self, work: FileWork) -> Optional[str]:
         """Detect language for files without extensions."""
-        file_name = file_path.name.lower()
+        file_name = work.path.name.lower()
         
         # Common script names
         script_names = {
@@ -173,8 +185,7 @@ class LanguageDetector:
         
         # Check shebang line
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                first_line = f.readline().strip()
+            first_line = work.text_head().split('\n', 1)[0].strip()
             
             if first_line.startswith('#!'):
                 shebang_map = {
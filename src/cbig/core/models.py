@@ -1,12 +1,17 @@
 """Data models for CBIG."""
 
-from typing import List, Dict, Optional, Any
-from pydantic import BaseModel, Field
+from typing import List, Dict, Optional, Any, NamedTuple, Sequence
+from pydantic import BaseModel
 from datetime import datetime
 from pathlib import Path
 
+# Parse results are plain records: parsers build them directly and they are
+# kept for every symbol of every file, so they carry no validation or
+# per-instance __dict__. Pydantic models describe the structured report only
+# (see cbig.formatters.structured).
 
-class Dependency(BaseModel):
+
+class Dependency(NamedTuple):
     """Represents a library/package dependency."""
     language: str
     name: str
@@ -16,7 +21,7 @@ class Dependency(BaseModel):
     artifact: Optional[str] = None  # for Java artifactId
 
 
-class Function(BaseModel):
+class Function(NamedTuple):
     """Represents a function or method."""
     language: str
     file: str
@@ -29,20 +34,20 @@ class Function(BaseModel):
     class_name: Optional[str] = None
 
 
-class Class(BaseModel):
+class Class(NamedTuple):
     """Represents a class, struct, or type."""
     language: str
     file: str
     name: str
     kind: str  # class, struct, interface, enum, etc.
-    inherits: Optional[str] = None
-    implements: List[str] = Field(default_factory=list)
     line_start: int
     line_end: int
+    inherits: Optional[str] = None
+    implements: Sequence[str] = ()
     doc: Optional[str] = None
 
 
-class Comment(BaseModel):
+class Comment(NamedTuple):
     """Represents a top-level comment block."""
     language: str
     file: str
@@ -51,40 +56,110 @@ class Comment(BaseModel):
     text: str
 
 
-class FileSummary(BaseModel):
+class FileSummary:
     """Summary data for a single file."""
-    file_path: str
-    language: str
-    loc: int  # lines of code
-    dependencies: List[Dependency] = Field(default_factory=list)
-    functions: List[Function] = Field(default_factory=list)
-    classes: List[Class] = Field(default_factory=list)
-    comments: List[Comment] = Field(default_factory=list)
-
-
-class DirectorySummary(BaseModel):
+    
+    __slots__ = ("file_path", "language", "loc", "dependencies", "functions", "classes", "comments")
+    
+    def __init__(
+        self,
+        file_path: str,
+        language: str,
+        loc: int,  # lines of code
+        dependencies: Optional[List[Dependency]] = None,
+        functions: Optional[List[Function]] = None,
+        classes: Optional[List[Class]] = None,
+        comments: Optional[List[Comment]] = None
+    ):
+        self.file_path = file_path
+        self.language = language
+        self.loc = loc
+        self.dependencies = dependencies if dependencies is not None else []
+        self.functions = functions if functions is not None else []
+        self.classes = classes if classes is not None else []
+        self.comments = comments if comments is not None else []
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the summary as JSON-compatible data."""
+        return {
+            "file_path": self.file_path,
+            "language": self.language,
+            "loc": self.loc,
+            "dependencies": [dep._asdict() for dep in self.dependencies],
+            "functions": [func._asdict() for func in self.functions],
+            "classes": [dict(cls._asdict(), implements=list(cls.implements)) for cls in self.classes],
+            "comments": [comment._asdict() for comment in self.comments]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FileSummary":
+        """Rebuild a summary written by to_dict()."""
+        return cls(
+            file_path=data["file_path"],
+            language=data["language"],
+            loc=data["loc"],
+            dependencies=[Dependency(**dep) for dep in data.get("dependencies", [])],
+            functions=[Function(**func) for func in data.get("functions", [])],
+            classes=[Class(**klass) for klass in data.get("classes", [])],
+            comments=[Comment(**comment) for comment in data.get("comments", [])]
+        )
+
+
+class DirectorySummary:
     """Summary data for a directory."""
-    directory: str
-    languages: List[str] = Field(default_factory=list)
-    files: List[str] = Field(default_factory=list)
-    total_loc: int = 0
-    dependencies: List[Dependency] = Field(default_factory=list)
-    functions: List[Function] = Field(default_factory=list)
-    classes: List[Class] = Field(default_factory=list)
-    comments: List[Comment] = Field(default_factory=list)
-
-
-class RepoSummary(BaseModel):
+    
+    __slots__ = ("directory", "languages", "files", "total_loc", "dependencies", "functions", "classes", "comments")
+    
+    def __init__(
+        self,
+        directory: str,
+        languages: Optional[List[str]] = None,
+        files: Optional[List[str]] = None,
+        total_loc: int = 0,
+        dependencies: Optional[Sequence[Dependency]] = None,
+        functions: Optional[Sequence[Function]] = None,
+        classes: Optional[Sequence[Class]] = None,
+        comments: Optional[Sequence[Comment]] = None
+    ):
+        self.directory = directory
+        self.languages = languages if languages is not None else []
+        self.files = files if files is not None else []
+        self.total_loc = total_loc
+        self.dependencies = dependencies if dependencies is not None else []
+        self.functions = functions if functions is not None else []
+        self.classes = classes if classes is not None else []
+        self.comments = comments if comments is not None else []
+
+
+class RepoSummary:
     """Complete repository analysis result."""
-    root: str
-    languages: List[str] = Field(default_factory=list)
-    summary: Dict[str, Any] = Field(default_factory=dict)
-    dependencies: List[Dependency] = Field(default_factory=list)
-    functions: List[Function] = Field(default_factory=list)
-    classes: List[Class] = Field(default_factory=list)
-    comments: List[Comment] = Field(default_factory=list)
-    scopes: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
-    generated_at: datetime = Field(default_factory=datetime.now)
+    
+    __slots__ = (
+        "root", "languages", "summary", "dependencies", "functions", "classes",
+        "comments", "scopes", "generated_at"
+    )
+    
+    def __init__(
+        self,
+        root: str,
+        languages: Optional[List[str]] = None,
+        summary: Optional[Dict[str, Any]] = None,
+        dependencies: Optional[Sequence[Dependency]] = None,
+        functions: Optional[Sequence[Function]] = None,
+        classes: Optional[Sequence[Class]] = None,
+        comments: Optional[Sequence[Comment]] = None,
+        scopes: Optional[Dict[str, Dict[str, Any]]] = None,
+        generated_at: Optional[datetime] = None
+    ):
+        self.root = root
+        self.languages = languages if languages is not None else []
+        self.summary = summary if summary is not None else {}
+        self.dependencies = dependencies if dependencies is not None else []
+        self.functions = functions if functions is not None else []
+        self.classes = classes if classes is not None else []
+        self.comments = comments if comments is not None else []
+        self.scopes = scopes if scopes is not None else {}
+        self.generated_at = generated_at if generated_at is not None else datetime.now()
 
 
 class LanguageConfig(BaseModel):
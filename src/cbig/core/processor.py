@@ -4,13 +4,18 @@ import logging
 import os
 import shutil
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Any, Tuple, Set, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from datetime import datetime
 
 from cbig.core.models import RepoSummary, DirectorySummary, FileSummary, LANGUAGE_CONFIGS
-from cbig.core.walker import FileWalker
+from cbig.core.symbols import SymbolStore, SYMBOL_KINDS
+from cbig.core.walker import FileWalker, WalkEntry, IGNORE_FILES
 from cbig.core.language_detector import LanguageDetector
+from cbig.core.work import FileWork, Source, read_source, close_source, count_loc
+from cbig.core.inputs import open_input
+from cbig.core.snapshot import Snapshot
+from cbig.core.git import GitError, resolve_revision, changed_paths
 from cbig.parsers.registry import ParserRegistry
 from cbig.formatters.markdown import MarkdownFormatter
 from cbig.formatters.structured import StructuredFormatter
@@ -18,19 +23,122 @@ from cbig.cache.manager import CacheManager
 
 logger = logging.getLogger(__name__)
 
+EXECUTORS = ("thread", "process")
+
+# What happens to files above --max-file-size
+LARGE_FILE_POLICIES = ("summarize", "skip")
+
+# Upper bound on files handed to a worker process in one task
+MAX_CHUNK_SIZE = 64
+
+# Tasks queued per worker before discovery waits for results (backpressure)
+IN_FLIGHT_PER_WORKER = 4
+
+# Per-process parsing state, built once by _init_process_worker
+_worker_parser_registry: Optional[ParserRegistry] = None
+
+
+def parse_file(
+    file_path: Path,
+    root_path: Path,
+    language: str,
+    parser_registry: ParserRegistry,
+    include_comments: bool = True,
+    data: Optional[Source] = None
+) -> Optional[FileSummary]:
+    """
+    Parse a single file into a FileSummary without touching the cache.
+    
+    `data` holds the file's contents if the caller already read them.
+    """
+    # Get parser
+    parser = parser_registry.get_parser(language)
+    if not parser:
+        logger.warning(f"No parser available for {language}")
+        return None
+    
+    # Parse file
+    owned = data is None
+    if owned:
+        data = read_source(file_path)
+    try:
+        parsed_data = parser.parse_bytes(data, str(file_path))
+        loc = count_loc(data)
+    finally:
+        if owned:
+            close_source(data)
+    
+    # Create file summary
+    return FileSummary(
+        file_path=str(file_path.relative_to(root_path)),
+        language=language,
+        loc=loc,
+        dependencies=parsed_data.get("dependencies", []),
+        functions=parsed_data.get("functions", []),
+        classes=parsed_data.get("classes", []),
+        comments=parsed_data.get("comments", []) if include_comments else []
+    )
+
+
+def summarize_file(file_path: Path, root_path: Path, language: str, data: Source) -> FileSummary:
+    """Summarize a file too large to parse by its line count alone."""
+    return FileSummary(
+        file_path=str(file_path.relative_to(root_path)),
+        language=language,
+        loc=count_loc(data),
+        dependencies=[],
+        functions=[],
+        classes=[],
+        comments=[]
+    )
+
+
+def _init_process_worker():
+    """Build the parser registry once per worker process."""
+    global _worker_parser_registry
+    _worker_parser_registry = ParserRegistry()
+
+
+def _parse_chunk(
+    root_path: Path,
+    chunk: List[Tuple[Path, str, Optional[bytes]]],
+    include_comments: bool
+) -> List[Tuple[Path, FileSummary]]:
+    """
+    Parse a chunk of (path, language, bytes) triples inside a worker process.
+    
+    Bytes are None for memory-mapped files, which the worker maps itself.
+    """
+    results = []
+    for file_path, language, data in chunk:
+        try:
+            summary = parse_file(
+                file_path, root_path, language, _worker_parser_registry, include_comments, data
+            )
+            if summary:
+                results.append((file_path, summary))
+        except Exception as e:
+            logger.error(f"Error processing {file_path}: {e}")
+    return results
+
 
 class CBIGProcessor:
     """Main processor that coordinates the analysis pipeline."""
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.root_path = Path(config["path"]).resolve()
         
         # Initialize components
         self.walker = FileWalker(
             include_patterns=config.get("include", []),
-            exclude_patterns=config.get("exclude", [])
+            exclude_patterns=config.get("exclude", []),
+            mode=config.get("walker", "scandir"),
+            walk_threads=config.get("walk_threads") or 1
         )
+        
+        # Archives and git object stores are read in place instead of walked
+        self.source = open_input(config["path"], self.walker)
+        self.root_path = self.source.root if self.source else Path(config["path"]).resolve()
         self.language_detector = LanguageDetector(
             enabled_languages=config.get("languages")
         )
@@ -42,134 +150,400 @@ class CBIGProcessor:
             cache_path = Path(config["cache_dir"])
             if config.get("clear_cache") and cache_path.exists():
                 shutil.rmtree(cache_path)
-            self.cache_manager = CacheManager(cache_path)
+            self.cache_manager = CacheManager(
+                cache_path,
+                validation=config.get("cache_validation", "stat")
+            )
+        self.cache_max_size = config.get("cache_max_size")
+        self.cache_max_age = config.get("cache_max_age")
+        
+        # Incremental mode: re-parse only what changed since a git revision
+        self.since = config.get("since")
+        self.snapshot_path = Path(config["snapshot"]) if config.get("snapshot") else None
+        if self.source and (self.since or self.snapshot_path):
+            logger.warning(f"--since and --snapshot need a git work tree, ignoring them for {self.root_path}")
+            self.since = self.snapshot_path = None
         
         # Initialize formatters
         self.markdown_formatter = MarkdownFormatter(config)
         self.structured_formatter = StructuredFormatter(config)
         
-        self.max_workers = config.get("max_workers", os.cpu_count())
+        self.max_workers = config.get("max_workers") or os.cpu_count()
+        self.executor = config.get("executor", "thread")
+        self.include_comments = config.get("sections", {}).get("comments", False)
+        if self.executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor: {self.executor}")
+        
+        # Files above max_file_size are summarized by line count or skipped
+        self.max_file_size = config.get("max_file_size")
+        self.large_files = config.get("large_files", "summarize")
+        if self.large_files not in LARGE_FILE_POLICIES:
+            raise ValueError(f"Unknown large file policy: {self.large_files}")
     
     def process(self) -> RepoSummary:
         """Process the repository and generate analysis results."""
         logger.info(f"Starting analysis of {self.root_path}")
         
-        # Walk files and detect languages
-        files = self._discover_files()
-        logger.info(f"Found {len(files)} files to analyze")
+        incremental = self._prepare_incremental() if self.since else None
+        if incremental:
+            file_summaries, files, touched_files = incremental
+            logger.info(f"Re-analyzing {len(files)} files changed since {self.since}")
+        else:
+            # Files are walked and detected lazily, as the parse pool takes them
+            file_summaries, touched_files = {}, None
+            files = self._discover_files()
         
         # Process files in parallel
-        file_summaries = self._process_files(files)
+        try:
+            file_summaries.update(self._process_files(files))
+        finally:
+            if self.cache_manager:
+                self.cache_manager.flush()
+            if self.source:
+                self.source.close()
+        logger.info(f"Analyzed {len(file_summaries)} files")
+        
+        # Keep the cache within its configured bounds
+        if self.cache_manager and (self.cache_max_size is not None or self.cache_max_age is not None):
+            self.cache_manager.gc(max_size=self.cache_max_size, max_age=self.cache_max_age, wait=False)
+        
+        # Only full runs are snapshotted, so a snapshot always matches one commit
+        if self.snapshot_path and not incremental:
+            self._save_snapshot(file_summaries)
         
         # Build repository summary
         repo_summary = self._build_repo_summary(file_summaries)
         
         # Generate outputs
-        self._generate_outputs(repo_summary, file_summaries)
+        self._generate_outputs(repo_summary, file_summaries, touched_files)
         
         return repo_summary
     
-    def _discover_files(self) -> List[Path]:
-        """Discover and filter files for analysis."""
-        all_files = list(self.walker.walk(self.root_path))
-        
-        # Filter by language
-        filtered_files = []
-        for file_path in all_files:
-            language = self.language_detector.detect_language(file_path)
-            if language:
-                filtered_files.append(file_path)
-        
-        return filtered_files
+    def _snapshot_settings(self) -> Dict[str, Any]:
+        """Describe the options a snapshot's results depend on."""
+        languages = self.config.get("languages")
+        return {
+            "languages": sorted(languages) if languages else None,
+            "include": list(self.config.get("include") or []),
+            "exclude": list(self.config.get("exclude") or []),
+            "walker": self.walker.mode,
+            "max_file_size": self.max_file_size,
+            "large_files": self.large_files if self.max_file_size is not None else None,
+            "parsers": {
+                language: self._cache_fingerprint(language)
+                for language in sorted(LANGUAGE_CONFIGS)
+            }
+        }
+    
+    def _save_snapshot(self, file_summaries: Dict[str, FileSummary]):
+        """Persist this run's file summaries for later --since runs."""
+        try:
+            revision = resolve_revision(self.root_path)
+            changed, deleted = changed_paths(self.root_path, revision)
+        except GitError as e:
+            logger.warning(f"Not saving snapshot, {self.root_path} is not a git checkout: {e}")
+            return
+        
+        snapshot = Snapshot(
+            revision,
+            self._snapshot_settings(),
+            {summary.file_path: summary for summary in file_summaries.values()},
+            dirty=changed + deleted
+        )
+        snapshot.save(self.snapshot_path)
+    
+    def _prepare_incremental(
+        self
+    ) -> Optional[Tuple[Dict[str, FileSummary], List[FileWork], Set[str]]]:
+        """
+        Load the snapshot and work out which files to re-parse.
+        
+        Returns (snapshot summaries minus touched files, work records to
+        parse, touched file paths), or None if a full run is needed instead.
+        """
+        if self.snapshot_path is None or not self.root_path.is_dir():
+            logger.warning("Incremental analysis needs a snapshot and a directory, running a full analysis")
+            return None
+        
+        snapshot = Snapshot.load(self.snapshot_path)
+        if snapshot is None:
+            logger.warning(f"No usable snapshot at {self.snapshot_path}, running a full analysis")
+            return None
+        if snapshot.settings != self._snapshot_settings():
+            logger.warning("Snapshot was taken with other settings or parsers, running a full analysis")
+            return None
+        
+        try:
+            revision = resolve_revision(self.root_path, self.since)
+            if revision != snapshot.revision:
+                logger.warning(
+                    f"Snapshot describes {snapshot.revision[:12]}, not {self.since} ({revision[:12]}), "
+                    f"running a full analysis"
+                )
+                return None
+            changed, deleted = changed_paths(self.root_path, revision)
+        except GitError as e:
+            logger.warning(f"Cannot diff against {self.since}: {e}, running a full analysis")
+            return None
+        
+        # Files dirty when the snapshot was taken may have been reverted since
+        touched = set(changed) | set(deleted) | set(snapshot.dirty)
+        if any(relative.rpartition("/")[2] in IGNORE_FILES for relative in touched):
+            logger.warning("Ignore files changed since the snapshot, running a full analysis")
+            return None
+        touched_files = {str(self.root_path / relative) for relative in touched}
+        
+        file_summaries = {
+            str(self.root_path / relative): summary
+            for relative, summary in snapshot.files.items()
+        }
+        for file_path in touched_files:
+            file_summaries.pop(file_path, None)
+        
+        paths = self.walker.filter_paths(self.root_path, sorted(touched))
+        files = list(self._detect_languages(map(WalkEntry, paths)))
+        return file_summaries, files, touched_files
+    
+    def _discover_files(self) -> Iterator[FileWork]:
+        """Lazily walk the tree (or read the input), yielding a work record per analyzable file."""
+        entries = self.source.scan() if self.source else self.walker.scan(self.root_path)
+        return self._detect_languages(entries)
     
-    def _process_files(self, files: List[Path]) -> Dict[str, FileSummary]:
-        """Process files in parallel to extract analysis data."""
+    def _detect_languages(self, entries: Iterable[WalkEntry]) -> Iterator[FileWork]:
+        """
+        Detect the language of each walked file, dropping unsupported and skipped files.
+        
+        A file the walker did not stat is stat'ed here, once.
+        """
+        for file_path, stat_result, blob_id, load in entries:
+            work = FileWork(file_path, stat_result, blob_id, load)
+            if self.large_files == "skip" and self._is_oversized(work):
+                logger.info(f"Skipping {file_path}: {work.size} bytes exceeds the maximum file size")
+                continue
+            if self.language_detector.detect(work):
+                yield work
+    
+    def _is_oversized(self, work: FileWork) -> bool:
+        """Whether a file is above max_file_size."""
+        return self.max_file_size is not None and work.size > self.max_file_size
+    
+    def _process_files(self, files: Iterable[FileWork]) -> Dict[str, FileSummary]:
+        """
+        Process files in parallel to extract analysis data.
+        
+        Files are pulled from `files` only while fewer than
+        IN_FLIGHT_PER_WORKER tasks per worker are pending, so parsing starts
+        as soon as the first file is found and memory stays flat however
+        large the tree.
+        """
+        if self.executor == "process":
+            return self._process_files_in_processes(files)
+        
         file_summaries = {}
+        max_in_flight = self.max_workers * IN_FLIGHT_PER_WORKER
         
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit tasks
-            future_to_file = {
-                executor.submit(self._process_single_file, file_path): file_path
-                for file_path in files
-            }
+            in_flight = {}
+            for work in files:
+                if len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    self._collect_summaries(done, in_flight, file_summaries)
+                in_flight[executor.submit(self._process_single_file, work)] = work.path
             
-            # Collect results
-            for future in as_completed(future_to_file):
-                file_path = future_to_file[future]
-                try:
-                    summary = future.result()
-                    if summary:
-                        file_summaries[str(file_path)] = summary
-                except Exception as e:
-                    logger.warning(f"Failed to process {file_path}: {e}")
+            self._collect_summaries(as_completed(list(in_flight)), in_flight, file_summaries)
         
         return file_summaries
     
-    def _process_single_file(self, file_path: Path) -> Optional[FileSummary]:
-        """Process a single file and extract analysis data."""
-        try:
-            # Check cache first
-            if self.cache_manager:
-                cached_result = self.cache_manager.get(file_path)
+    @staticmethod
+    def _collect_summaries(done, in_flight: Dict, file_summaries: Dict[str, FileSummary]):
+        """Move finished single-file results into file_summaries."""
+        for future in done:
+            file_path = in_flight.pop(future)
+            try:
+                summary = future.result()
+                if summary:
+                    file_summaries[str(file_path)] = summary
+            except Exception as e:
+                logger.warning(f"Failed to process {file_path}: {e}")
+    
+    def _process_files_in_processes(self, files: Iterable[FileWork]) -> Dict[str, FileSummary]:
+        """
+        Process files on a pool of worker processes.
+        
+        Cache lookups and writes stay in this process; only cache misses are
+        shipped to the workers, in chunks, so parsing scales with core count.
+        The total file count is not known up front, so chunks start at one
+        file and grow towards MAX_CHUNK_SIZE as more files are discovered.
+        """
+        file_summaries = {}
+        max_in_flight = self.max_workers * IN_FLIGHT_PER_WORKER
+        
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_process_worker
+        ) as executor:
+            in_flight = {}
+            chunk = []
+            stats = {}
+            seen = 0
+            
+            def submit(chunk):
+                if len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    self._collect_chunks(done, in_flight, file_summaries, stats)
+                future = executor.submit(_parse_chunk, self.root_path, chunk, self.include_comments)
+                in_flight[future] = chunk
+            
+            for work in files:
+                seen += 1
+                
+                # Serve cache hits and summaries of oversized files locally
+                if self._is_oversized(work):
+                    file_summaries[str(work.path)] = self._summarize_oversized(work)
+                    continue
+                cached_result = self._get_cached(work)
                 if cached_result:
-                    logger.debug(f"Cache hit for {file_path}")
-                    return cached_result
+                    file_summaries[str(work.path)] = cached_result
+                    continue
+                
+                # Ship the bytes already read for hashing, and keep what the cache entry needs;
+                # mappings cannot be pickled, so workers map large files themselves
+                data = work.data
+                chunk.append((work.path, work.language, data if isinstance(data, bytes) else None))
+                stats[work.path] = (work.stat, work.blob_id, work.on_disk)
+                work.release()
+                if len(chunk) >= min(MAX_CHUNK_SIZE, 1 + seen // (self.max_workers * 4)):
+                    submit(chunk)
+                    chunk = []
             
-            # Detect language
-            language = self.language_detector.detect_language(file_path)
-            if not language:
-                return None
+            if chunk:
+                submit(chunk)
+            self._collect_chunks(as_completed(list(in_flight)), in_flight, file_summaries, stats)
+        
+        return file_summaries
+    
+    def _collect_chunks(
+        self,
+        done,
+        in_flight: Dict,
+        file_summaries: Dict[str, FileSummary],
+        stats: Dict[Path, Any]
+    ):
+        """Move finished chunk results into file_summaries and the cache."""
+        for future in done:
+            chunk = in_flight.pop(future)
+            chunk_stats = {file_path: stats.pop(file_path, (None, None, True)) for file_path, _, _ in chunk}
+            try:
+                results = future.result()
+            except Exception as e:
+                logger.warning(f"Failed to process {len(chunk)} files starting at {chunk[0][0]}: {e}")
+                continue
             
-            # Get parser
-            parser = self.parser_registry.get_parser(language)
-            if not parser:
-                logger.warning(f"No parser available for {language}")
+            for file_path, summary in results:
+                file_summaries[str(file_path)] = summary
+                if self.cache_manager:
+                    stat_result, blob_id, on_disk = chunk_stats[file_path]
+                    self.cache_manager.put(
+                        file_path, summary, self._cache_fingerprint(summary.language),
+                        stat_result=stat_result,
+                        blob_id=blob_id,
+                        on_disk=on_disk
+                    )
+    
+    def _cache_fingerprint(self, language: str) -> str:
+        """
+        Describe everything besides file content that shapes a parse result.
+        
+        Cached results are keyed on this, so upgrading one language's parser
+        or toggling extraction options only invalidates the affected entries.
+        """
+        parser = self.parser_registry.get_parser(language)
+        parser_version = parser.get_version() if parser else ""
+        return f"{language}:{parser_version}:comments={int(self.include_comments)}"
+    
+    def _get_cached(self, work: FileWork) -> Optional[FileSummary]:
+        """Return the cached summary for a file, if any."""
+        if not self.cache_manager:
+            return None
+        
+        cached_result = self.cache_manager.get(
+            work.path,
+            self._cache_fingerprint(work.language),
+            str(work.path.relative_to(self.root_path)),
+            stat_result=work.stat,
+            read=lambda: work.data,
+            blob_id=work.blob_id,
+            on_disk=work.on_disk
+        )
+        if cached_result:
+            logger.debug(f"Cache hit for {work.path}")
+        return cached_result
+    
+    def _summarize_oversized(self, work: FileWork) -> FileSummary:
+        """Summarize a file above max_file_size without parsing or caching it."""
+        logger.info(f"Not parsing {work.path}: {work.size} bytes exceeds the maximum file size")
+        try:
+            return summarize_file(work.path, self.root_path, work.language, work.data)
+        finally:
+            work.release()
+    
+    def _process_single_file(self, work: FileWork) -> Optional[FileSummary]:
+        """Process a single file and extract analysis data."""
+        file_path = work.path
+        try:
+            # Detect language unless discovery already did
+            language = work.language or self.language_detector.detect(work)
+            if not language:
                 return None
             
-            # Parse file
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            if self._is_oversized(work):
+                return self._summarize_oversized(work)
             
-            parsed_data = parser.parse(content, str(file_path))
+            # Check cache first
+            cached_result = self._get_cached(work)
+            if cached_result:
+                return cached_result
             
-            # Create file summary
-            summary = FileSummary(
-                file_path=str(file_path.relative_to(self.root_path)),
-                language=language,
-                loc=len([line for line in content.splitlines() if line.strip()]),
-                dependencies=parsed_data.get("dependencies", []),
-                functions=parsed_data.get("functions", []),
-                classes=parsed_data.get("classes", []),
-                comments=parsed_data.get("comments", [])
+            summary = parse_file(
+                file_path, self.root_path, language, self.parser_registry, self.include_comments,
+                work.data
             )
             
             # Cache result
-            if self.cache_manager:
-                self.cache_manager.put(file_path, summary)
+            if summary and self.cache_manager:
+                self.cache_manager.put(
+                    file_path, summary, self._cache_fingerprint(language),
+                    stat_result=work.stat,
+                    read=lambda: work.data,
+                    blob_id=work.blob_id,
+                    on_disk=work.on_disk
+                )
             
             return summary
             
         except Exception as e:
             logger.error(f"Error processing {file_path}: {e}")
             return None
+        finally:
+            work.release()
     
     def _build_repo_summary(self, file_summaries: Dict[str, FileSummary]) -> RepoSummary:
-        """Build repository-level summary from file summaries."""
+        """
+        Build repository-level summary from file summaries.
+        
+        Each file's symbol lists are added to a SymbolStore in a single pass.
+        File scopes are those lists, and the repository sections and directory
+        scopes are views over them, so no symbol is copied into another list.
+        """
+        store = SymbolStore()
         all_languages = set()
-        all_dependencies = []
-        all_functions = []
-        all_classes = []
-        all_comments = []
         total_files = len(file_summaries)
         total_loc = 0
         per_language_stats = {}
+        file_scopes = {}
         
-        for summary in file_summaries.values():
+        for file_path, summary in file_summaries.items():
             all_languages.add(summary.language)
-            all_dependencies.extend(summary.dependencies)
-            all_functions.extend(summary.functions)
-            all_classes.extend(summary.classes)
-            all_comments.extend(summary.comments)
             total_loc += summary.loc
             
             # Per-language stats
@@ -177,9 +551,9 @@ class CBIGProcessor:
                 per_language_stats[summary.language] = {"files": 0, "loc": 0}
             per_language_stats[summary.language]["files"] += 1
             per_language_stats[summary.language]["loc"] += summary.loc
-        
-        # Build scopes for directory and file level
-        scopes = self._build_scopes(file_summaries)
+            
+            store.add(summary, self._scope_dir(file_path))
+            file_scopes[file_path] = {kind: getattr(summary, kind) for kind in SYMBOL_KINDS}
         
         return RepoSummary(
             root=str(self.root_path),
@@ -189,52 +563,32 @@ class CBIGProcessor:
                 "total_loc": total_loc,
                 "per_language": per_language_stats
             },
-            dependencies=all_dependencies,
-            functions=all_functions,
-            classes=all_classes,
-            comments=all_comments,
-            scopes=scopes,
+            dependencies=store.view("dependencies"),
+            functions=store.view("functions"),
+            classes=store.view("classes"),
+            comments=store.view("comments"),
+            scopes={"dir": store.dir_views(), "file": file_scopes},
             generated_at=datetime.now()
         )
     
-    def _build_scopes(self, file_summaries: Dict[str, FileSummary]) -> Dict[str, Any]:
-        """Build directory and file scopes from file summaries."""
-        scopes = {"dir": {}, "file": {}}
-        
-        # File scopes (direct mapping)
-        for file_path, summary in file_summaries.items():
-            scopes["file"][file_path] = {
-                "dependencies": summary.dependencies,
-                "functions": summary.functions,
-                "classes": summary.classes,
-                "comments": summary.comments
-            }
-        
-        # Directory scopes (aggregated)
-        dir_data = {}
-        for file_path, summary in file_summaries.items():
-            dir_path = str(Path(file_path).parent)
-            if dir_path == ".":
-                dir_path = "root"
-            
-            if dir_path not in dir_data:
-                dir_data[dir_path] = {
-                    "dependencies": [],
-                    "functions": [],
-                    "classes": [],
-                    "comments": []
-                }
-            
-            dir_data[dir_path]["dependencies"].extend(summary.dependencies)
-            dir_data[dir_path]["functions"].extend(summary.functions)
-            dir_data[dir_path]["classes"].extend(summary.classes)
-            dir_data[dir_path]["comments"].extend(summary.comments)
-        
-        scopes["dir"] = dir_data
-        return scopes
+    @staticmethod
+    def _scope_dir(file_path: str) -> str:
+        """Return the directory scope a file belongs to."""
+        dir_path = str(Path(file_path).parent)
+        return "root" if dir_path == "." else dir_path
     
-    def _generate_outputs(self, repo_summary: RepoSummary, file_summaries: Dict[str, FileSummary]):
-        """Generate markdown and structured outputs based on configuration."""
+    def _generate_outputs(
+        self,
+        repo_summary: RepoSummary,
+        file_summaries: Dict[str, FileSummary],
+        touched_files: Optional[Set[str]] = None
+    ):
+        """
+        Generate markdown and structured outputs based on configuration.
+        
+        When `touched_files` is given, per-file and per-directory markdown
+        is only regenerated for those files and their directories.
+        """
         # Generate structured output if requested
         if self.config.get("out") or self.config.get("format") != "md":
             self.structured_formatter.generate(repo_summary, self.config.get("out"))
@@ -242,9 +596,17 @@ class CBIGProcessor:
         # Generate markdown outputs if enabled
         if self.config.get("write_md", True):
             if self.config.get("by_file"):
+                if touched_files is not None:
+                    file_summaries = {
+                        file_path: summary for file_path, summary in file_summaries.items()
+                        if file_path in touched_files
+                    }
                 self._generate_file_markdown(file_summaries)
             elif self.config.get("by_dir"):
-                self._generate_directory_markdown(repo_summary)
+                touched_dirs = None
+                if touched_files is not None:
+                    touched_dirs = {self._scope_dir(file_path) for file_path in touched_files}
+                self._generate_directory_markdown(repo_summary, touched_dirs)
             else:
                 self._generate_repo_markdown(repo_summary)
     
@@ -254,12 +616,15 @@ class CBIGProcessor:
         self.markdown_formatter.generate_repo_markdown(repo_summary, output_path)
         logger.info(f"Generated repository markdown: {output_path}")
     
-    def _generate_directory_markdown(self, repo_summary: RepoSummary):
-        """Generate per-directory markdown files."""
+    def _generate_directory_markdown(self, repo_summary: RepoSummary, touched_dirs: Optional[Set[str]] = None):
+        """Generate per-directory markdown files, optionally only for the touched directories."""
         output_dir = Path(self.config.get("output_dir", "."))
         output_dir.mkdir(parents=True, exist_ok=True)
         
         for dir_path, dir_data in repo_summary.scopes["dir"].items():
+            if touched_dirs is not None and dir_path not in touched_dirs:
+                continue
+            
             # Determine primary language for this directory
             languages = set()
             for func in dir_data["functions"]:
@@ -0,0 +1,84 @@
+"""Persisted per-file analysis results used by incremental runs."""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import logging
+
+from cbig.core.models import FileSummary
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+class Snapshot:
+    """
+    The file summaries of a full run, tied to the git commit they describe.
+
+    `dirty` lists the paths that differed from that commit when the
+    snapshot was taken, so an incremental run re-parses them even if
+    they have since been reverted. `settings` captures everything that
+    shapes the results (filters, sections, parser versions); a snapshot
+    taken with other settings is never reused.
+    """
+
+    def __init__(
+        self,
+        revision: str,
+        settings: Dict[str, Any],
+        files: Dict[str, FileSummary],
+        dirty: Optional[List[str]] = None
+    ):
+        self.revision = revision
+        self.settings = settings
+        self.files = files
+        self.dirty = dirty or []
+
+    def save(self, path: Path):
+        """Write the snapshot as JSON, replacing any previous one atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "revision": self.revision,
+            "dirty": sorted(self.dirty),
+            "settings": self.settings,
+            "files": {
+                relative_path: summary.to_dict()
+                for relative_path, summary in self.files.items()
+            }
+        }
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved snapshot of {len(self.files)} files at {self.revision[:12]} to {path}")
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["Snapshot"]:
+        """Read a snapshot written by save(), or None if missing or unreadable."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to read snapshot {path}: {e}")
+            return None
+
+        if data.get("version") != SNAPSHOT_VERSION:
+            logger.warning(f"Ignoring snapshot {path} written by another cbig version")
+            return None
+
+        return cls(
+            revision=data["revision"],
+            settings=data["settings"],
+            files={
+                relative_path: FileSummary.from_dict(summary)
+                for relative_path, summary in data["files"].items()
+            },
+            dirty=data.get("dirty", [])
+        )
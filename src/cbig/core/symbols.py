@@ -0,0 +1,95 @@
+"""Repository and directory symbol scopes as views over per-file record lists."""
+
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import chain
+from typing import Dict, Iterator, List
+
+from cbig.core.models import Dependency, Function, Class, Comment, FileSummary
+
+# Record type of each symbol section, in report order
+SYMBOL_KINDS = {
+    "dependencies": Dependency,
+    "functions": Function,
+    "classes": Class,
+    "comments": Comment
+}
+
+
+class SymbolView(Sequence):
+    """
+    Read-only sequence over the record lists of some files, in order.
+
+    A view holds references to the lists, not to their records, so it
+    costs a pointer per file however many symbols those files hold.
+    Iterating chains the lists and indexing bisects into them; records
+    are never copied or rebuilt.
+    """
+
+    __slots__ = ("parts", "_offsets")
+
+    def __init__(self, parts: List[Sequence]):
+        self.parts = [part for part in parts if part]
+        offsets = [0]
+        for part in self.parts:
+            offsets.append(offsets[-1] + len(part))
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return self._offsets[-1]
+
+    def __iter__(self) -> Iterator:
+        return chain.from_iterable(self.parts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("symbol index out of range")
+        part = bisect_right(self._offsets, index) - 1
+        return self.parts[part][index - self._offsets[part]]
+
+    def __repr__(self) -> str:
+        return f"SymbolView({len(self)} records in {len(self.parts)} files)"
+
+
+class SymbolStore:
+    """
+    The symbols of every file of a run, left in each file's own lists.
+
+    Files are numbered in the order they are added. `records` holds, for
+    each symbol kind, every file's list by file number, and `dir_files`
+    the numbers of the files in each directory. Repository and directory
+    scopes are SymbolViews over those lists, so each symbol is held once,
+    by its file, however many scopes it appears in.
+    """
+
+    def __init__(self):
+        self.files: List[str] = []
+        self.records: Dict[str, List[Sequence]] = {kind: [] for kind in SYMBOL_KINDS}
+        self.dir_files: Dict[str, List[int]] = {}
+
+    def add(self, summary: FileSummary, directory: str) -> int:
+        """Add the symbols of a file summary and return the file's number."""
+        file_index = len(self.files)
+        self.files.append(summary.file_path)
+        for kind, lists in self.records.items():
+            lists.append(getattr(summary, kind))
+        self.dir_files.setdefault(directory, []).append(file_index)
+        return file_index
+
+    def view(self, kind: str) -> SymbolView:
+        """All symbols of a kind, in file order."""
+        return SymbolView(self.records[kind])
+
+    def dir_views(self) -> Dict[str, Dict[str, SymbolView]]:
+        """The symbols of every directory, by kind, in the order directories were first seen."""
+        return {
+            directory: {
+                kind: SymbolView([lists[file_index] for file_index in file_indexes])
+                for kind, lists in self.records.items()
+            }
+            for directory, file_indexes in self.dir_files.items()
+        }
@@ -1,20 +1,171 @@
 """File walker that discovers source files while respecting gitignore and patterns."""
 
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Iterator, Set
+from typing import Callable, Dict, List, Iterator, NamedTuple, Optional, Tuple
 import pathspec
 import logging
 
+from cbig.core.git import GitError, find_repository, global_excludes_file, list_files
+
 logger = logging.getLogger(__name__)
 
+SOURCE_EXTENSIONS = {
+    '.py', '.pyi',           # Python
+    '.java',                 # Java
+    '.js', '.jsx', '.mjs', '.cjs',  # JavaScript
+    '.ts', '.tsx',           # TypeScript
+    '.html', '.htm',         # HTML
+    '.rs',                   # Rust
+    '.swift',                # Swift
+    '.c', '.h',              # C
+    '.cpp', '.cc', '.cxx', '.hpp',  # C++
+    '.go',                   # Go
+    '.rb',                   # Ruby
+    '.php',                  # PHP
+    '.cs',                   # C#
+    '.kt',                   # Kotlin
+    '.scala',                # Scala
+    '.sh', '.bash',          # Shell
+    '.sql',                  # SQL
+    '.xml',                  # XML
+    '.json',                 # JSON
+    '.yaml', '.yml',         # YAML
+    '.toml',                 # TOML
+    '.md', '.markdown',      # Markdown
+    '.txt',                  # Text
+    '.cfg', '.conf', '.ini', # Config files
+    '.dockerfile', '.Dockerfile'  # Docker
+}
+
+# Ignore files read in every directory, with git's .gitignore semantics.
+# .cbigignore is applied after .gitignore, so it can override it.
+GIT_IGNORE_FILE = ".gitignore"
+CBIG_IGNORE_FILE = ".cbigignore"
+IGNORE_FILES = (GIT_IGNORE_FILE, CBIG_IGNORE_FILE)
+
+# scandir walks the directory tree; git lists files from the git index
+WALKER_MODES = ("scandir", "git")
+
+# With walk_threads > 1, how many directories each thread may list ahead of the walk
+VISITS_AHEAD_PER_THREAD = 16
+
+_NAMED_GROUP = re.compile(r"\(\?P<\w+>")
+
+
+class CompiledSpec:
+    """
+    Matches '/'-separated relative paths against a PathSpec.
+    
+    Without negated patterns a path matches when any pattern does, so the
+    pattern regexes are joined into a single alternation and each path is
+    matched once rather than once per pattern. Specs with negations are
+    evaluated pattern by pattern, the last matching pattern winning.
+    """
+    
+    def __init__(self, spec: pathspec.PathSpec):
+        self.spec = spec
+        patterns = [pattern for pattern in spec.patterns if pattern.include is not None]
+        self.empty = not patterns
+        self._patterns = patterns[::-1]
+        self._regex = None
+        if patterns and all(self._joinable(pattern) for pattern in patterns):
+            self._regex = re.compile("|".join(
+                f"(?:{_NAMED_GROUP.sub('(?:', pattern.regex.pattern)})" for pattern in patterns
+            ))
+    
+    @staticmethod
+    def _joinable(pattern) -> bool:
+        regex = getattr(pattern, "regex", None)
+        return (
+            pattern.include and regex is not None and isinstance(regex.pattern, str)
+            and regex.flags & ~re.UNICODE == 0
+        )
+    
+    def match(self, path: str) -> bool:
+        return bool(self.check(path))
+    
+    def check(self, path: str) -> Optional[bool]:
+        """True if the last pattern matching path includes it, False if it negates it, None if none match."""
+        if self._regex is not None:
+            return True if self._regex.match(path) is not None else None
+        for pattern in self._patterns:
+            if pattern.regex.match(path) is not None:
+                return pattern.include
+        return None
+
+
+_NO_PATTERNS = CompiledSpec(pathspec.PathSpec([]))
+
+
+class IgnoreStack:
+    """
+    The ignore rules in force inside one directory, as git applies them.
+    
+    Each level holds the patterns of one directory's ignore files and is
+    matched against paths relative to that directory. The deepest level
+    with a matching pattern decides, so a nested .gitignore can negate
+    what a parent ignores. Stacks are immutable: a directory with ignore
+    files of its own pushes a level onto a new stack, and every other
+    directory shares its parent's.
+    """
+    
+    __slots__ = ("levels",)
+    
+    def __init__(self, levels: Tuple = ()):
+        # (spec, length of the directory's prefix, path from the spec's directory to the walk root)
+        self.levels = levels
+    
+    def push(self, spec: CompiledSpec, prefix: str, base: str = "") -> "IgnoreStack":
+        """Add the patterns of the directory at `prefix` (relative to the walk root, '/'-terminated)."""
+        if spec.empty:
+            return self
+        return IgnoreStack(self.levels + ((spec, len(prefix), base),))
+    
+    def is_ignored(self, relative: str) -> bool:
+        """Whether a path relative to the walk root is ignored; directories end with '/'."""
+        for spec, strip, base in reversed(self.levels):
+            result = spec.check(base + relative[strip:])
+            if result is not None:
+                return result
+        return False
+
+
+class WalkEntry(NamedTuple):
+    """A discovered file, with whatever discovery learned about it for free."""
+    path: Path
+    stat: Optional[os.stat_result] = None
+    # Git blob id of the file's content, when the index vouches for it
+    blob_id: Optional[str] = None
+    # Returns the file's bytes, for files that are not on disk (archive members, git objects)
+    load: Optional[Callable[[], bytes]] = None
+
 
 class FileWalker:
     """Walks directory trees to discover source files with pattern filtering."""
     
-    def __init__(self, include_patterns: List[str] = None, exclude_patterns: List[str] = None):
+    def __init__(
+        self,
+        include_patterns: List[str] = None,
+        exclude_patterns: List[str] = None,
+        mode: str = "scandir",
+        walk_threads: int = 1
+    ):
+        if mode not in WALKER_MODES:
+            raise ValueError(f"Unknown walker mode: {mode}")
+        if walk_threads < 1:
+            raise ValueError(f"walk_threads must be at least 1, got {walk_threads}")
+        
         self.include_patterns = include_patterns or []
         self.exclude_patterns = exclude_patterns or []
+        self.mode = mode
+        self.walk_threads = walk_threads
+        
+        # git has applied its own ignore rules to what it lists
+        self.ignore_files = IGNORE_FILES if mode == "scandir" else (CBIG_IGNORE_FILE,)
         
         # Default exclusions for common non-source directories
         self.default_excludes = [
@@ -51,6 +202,9 @@ class FileWalker:
         
         # Compile pathspecs
         self._setup_pathspecs()
+        
+        # Whether each directory seen by matches() is pruned
+        self._pruned: Dict[str, bool] = {}
     
     def _setup_pathspecs(self):
         """Setup pathspec matchers for include/exclude patterns."""
@@ -58,11 +212,14 @@ class FileWalker:
         all_excludes = self.default_excludes + self.exclude_patterns
         
         self.exclude_spec = pathspec.PathSpec.from_lines('gitwildmatch', all_excludes)
+        self._exclude = CompiledSpec(self.exclude_spec)
         
         if self.include_patterns:
             self.include_spec = pathspec.PathSpec.from_lines('gitwildmatch', self.include_patterns)
+            self._include = CompiledSpec(self.include_spec)
         else:
             self.include_spec = None
+            self._include = None
     
     def walk(self, root_path: Path) -> Iterator[Path]:
         """
@@ -70,6 +227,16 @@ class FileWalker:
         
         Yields file paths that match the filtering criteria.
         """
+        for entry in self.scan(root_path):
+            yield entry.path
+    
+    def scan(self, root_path: Path) -> Iterator[WalkEntry]:
+        """
+        Walk like walk(), yielding a WalkEntry per file.
+        
+        In scandir mode entries carry the file's stat result, in git mode
+        the blob id of unmodified tracked files.
+        """
         if not root_path.exists():
             logger.error(f"Path does not exist: {root_path}")
             return
@@ -77,31 +244,207 @@ class FileWalker:
         if root_path.is_file():
             # Single file
             if self._should_include_file(root_path, root_path.parent):
-                yield root_path
+                yield WalkEntry(root_path)
+            return
+        
+        if self.mode == "git":
+            yield from self._scan_git(root_path)
+        else:
+            yield from self._scan_directory(root_path)
+    
+    def _scan_directory(self, root_path: Path) -> Iterator[WalkEntry]:
+        """
+        Walk a directory tree with os.scandir.
+        
+        Excluded or ignored directories are pruned before they are entered.
+        Relative paths are built up as strings while descending, so a file
+        costs one match per spec and one stat, which the caller can reuse.
+        Ignore files are read as each directory is entered (see IgnoreStack).
+        """
+        # Depth-first, files of a directory before its subdirectories, as os.walk
+        stack = [(str(root_path), "", self._root_ignores(root_path))]
+        if self.walk_threads > 1:
+            yield from self._scan_concurrently(stack)
             return
         
-        # Load gitignore if present
-        gitignore_spec = self._load_gitignore(root_path)
+        while stack:
+            files, subdirs = self._visit_directory(*stack.pop())
+            yield from files
+            stack.extend(reversed(subdirs))
+    
+    def _scan_concurrently(self, stack: List[Tuple]) -> Iterator[WalkEntry]:
+        """
+        Walk like _scan_directory, visiting directories ahead on a thread pool.
         
-        # Walk directory tree
-        for dir_path, dir_names, file_names in os.walk(root_path):
-            current_dir = Path(dir_path)
-            relative_dir = current_dir.relative_to(root_path)
+        On network filesystems every listing and stat is a round trip, and
+        the GIL is released while waiting for it. A finished visit queues
+        the visits of the subdirectories it found, and the walk queues the
+        directories next on its stack, up to VISITS_AHEAD_PER_THREAD per
+        thread. Results are consumed in stack order, so files come out
+        exactly as a sequential walk yields them.
+        """
+        limit = self.walk_threads * VISITS_AHEAD_PER_THREAD
+        visits = {}
+        lock = threading.Lock()
+        pool = ThreadPoolExecutor(max_workers=self.walk_threads, thread_name_prefix="cbig-walk")
+        
+        def queue(directories):
+            # Called with the lock held
+            for directory in directories:
+                if len(visits) >= limit:
+                    break
+                if directory[0] not in visits:
+                    visits[directory[0]] = pool.submit(visit, directory)
+        
+        def visit(directory):
+            files, subdirs = self._visit_directory(*directory)
+            with lock:
+                queue(subdirs)
+            return files, subdirs
+        
+        try:
+            while stack:
+                directory = stack.pop()
+                with lock:
+                    future = visits.pop(directory[0], None)
+                    queue(reversed(stack[-limit:]))
+                if future is not None and not future.cancel():
+                    files, subdirs = future.result()
+                else:
+                    # Not started yet: visit it here rather than wait behind visits queued ahead
+                    files, subdirs = visit(directory)
+                yield from files
+                stack.extend(reversed(subdirs))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def _visit_directory(
+        self,
+        dir_path: str,
+        prefix: str,
+        ignores: IgnoreStack
+    ) -> Tuple[List[WalkEntry], List[Tuple[str, str, IgnoreStack]]]:
+        """
+        List one directory and filter its entries.
+        
+        Returns the files to yield, with their stat results, and the
+        subdirectories to enter, each with the ignore stack in force in it.
+        """
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            return [], []
+        
+        # Ignore files found in the listing apply to this directory's entries
+        present = {entry.name for entry in entries if entry.name in self.ignore_files}
+        if present:
+            names = [name for name in self.ignore_files if name in present]
+            ignores = ignores.push(self._directory_spec(dir_path, names), prefix)
+        
+        files, subdirs = [], []
+        for entry in entries:
+            relative = prefix + entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            
+            if is_dir:
+                # Symlinked directories are not followed
+                dir_relative = relative + "/"
+                if not (entry.is_symlink() or self._exclude.match(dir_relative) or ignores.is_ignored(dir_relative)):
+                    subdirs.append((entry.path, dir_relative, ignores))
+                continue
             
-            # Check if directory should be excluded
-            if self._should_exclude_directory(relative_dir):
-                dir_names.clear()  # Don't recurse into excluded directories
+            if self._should_include(relative, entry.name) and not ignores.is_ignored(relative):
+                try:
+                    stat_result = entry.stat()
+                except OSError:
+                    stat_result = None
+                files.append(WalkEntry(Path(entry.path), stat_result))
+        return files, subdirs
+    
+    def _scan_git(self, root_path: Path) -> Iterator[WalkEntry]:
+        """
+        List files from the git index instead of walking the tree.
+        
+        Git has already applied .gitignore and its excludes, so only the
+        patterns and .cbigignore files are checked here. Outside a git
+        checkout this falls back to walking the directory.
+        """
+        try:
+            listed = list_files(root_path)
+        except GitError as e:
+            logger.warning(f"Cannot list files with git ({e}), walking {root_path} instead")
+            # A scandir walker, so that .gitignore files apply again
+            fallback = FileWalker(self.include_patterns, self.exclude_patterns, walk_threads=self.walk_threads)
+            yield from fallback._scan_directory(root_path)
+            return
+        
+        directories = {"": self._root_ignores(root_path).push(self._directory_spec(root_path), "")}
+        for relative, blob_id in listed:
+            prefix, _, name = relative.rpartition("/")
+            ignores = self._directory_ignores(root_path, prefix + "/" if prefix else "", directories)
+            if ignores is not None and self._should_include(relative, name) and not ignores.is_ignored(relative):
+                yield WalkEntry(root_path / relative, None, blob_id)
+    
+    def filter_paths(self, root_path: Path, relative_paths: List[str]) -> Iterator[Path]:
+        """
+        Yield the given paths (relative to root_path) that walk() would yield.
+        
+        Applies the same directory, pattern and ignore-file filters without
+        walking the tree. Paths that no longer exist are skipped.
+        """
+        # Ignore stack of each directory prefix, None for pruned directories
+        directories = {"": self._root_ignores(root_path).push(self._directory_spec(root_path), "")}
+        
+        for relative in relative_paths:
+            relative = Path(relative).as_posix()
+            file_path = root_path / relative
+            if not file_path.is_file():
                 continue
             
-            # Process files in current directory
-            for file_name in file_names:
-                file_path = current_dir / file_name
-                relative_file = file_path.relative_to(root_path)
-                
-                # Apply all filters
-                if (self._should_include_file(file_path, root_path) and
-                    not self._is_gitignored(relative_file, gitignore_spec)):
-                    yield file_path
+            prefix, _, name = relative.rpartition("/")
+            ignores = self._directory_ignores(root_path, prefix + "/" if prefix else "", directories)
+            if ignores is None:
+                continue
+            if self._should_include(relative, name) and not ignores.is_ignored(relative):
+                yield file_path
+    
+    def matches(self, relative: str) -> bool:
+        """
+        Whether walk() would yield a file at this '/'-separated relative path, judging by the path alone.
+        
+        Excluded directories prune everything under them and the patterns
+        apply as in a walk, but no ignore files are read. This filters
+        listings of files that are not on disk, such as archive members.
+        """
+        directory, _, name = relative.rpartition("/")
+        return not self._is_pruned(directory) and self._should_include(relative, name)
+    
+    def _is_pruned(self, directory: str) -> bool:
+        """Whether a walk would skip the directory at this relative path ('' for the root) or one above it."""
+        if not directory:
+            return False
+        pruned = self._pruned.get(directory)
+        if pruned is None:
+            pruned = self._is_pruned(directory.rpartition("/")[0]) or self._exclude.match(directory + "/")
+            self._pruned[directory] = pruned
+        return pruned
+    
+    def _directory_ignores(self, root_path: Path, prefix: str, directories: dict) -> Optional[IgnoreStack]:
+        """The ignore stack inside the directory at `prefix`, or None if it or a parent is pruned."""
+        if prefix not in directories:
+            parent = prefix[:prefix.rfind("/", 0, -1) + 1]
+            ignores = self._directory_ignores(root_path, parent, directories)
+            if ignores is not None:
+                if self._exclude.match(prefix) or ignores.is_ignored(prefix):
+                    ignores = None
+                else:
+                    ignores = ignores.push(self._directory_spec(root_path / prefix), prefix)
+            directories[prefix] = ignores
+        return directories[prefix]
     
     def _should_include_file(self, file_path: Path, root_path: Path) -> bool:
         """Check if a file should be included based on patterns."""
@@ -111,96 +454,68 @@ class FileWalker:
             # File is not under root_path
             relative_path = file_path
         
-        relative_str = str(relative_path)
-        
+        return self._should_include(relative_path.as_posix(), file_path.name)
+    
+    def _should_include(self, relative: str, name: str) -> bool:
+        """Check a file's '/'-separated relative path against the patterns."""
         # Check exclude patterns
-        if self.exclude_spec.match_file(relative_str):
+        if self._exclude.match(relative):
             return False
         
         # Check include patterns (if specified)
-        if self.include_spec:
-            return self.include_spec.match_file(relative_str)
+        if self._include is not None:
+            return self._include.match(relative)
         
         # Default: include files that look like source code
-        return self._is_source_file(file_path)
+        return os.path.splitext(name)[1].lower() in SOURCE_EXTENSIONS
     
-    def _should_exclude_directory(self, dir_path: Path) -> bool:
-        """Check if a directory should be excluded."""
-        dir_str = str(dir_path)
-        if dir_str == ".":
-            return False
+    def _root_ignores(self, root_path: Path) -> IgnoreStack:
+        """
+        The ignore rules in force above the walk root.
         
-        return self.exclude_spec.match_file(dir_str + "/")
-    
-    def _is_source_file(self, file_path: Path) -> bool:
-        """Check if a file appears to be source code based on extension."""
-        source_extensions = {
-            '.py', '.pyi',           # Python
-            '.java',                 # Java
-            '.js', '.jsx', '.mjs', '.cjs',  # JavaScript
-            '.ts', '.tsx',           # TypeScript
-            '.html', '.htm',         # HTML
-            '.rs',                   # Rust
-            '.swift',                # Swift
-            '.c', '.h',              # C
-            '.cpp', '.cc', '.cxx', '.hpp',  # C++
-            '.go',                   # Go
-            '.rb',                   # Ruby
-            '.php',                  # PHP
-            '.cs',                   # C#
-            '.kt',                   # Kotlin
-            '.scala',                # Scala
-            '.sh', '.bash',          # Shell
-            '.sql',                  # SQL
-            '.xml',                  # XML
-            '.json',                 # JSON
-            '.yaml', '.yml',         # YAML
-            '.toml',                 # TOML
-            '.md', '.markdown',      # Markdown
-            '.txt',                  # Text
-            '.cfg', '.conf', '.ini', # Config files
-            '.dockerfile', '.Dockerfile'  # Docker
-        }
-        
-        return file_path.suffix.lower() in source_extensions
-    
-    def _load_gitignore(self, root_path: Path) -> pathspec.PathSpec:
-        """Load .gitignore patterns if available."""
-        gitignore_path = root_path / '.gitignore'
-        
-        if not gitignore_path.exists():
-            return pathspec.PathSpec([])
+        Inside a git repository these are the global excludes file,
+        .git/info/exclude and, when root_path is a subdirectory, the ignore
+        files of the directories between it and the repository root. In git
+        mode only the .cbigignore files apply.
+        """
+        ignores = IgnoreStack()
+        repository = find_repository(root_path)
+        if repository is None:
+            return ignores
         
+        top, git_dir = repository
+        parts = root_path.resolve().relative_to(top).parts
+        if GIT_IGNORE_FILE in self.ignore_files:
+            base = "".join(f"{part}/" for part in parts)
+            patterns = self._read_patterns(global_excludes_file(top)) + self._read_patterns(git_dir / "info" / "exclude")
+            ignores = ignores.push(CompiledSpec(pathspec.PathSpec.from_lines('gitwildmatch', patterns)), "", base)
+        for depth in range(len(parts)):
+            directory = top.joinpath(*parts[:depth])
+            ignores = ignores.push(self._directory_spec(directory), "", "".join(f"{part}/" for part in parts[depth:]))
+        return ignores
+    
+    def _directory_spec(self, directory, names: Optional[List[str]] = None) -> CompiledSpec:
+        """The patterns of a directory's ignore files (default: any of ignore_files)."""
+        patterns = []
+        for name in names or self.ignore_files:
+            patterns.extend(self._read_patterns(os.path.join(directory, name)))
+        if not patterns:
+            return _NO_PATTERNS
+        return CompiledSpec(pathspec.PathSpec.from_lines('gitwildmatch', patterns))
+    
+    def _read_patterns(self, path) -> List[str]:
+        """Read the patterns of an ignore file; a missing file has none."""
         try:
-            with open(gitignore_path, 'r', encoding='utf-8') as f:
+            with open(path, 'r', encoding='utf-8') as f:
                 patterns = f.read().splitlines()
-            
-            # Filter out comments and empty lines
-            patterns = [
-                line.strip() for line in patterns
-                if line.strip() and not line.strip().startswith('#')
-            ]
-            
-            return pathspec.PathSpec.from_lines('gitwildmatch', patterns)
-        
+        except (FileNotFoundError, NotADirectoryError):
+            return []
         except Exception as e:
-            logger.warning(f"Failed to read .gitignore: {e}")
-            return pathspec.PathSpec([])
-    
-    def _is_gitignored(self, relative_path: Path, gitignore_spec: pathspec.PathSpec) -> bool:
-        """Check if a file is ignored by gitignore patterns."""
-        if not gitignore_spec:
-            return False
-        
-        # Check file path
-        if gitignore_spec.match_file(str(relative_path)):
-            return True
+            logger.warning(f"Failed to read {path}: {e}")
+            return []
         
-        # Check if any parent directory is ignored
-        for parent in relative_path.parents:
-            if parent == Path('.'):
-                break
-            if gitignore_spec.match_file(str(parent) + '/'):
-                return True
-        
-        return False
\ No newline at end of file
+        # Filter out comments and empty lines
+        return [
+            line.strip() for line in patterns
+            if line.strip() and not line.strip().startswith('#')
+        ]
@@ -0,0 +1,118 @@
+"""Per-file work records carried through the analysis pipeline."""
+
+import mmap
+import os
+import re
+import stat
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from cbig.parsers.base import decode_source
+
+# Characters the language heuristics look at, as when they read the file themselves
+HEAD_CHARS = 2048
+
+# Files at least this large are memory-mapped rather than read into memory
+MMAP_THRESHOLD = 1 << 20
+
+# File contents: bytes, or a read-only mapping for large files
+Source = Union[bytes, mmap.mmap]
+
+# One match per line holding anything but whitespace, under any line ending
+_NON_BLANK_LINE = re.compile(rb'\S[^\r\n]*')
+
+
+def read_source(path: Path, size: Optional[int] = None) -> Source:
+    """Read a file's bytes, memory-mapping it if it is at least MMAP_THRESHOLD bytes."""
+    with open(path, 'rb') as f:
+        if size is None:
+            size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            try:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Emptied since it was stat'ed, or not mappable
+                pass
+        return f.read()
+
+
+def close_source(data: Optional[Source]):
+    """Unmap contents returned by read_source; bytes need no cleanup."""
+    if isinstance(data, mmap.mmap):
+        try:
+            data.close()
+        except BufferError:
+            # A buffer export is still alive; the mapping closes when it is collected
+            pass
+
+
+def count_loc(data: Source) -> int:
+    """Count non-blank lines in file contents without splitting them into lines."""
+    return sum(1 for _ in _NON_BLANK_LINE.finditer(data))
+
+
+class FileWork:
+    """
+    One file on its way through the pipeline.
+
+    The file is stat'ed once when the record is made and read at most
+    once, on first use of `data`. Language detection, cache hashing and
+    parsing all share those results instead of touching the file again.
+    Large files are memory-mapped, so `data` may be an mmap until release().
+    A git blob id from discovery lets the cache find a known file's
+    content hash without reading it at all. Files that are not on disk,
+    such as archive members, come with a `load` callable returning their
+    bytes, and a stat result describing them.
+    """
+
+    __slots__ = ("path", "stat", "blob_id", "load", "language", "_data")
+
+    def __init__(
+        self,
+        path: Path,
+        stat_result: Optional[os.stat_result] = None,
+        blob_id: Optional[str] = None,
+        load: Optional[Callable[[], bytes]] = None
+    ):
+        self.path = path
+        self.blob_id = blob_id
+        self.load = load
+        if stat_result is None and load is None:
+            try:
+                stat_result = os.stat(path)
+            except OSError:
+                stat_result = None
+        self.stat = stat_result
+        self.language: Optional[str] = None
+        self._data: Optional[Source] = None
+
+    def is_file(self) -> bool:
+        return self.stat is not None and stat.S_ISREG(self.stat.st_mode)
+
+    @property
+    def on_disk(self) -> bool:
+        """Whether the file exists at `path`, rather than inside an archive or object store."""
+        return self.load is None
+
+    @property
+    def size(self) -> int:
+        return self.stat.st_size if self.stat is not None else 0
+
+    @property
+    def data(self) -> Source:
+        """The file's raw contents, read or mapped on first access."""
+        if self._data is None:
+            if self.load is not None:
+                self._data = self.load()
+            else:
+                self._data = read_source(self.path, self.size if self.stat is not None else None)
+        return self._data
+
+    def text_head(self) -> str:
+        """The first HEAD_CHARS characters of the decoded file."""
+        return decode_source(self.data[:HEAD_CHARS * 4])[:HEAD_CHARS]
+
+    def release(self):
+        """Drop the file contents once they are no longer needed."""
+        close_source(self._data)
+        self._data = None
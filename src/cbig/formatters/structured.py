@@ -3,14 +3,77 @@
 import json
 import yaml
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel
 import logging
 
 from cbig.core.models import RepoSummary
+from cbig.core.interning import StringTable, interned_fields
+from cbig.core.symbols import SYMBOL_KINDS
 
 logger = logging.getLogger(__name__)
 
 
+# Schema of the structured report. Analysis passes plain records around;
+# they are validated into these models only here, once, on the way out.
+
+class DependencyRecord(BaseModel):
+    language: str
+    name: str
+    version: Optional[str] = None
+    source: Optional[str] = None
+    group: Optional[str] = None
+    artifact: Optional[str] = None
+
+
+class FunctionRecord(BaseModel):
+    language: str
+    file: str
+    name: str
+    signature: str
+    line_start: int
+    line_end: int
+    docstring: Optional[str] = None
+    is_method: bool = False
+    class_name: Optional[str] = None
+
+
+class ClassRecord(BaseModel):
+    language: str
+    file: str
+    name: str
+    kind: str
+    inherits: Optional[str] = None
+    implements: List[str] = []
+    line_start: int
+    line_end: int
+    doc: Optional[str] = None
+
+
+class CommentRecord(BaseModel):
+    language: str
+    file: str
+    line_start: int
+    line_end: int
+    text: str
+
+
+class RepoInfo(BaseModel):
+    root: str
+    languages: List[str]
+    summary: Dict[str, Any]
+    generated_at: str
+
+
+class Report(BaseModel):
+    repo: RepoInfo
+    dependencies: Optional[List[DependencyRecord]] = None
+    functions: Optional[List[FunctionRecord]] = None
+    classes: Optional[List[ClassRecord]] = None
+    comments: Optional[List[CommentRecord]] = None
+    scopes: Optional[Dict[str, Any]] = None
+
+
 class StructuredFormatter:
     """Formats analysis results as structured data (JSON, YAML, etc.)."""
     
@@ -33,7 +96,7 @@ class StructuredFormatter:
             logger.warning(f"Unsupported format: {self.format}")
     
     def _convert_to_dict(self, repo_summary: RepoSummary) -> Dict[str, Any]:
-        """Convert RepoSummary to dictionary for serialization."""
+        """Validate a RepoSummary against the report schema and convert it for serialization."""
         data = {
             "repo": {
                 "root": repo_summary.root,
@@ -47,67 +110,59 @@ class StructuredFormatter:
         sections = self.config.get("sections", {})
         
         if sections.get("deps", True):
-            data["dependencies"] = [
-                {
-                    "language": dep.language,
-                    "name": dep.name,
-                    "version": dep.version,
-                    "source": dep.source,
-                    "group": dep.group,
-                    "artifact": dep.artifact
-                }
-                for dep in repo_summary.dependencies
-            ]
+            data["dependencies"] = [dep._asdict() for dep in repo_summary.dependencies]
         
         if sections.get("functions", True):
-            data["functions"] = [
-                {
-                    "language": func.language,
-                    "file": func.file,
-                    "name": func.name,
-                    "signature": func.signature,
-                    "line_start": func.line_start,
-                    "line_end": func.line_end,
-                    "docstring": func.docstring,
-                    "is_method": func.is_method,
-                    "class_name": func.class_name
-                }
-                for func in repo_summary.functions
-            ]
+            data["functions"] = [func._asdict() for func in repo_summary.functions]
         
         if sections.get("classes", True):
-            data["classes"] = [
-                {
-                    "language": cls.language,
-                    "file": cls.file,
-                    "name": cls.name,
-                    "kind": cls.kind,
-                    "inherits": cls.inherits,
-                    "implements": cls.implements,
-                    "line_start": cls.line_start,
-                    "line_end": cls.line_end,
-                    "doc": cls.doc
-                }
-                for cls in repo_summary.classes
-            ]
+            data["classes"] = [cls._asdict() for cls in repo_summary.classes]
         
         if sections.get("comments", False):
-            data["comments"] = [
-                {
-                    "language": comment.language,
-                    "file": comment.file,
-                    "line_start": comment.line_start,
-                    "line_end": comment.line_end,
-                    "text": comment.text
-                }
-                for comment in repo_summary.comments
-            ]
+            data["comments"] = [comment._asdict() for comment in repo_summary.comments]
         
         # Add scopes if requested
         if self.config.get("include_scopes", False):
-            data["scopes"] = repo_summary.scopes
+            data["scopes"] = {
+                scope: {
+                    name: {kind: [record._asdict() for record in records] for kind, records in sections.items()}
+                    for name, sections in entries.items()
+                }
+                for scope, entries in repo_summary.scopes.items()
+            }
+        
+        report = Report.model_validate(data).model_dump(mode="json", exclude_unset=True)
+        if self.config.get("string_table", False) and self.format in ("json", "yaml"):
+            self._reference_strings(report)
+        return report
+    
+    def _reference_strings(self, report: Dict[str, Any]):
+        """
+        Replace the names, paths and languages of every record by their id.
+        
+        Ids index a string table built here and written once as `strings`;
+        free text such as signatures and docstrings is left inline.
+        """
+        strings = StringTable()
+        fields = {kind: interned_fields(record) for kind, record in SYMBOL_KINDS.items()}
+        
+        def reference(kind: str, entries: List[Dict[str, Any]]):
+            for entry in entries:
+                for field, field_kind in fields[kind].items():
+                    if field_kind == "str":
+                        entry[field] = strings.id(entry[field])
+                    else:
+                        entry[field] = [strings.id(value) for value in entry[field]]
+        
+        for kind in SYMBOL_KINDS:
+            if kind in report:
+                reference(kind, report[kind])
+        for entries in report.get("scopes", {}).values():
+            for sections in entries.values():
+                for kind, records in sections.items():
+                    reference(kind, records)
         
-        return data
+        report["strings"] = list(strings.strings)
     
     def _write_json(self, data: Dict[str, Any], output_path: Optional[str]):
         """Write data as JSON."""
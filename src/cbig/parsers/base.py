@@ -1,11 +1,29 @@
 """Base parser interface for language-specific parsers."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+import re
+from typing import Dict, List, Any, Union
 import logging
 
+from cbig.core.models import Dependency, Function, Class, Comment
+
 logger = logging.getLogger(__name__)
 
+# Searches any buffer, memoryviews included, without copying it
+_CARRIAGE_RETURN = re.compile(rb'\r')
+
+
+def normalize_newlines(data: Union[bytes, memoryview]) -> Union[bytes, memoryview]:
+    """Translate CRLF and lone CR line endings to LF as universal newlines would, copying only if needed."""
+    if _CARRIAGE_RETURN.search(data):
+        data = bytes(data).replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return data
+
+
+def decode_source(data: Union[bytes, memoryview]) -> str:
+    """Decode file bytes the way text-mode open() with errors='ignore' would."""
+    return str(normalize_newlines(data), 'utf-8', errors='ignore')
+
 
 class BaseParser(ABC):
     """Abstract base class for language-specific parsers."""
@@ -28,6 +46,16 @@ class BaseParser(ABC):
         """
         pass
     
+    def parse_bytes(self, data: Union[bytes, memoryview], file_path: str) -> Dict[str, Any]:
+        """
+        Parse a file's raw UTF-8 bytes.
+        
+        Same result as parse() on the decoded text. The default decodes and
+        delegates; parsers that work on bytes override it to skip decoding
+        the whole file and decode only the text they extract.
+        """
+        return self.parse(decode_source(data), file_path)
+    
     @abstractmethod
     def get_language(self) -> str:
         """Return the language this parser handles."""
@@ -47,19 +75,19 @@ class BaseParser(ABC):
         """
         return True
     
-    def extract_dependencies(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_dependencies(self, content: str, file_path: str) -> List[Dependency]:
         """Extract import/dependency information."""
         return []
     
-    def extract_functions(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_functions(self, content: str, file_path: str) -> List[Function]:
         """Extract function/method definitions."""
         return []
     
-    def extract_classes(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_classes(self, content: str, file_path: str) -> List[Class]:
         """Extract class/type definitions."""
         return []
     
-    def extract_comments(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_comments(self, content: str, file_path: str) -> List[Comment]:
         """Extract top-level comments."""
         return []
     
@@ -1,10 +1,11 @@
 """Generic parser for languages without specific Tree-sitter support."""
 
-import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import logging
 
+from cbig.core.models import Dependency, Function, Class, Comment
 from cbig.parsers.base import BaseParser
+from cbig.parsers.scanner import LineIndex, compile_patterns, scan_first
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +13,33 @@ logger = logging.getLogger(__name__)
 class GenericParser(BaseParser):
     """Generic parser that uses regex patterns for basic extraction."""
     
+    # Common import patterns across languages
+    DEPENDENCY_PATTERNS = compile_patterns([
+        r'import[^\S\n]+([a-zA-Z_][a-zA-Z0-9_./]*)',
+        r'#include[^\S\n]*[<"]([^>"\n]+)[>"]',
+        r'require[^\S\n]*\([\'"]([^\'"\n]+)[\'"]\)',
+        r'from[^\S\n]+([a-zA-Z_][a-zA-Z0-9_.]*)[^\S\n]+import',
+        r'use[^\S\n]+([a-zA-Z_][a-zA-Z0-9_:]*)',
+    ])
+    
+    # Common function patterns
+    FUNCTION_PATTERNS = compile_patterns([
+        r'^[^\S\n]*+(?:public|private|protected)?[^\S\n]*+(?:static)?[^\S\n]*+(?:async)?[^\S\n]*+function[^\S\n]++([a-zA-Z_][a-zA-Z0-9_]*)[^\S\n]*+\(',
+        r'^[^\S\n]*+def[^\S\n]++([a-zA-Z_][a-zA-Z0-9_]*)[^\S\n]*+\(',
+        r'^[^\S\n]*+(?:public|private|protected)?[^\S\n]*+([a-zA-Z_][a-zA-Z0-9_]*)[^\S\n]*+\([^)\n]*\)[^\S\n]*+{',
+        r'^[^\S\n]*+fn[^\S\n]++([a-zA-Z_][a-zA-Z0-9_]*)[^\S\n]*+\(',
+        r'^[^\S\n]*+func[^\S\n]++([a-zA-Z_][a-zA-Z0-9_]*)[^\S\n]*+\(',
+    ])
+    
+    # Common class patterns
+    CLASS_PATTERNS = compile_patterns([
+        r'^[^\S\n]*+class[^\S\n]++([a-zA-Z_][a-zA-Z0-9_]*)',
+        r'^[^\S\n]*+struct[^\S\n]++([a-zA-Z_][a-zA-Z0-9_]*)',
+        r'^[^\S\n]*+interface[^\S\n]++([a-zA-Z_][a-zA-Z0-9_]*)',
+        r'^[^\S\n]*+enum[^\S\n]++([a-zA-Z_][a-zA-Z0-9_]*)',
+        r'^[^\S\n]*+type[^\S\n]++([a-zA-Z_][a-zA-Z0-9_]*)',
+    ])
+    
     def __init__(self, language: str = "generic"):
         self.language = language
         self.version = "1.0.0"
@@ -23,127 +51,101 @@ class GenericParser(BaseParser):
         return self.version
     
     def parse(self, content: str, file_path: str) -> Dict[str, Any]:
-        """Parse source code using generic regex patterns."""
+        """
+        Parse source code using generic regex patterns.
+        
+        The line index is built once here and shared by the extractors;
+        called on their own, they build one themselves.
+        """
+        index = LineIndex(content)
         return {
-            'dependencies': self.extract_dependencies(content, file_path),
-            'functions': self.extract_functions(content, file_path),
-            'classes': self.extract_classes(content, file_path),
+            'dependencies': self.extract_dependencies(content, file_path, index),
+            'functions': self.extract_functions(content, file_path, index),
+            'classes': self.extract_classes(content, file_path, index),
             'comments': self.extract_comments(content, file_path)
         }
     
-    def extract_dependencies(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_dependencies(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Dependency]:
         """Extract import-like patterns."""
+        if index is None:
+            index = LineIndex(content)
         dependencies = []
         
-        # Common import patterns across languages
-        patterns = [
-            r'import\s+([a-zA-Z_][a-zA-Z0-9_./]*)',
-            r'#include\s*[<"]([^>"]+)[>"]',
-            r'require\s*\([\'"]([^\'"]+)[\'"]\)',
-            r'from\s+([a-zA-Z_][a-zA-Z0-9_.]*)\s+import',
-            r'use\s+([a-zA-Z_][a-zA-Z0-9_:]*)',
-        ]
-        
-        for line in content.splitlines():
-            line = line.strip()
-            for pattern in patterns:
-                match = re.search(pattern, line)
-                if match:
-                    dep_name = match.group(1)
-                    dependencies.append({
-                        'language': self.language,
-                        'name': dep_name,
-                        'version': None,
-                        'source': None
-                    })
+        for _, _, match in scan_first(index, self.DEPENDENCY_PATTERNS):
+            dep_name = match.group(1)
+            dependencies.append(Dependency(
+                language=self.language,
+                name=dep_name,
+                version=None,
+                source=None
+            ))
         
         return dependencies
     
-    def extract_functions(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_functions(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Function]:
         """Extract function-like patterns."""
         functions = []
-        lines = content.splitlines()
+        if index is None:
+            index = LineIndex(content)
         
-        # Common function patterns
-        patterns = [
-            r'^\s*(?:public|private|protected)?\s*(?:static)?\s*(?:async)?\s*function\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(',
-            r'^\s*def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(',
-            r'^\s*(?:public|private|protected)?\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\([^)]*\)\s*{',
-            r'^\s*fn\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(',
-            r'^\s*func\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(',
-        ]
-        
-        for i, line in enumerate(lines):
-            for pattern in patterns:
-                match = re.search(pattern, line)
-                if match:
-                    func_name = match.group(1)
-                    
-                    # Simple signature extraction
-                    signature = line.strip()
-                    if len(signature) > 100:
-                        signature = signature[:97] + "..."
-                    
-                    functions.append({
-                        'language': self.language,
-                        'file': file_path,
-                        'name': func_name,
-                        'signature': signature,
-                        'line_start': i + 1,
-                        'line_end': i + 1,  # Simplified - just one line
-                        'docstring': None,
-                        'is_method': False,
-                        'class_name': None
-                    })
+        for i, _, match in scan_first(index, self.FUNCTION_PATTERNS):
+            func_name = match.group(1)
+            
+            # Simple signature extraction
+            signature = index.line(i).strip()
+            if len(signature) > 100:
+                signature = signature[:97] + "..."
+            
+            functions.append(Function(
+                language=self.language,
+                file=file_path,
+                name=func_name,
+                signature=signature,
+                line_start=i + 1,
+                line_end=i + 1,  # Simplified - just one line
+                docstring=None,
+                is_method=False,
+                class_name=None
+            ))
         
         return functions
     
-    def extract_classes(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_classes(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Class]:
         """Extract class-like patterns."""
         classes = []
-        lines = content.splitlines()
-        
-        # Common class patterns
-        patterns = [
-            r'^\s*class\s+([a-zA-Z_][a-zA-Z0-9_]*)',
-            r'^\s*struct\s+([a-zA-Z_][a-zA-Z0-9_]*)',
-            r'^\s*interface\s+([a-zA-Z_][a-zA-Z0-9_]*)',
-            r'^\s*enum\s+([a-zA-Z_][a-zA-Z0-9_]*)',
-            r'^\s*type\s+([a-zA-Z_][a-zA-Z0-9_]*)',
-        ]
+        if index is None:
+            index = LineIndex(content)
         
-        for i, line in enumerate(lines):
-            for pattern in patterns:
-                match = re.search(pattern, line)
-                if match:
-                    class_name = match.group(1)
-                    
-                    # Determine kind from pattern
-                    kind = "class"
-                    if "struct" in line:
-                        kind = "struct"
-                    elif "interface" in line:
-                        kind = "interface"
-                    elif "enum" in line:
-                        kind = "enum"
-                    elif "type" in line:
-                        kind = "type"
-                    
-                    classes.append({
-                        'language': self.language,
-                        'file': file_path,
-                        'name': class_name,
-                        'kind': kind,
-                        'inherits': None,
-                        'implements': [],
-                        'line_start': i + 1,
-                        'line_end': i + 1,  # Simplified
-                        'doc': None
-                    })
+        for i, _, match in scan_first(index, self.CLASS_PATTERNS):
+            class_name = match.group(1)
+            line = index.line(i)
+            
+            # Determine kind from pattern
+            kind = "class"
+            if "struct" in line:
+                kind = "struct"
+            elif "interface" in line:
+                kind = "interface"
+            elif "enum" in line:
+                kind = "enum"
+            elif "type" in line:
+                kind = "type"
+            
+            classes.append(Class(
+                language=self.language,
+                file=file_path,
+                name=class_name,
+                kind=kind,
+                inherits=None,
+                implements=[],
+                line_start=i + 1,
+                line_end=i + 1,  # Simplified
+                doc=None
+            ))
         
         return classes
     
-    def extract_comments(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_comments(self, content: str, file_path: str) -> List[Comment]:
         """Extract comment blocks."""
         comments = []
         lines = content.splitlines()
@@ -206,10 +208,10 @@ class GenericParser(BaseParser):
         """Save a comment block to the results."""
         if len(block) >= 2:  # Only save multi-line comments
             comment_text = '\n'.join(block)
-            comments.append({
-                'language': self.language,
-                'file': file_path,
-                'line_start': start,
-                'line_end': end,
-                'text': comment_text
-            })
\ No newline at end of file
+            comments.append(Comment(
+                language=self.language,
+                file=file_path,
+                line_start=start,
+                line_end=end,
+                text=comment_text
+            ))
\ No newline at end of file
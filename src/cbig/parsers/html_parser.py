@@ -1,43 +1,180 @@
 """HTML language parser."""
 
 import re
-from typing import Dict, List, Any
-from cbig.parsers.generic_parser import GenericParser
+from typing import Dict, List, Any, Optional
+from cbig.core.models import Dependency, Function, Class
+from cbig.parsers.javascript_parser import JavaScriptParser
+from cbig.parsers.scanner import LineIndex, compile_patterns, scan_first, scan_all
+from cbig.parsers.tree_sitter_parser import TreeSitterParser, node_text
 
+try:
+    import tree_sitter_html as tshtml
+    TREE_SITTER_HTML_AVAILABLE = True
+except ImportError:
+    TREE_SITTER_HTML_AVAILABLE = False
 
-class HTMLParser(GenericParser):
+STYLE_IMPORT_PATTERN = re.compile(r'@import\s+[\'"]([^\'"]+)[\'"]', re.IGNORECASE)
+
+
+class HTMLParser(TreeSitterParser):
     """Parser for HTML source code."""
     
+    DEPENDENCY_PATTERNS = compile_patterns([
+        r'<script[^>\n]*src=[\'"]([^\'"\n]+)[\'"]',
+        r'<link[^>\n]*href=[\'"]([^\'"\n]+\.css)[\'"]',
+        r'<link[^>\n]*href=[\'"]([^\'"\n]+)[\'"][^>\n]*rel=[\'"]stylesheet[\'"]',
+        r'@import[^\S\n]+[\'"]([^\'"\n]+)[\'"]',
+    ], re.IGNORECASE)
+    
+    # Functions inside <script> blocks
+    SCRIPT_FUNCTION_PATTERNS = compile_patterns([
+        r'function[^\S\n]+(\w+)[^\S\n]*\(',
+        r'(?:const|let|var)[^\S\n]+(\w+)[^\S\n]*=[^\S\n]*function',
+        r'(\w+)[^\S\n]*:[^\S\n]*function'
+    ])
+    
+    # Custom elements and web components
+    CUSTOM_ELEMENT_PATTERN = compile_patterns([r'<([a-z]+-[a-z-]+)'], re.IGNORECASE)
+    
+    # HTML comments have no line form
+    LINE_COMMENT_PREFIX = None
+    
     def __init__(self):
-        super().__init__("html")
+        super().__init__("html", tshtml.language if TREE_SITTER_HTML_AVAILABLE else None)
+        # Inline scripts are handed to the JavaScript parser
+        self.script_parser = JavaScriptParser()
     
-    def extract_dependencies(self, content: str, file_path: str) -> List[Dict[str, Any]]:
-        """Extract HTML dependencies (scripts, stylesheets, etc.)."""
+    def _backend(self) -> str:
+        backend = super()._backend()
+        if self.tree_sitter_enabled and not self.script_parser.tree_sitter_enabled:
+            backend += "-regex-scripts"
+        return backend
+    
+    def _extract_ts(self, grammar, tree, file_path: str) -> Dict[str, Any]:
+        """
+        Extract dependencies, custom elements, script functions and comments from the query matches.
+        
+        Inline <script> bodies are parsed with the JavaScript grammar and their
+        functions and comments moved to the lines they occupy in the page.
+        """
         dependencies = []
+        functions = []
+        classes = []
+        comment_nodes = []
+        script_comments = []
+        found_elements = set()
         
-        patterns = [
-            r'<script[^>]*src=[\'"]([^\'"]+)[\'"]',
-            r'<link[^>]*href=[\'"]([^\'"]+\.css)[\'"]',
-            r'<link[^>]*href=[\'"]([^\'"]+)[\'"][^>]*rel=[\'"]stylesheet[\'"]',
-            r'@import\s+[\'"]([^\'"]+)[\'"]',
-        ]
+        captured = []
+        for _, captures in grammar.matches(tree.root_node):
+            for role, nodes in captures.items():
+                captured.extend((node.start_byte, role, node) for node in nodes)
+        captured.sort(key=lambda item: item[0])
         
-        for line in content.splitlines():
-            for pattern in patterns:
-                matches = re.findall(pattern, line, re.IGNORECASE)
-                for match in matches:
-                    # Skip data URLs and inline scripts
-                    if not match.startswith(('data:', 'javascript:', '#')):
-                        dependencies.append({
-                            'language': 'html',
-                            'name': match,
-                            'version': None,
-                            'source': 'web'
-                        })
+        for _, role, node in captured:
+            if role == 'tag':
+                tag_name, attributes = self._tag_ts(node)
+                lowered = tag_name.lower()
+                
+                name = None
+                if lowered == 'script':
+                    name = attributes.get('src')
+                elif lowered == 'link':
+                    href = attributes.get('href')
+                    if href and (href.lower().endswith('.css') or attributes.get('rel', '').lower() == 'stylesheet'):
+                        name = href
+                # Skip data URLs and inline scripts
+                if name and not name.startswith(('data:', 'javascript:', '#')):
+                    dependencies.append(self._dependency(name, 'web'))
+                
+                # Custom elements and web components
+                if '-' in tag_name and tag_name not in found_elements:
+                    found_elements.add(tag_name)
+                    classes.append(self._class(node.parent, file_path, tag_name, 'custom-element', None, [], None))
+            elif role == 'style':
+                for match in STYLE_IMPORT_PATTERN.finditer(node_text(node)):
+                    dependencies.append(self._dependency(match.group(1), 'web'))
+            elif role == 'script':
+                script = self._script_ts(node, file_path)
+                functions.extend(script['functions'])
+                script_comments.extend(script['comments'])
+            elif role == 'comment':
+                comment_nodes.append(node)
+        
+        comments = self._comment_blocks(comment_nodes, file_path) + script_comments
+        comments.sort(key=lambda comment: comment.line_start)
+        return {
+            'dependencies': dependencies,
+            'functions': functions,
+            'classes': classes,
+            'comments': comments
+        }
+    
+    def _tag_ts(self, node):
+        """Return a tag's name and its attributes, keyed by lowercased name."""
+        tag_name = ''
+        attributes = {}
+        for child in node.named_children:
+            if child.type == 'tag_name':
+                tag_name = node_text(child)
+            elif child.type == 'attribute':
+                name = None
+                value = ''
+                for part in child.named_children:
+                    if part.type == 'attribute_name':
+                        name = node_text(part).lower()
+                    elif part.type == 'attribute_value':
+                        value = node_text(part)
+                    elif part.type == 'quoted_attribute_value':
+                        value = node_text(part)[1:-1]
+                if name:
+                    attributes[name] = value
+        return tag_name, attributes
+    
+    def _script_ts(self, node, file_path: str) -> Dict[str, Any]:
+        """Extract the functions and comments of an inline script body."""
+        content = node_text(node)
+        first_line = node.start_point[0]
+        
+        if not self.script_parser.tree_sitter_enabled:
+            return {
+                'functions': self._extract_js_functions_from_content(content, file_path, first_line + 1),
+                'comments': []
+            }
+        
+        grammar = self.script_parser.grammar
+        script = self.script_parser._extract_ts(grammar, grammar.parse(node.text), file_path)
+        return {
+            kind: [
+                entry._replace(
+                    language='html',
+                    line_start=entry.line_start + first_line,
+                    line_end=entry.line_end + first_line
+                )
+                for entry in script[kind]
+            ]
+            for kind in ('functions', 'comments')
+        }
+    
+    def extract_dependencies(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Dependency]:
+        """Extract HTML dependencies (scripts, stylesheets, etc.)."""
+        if index is None:
+            index = LineIndex(content)
+        dependencies = []
+        
+        for _, _, match in scan_all(index, self.DEPENDENCY_PATTERNS):
+            name = match.group(1)
+            # Skip data URLs and inline scripts
+            if not name.startswith(('data:', 'javascript:', '#')):
+                dependencies.append(Dependency(
+                    language='html',
+                    name=name,
+                    version=None,
+                    source='web'
+                ))
         
         return dependencies
     
-    def extract_functions(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_functions(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Function]:
         """Extract JavaScript functions embedded in HTML."""
         functions = []
         lines = content.splitlines()
@@ -63,65 +200,53 @@ class HTMLParser(GenericParser):
         
         return functions
     
-    def _extract_js_functions_from_content(self, content: str, file_path: str, start_line: int) -> List[Dict[str, Any]]:
+    def _extract_js_functions_from_content(self, content: str, file_path: str, start_line: int) -> List[Function]:
         """Extract JavaScript functions from script content."""
         functions = []
-        lines = content.splitlines()
-        
-        patterns = [
-            r'function\s+(\w+)\s*\(',
-            r'(?:const|let|var)\s+(\w+)\s*=\s*function',
-            r'(\w+)\s*:\s*function'
-        ]
+        index = LineIndex(content)
         
-        for i, line in enumerate(lines):
-            for pattern in patterns:
-                match = re.search(pattern, line)
-                if match:
-                    func_name = match.group(1)
-                    
-                    signature = line.strip()
-                    if len(signature) > 100:
-                        signature = signature[:97] + "..."
-                    
-                    functions.append({
-                        'language': 'html',
-                        'file': file_path,
-                        'name': func_name,
-                        'signature': signature,
-                        'line_start': start_line + i,
-                        'line_end': start_line + i,
-                        'docstring': None,
-                        'is_method': False,
-                        'class_name': None
-                    })
+        for i, _, match in scan_first(index, self.SCRIPT_FUNCTION_PATTERNS):
+            func_name = match.group(1)
+            
+            signature = index.line(i).strip()
+            if len(signature) > 100:
+                signature = signature[:97] + "..."
+            
+            functions.append(Function(
+                language='html',
+                file=file_path,
+                name=func_name,
+                signature=signature,
+                line_start=start_line + i,
+                line_end=start_line + i,
+                docstring=None,
+                is_method=False,
+                class_name=None
+            ))
         
         return functions
     
-    def extract_classes(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_classes(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Class]:
         """Extract HTML elements as 'classes' (custom elements, components)."""
+        if index is None:
+            index = LineIndex(content)
         classes = []
-        lines = content.splitlines()
-        
-        # Look for custom elements and web components
-        custom_element_pattern = r'<([a-z]+-[a-z-]+)'
         
         found_elements = set()
-        for i, line in enumerate(lines):
-            matches = re.findall(custom_element_pattern, line, re.IGNORECASE)
-            for match in matches:
-                if match not in found_elements:
-                    found_elements.add(match)
-                    classes.append({
-                        'language': 'html',
-                        'file': file_path,
-                        'name': match,
-                        'kind': 'custom-element',
-                        'inherits': None,
-                        'implements': [],
-                        'line_start': i + 1,
-                        'line_end': i + 1,
-                        'doc': None
-                    })
+        for i, _, match in scan_all(index, self.CUSTOM_ELEMENT_PATTERN):
+            name = match.group(1)
+            if name not in found_elements:
+                found_elements.add(name)
+                classes.append(Class(
+                    language='html',
+                    file=file_path,
+                    name=name,
+                    kind='custom-element',
+                    inherits=None,
+                    implements=[],
+                    line_start=i + 1,
+                    line_end=i + 1,
+                    doc=None
+                ))
         
         return classes
\ No newline at end of file
@@ -1,119 +1,188 @@
 """Java language parser."""
 
 import re
-from typing import Dict, List, Any
-from cbig.parsers.generic_parser import GenericParser
+from typing import Dict, List, Any, Optional
+from cbig.core.models import Dependency, Function, Class
+from cbig.parsers.scanner import LineIndex, compile_patterns, scan_first
+from cbig.parsers.tree_sitter_parser import TreeSitterParser, node_text
 
+try:
+    import tree_sitter_java as tsjava
+    TREE_SITTER_JAVA_AVAILABLE = True
+except ImportError:
+    TREE_SITTER_JAVA_AVAILABLE = False
 
-class JavaParser(GenericParser):
+EXTENDS_PATTERN = re.compile(r'extends\s+(\w+)')
+IMPLEMENTS_PATTERN = re.compile(r'implements\s+([^{]+)')
+
+
+def _type_name(node) -> str:
+    """Return a type's name without its type arguments."""
+    if node.type == 'generic_type':
+        node = node.named_children[0]
+    return node_text(node)
+
+
+class JavaParser(TreeSitterParser):
     """Parser for Java source code."""
     
+    DEPENDENCY_PATTERNS = compile_patterns([
+        r'import[^\S\n]+(?:static[^\S\n]+)?([a-zA-Z_][a-zA-Z0-9_.]*)',
+        r'package[^\S\n]+([a-zA-Z_][a-zA-Z0-9_.]*)'
+    ])
+    
+    # Java method pattern
+    FUNCTION_PATTERNS = compile_patterns([
+        r'^[^\S\n]*+(?:public|private|protected)?[^\S\n]*+(?:static)?[^\S\n]*+(?:final)?[^\S\n]*+(?:\w+[^\S\n]++)?(\w+)[^\S\n]*+\([^)\n]*\)[^\S\n]*+(?:throws[^\S\n]++\w+)?[^\S\n]*+{'
+    ])
+    
+    # Java class patterns
+    CLASS_PATTERNS = compile_patterns([
+        r'^[^\S\n]*+(?:public|private|protected)?[^\S\n]*+(?:static)?[^\S\n]*+(?:final)?[^\S\n]*+class[^\S\n]++(\w+)',
+        r'^[^\S\n]*+(?:public|private|protected)?[^\S\n]*+(?:static)?[^\S\n]*+interface[^\S\n]++(\w+)',
+        r'^[^\S\n]*+(?:public|private|protected)?[^\S\n]*+(?:static)?[^\S\n]*+enum[^\S\n]++(\w+)',
+        r'^[^\S\n]*+(?:public|private|protected)?[^\S\n]*+(?:static)?[^\S\n]*+@interface[^\S\n]++(\w+)'
+    ])
+    CLASS_KINDS = ('class', 'interface', 'enum', 'annotation')
+    
     def __init__(self):
-        super().__init__("java")
+        super().__init__("java", tsjava.language if TREE_SITTER_JAVA_AVAILABLE else None)
+    
+    def _dependencies_ts(self, node, captures: Dict[str, List]) -> List[Dependency]:
+        """Build the dependency of an import or package declaration."""
+        return [self._dependency(node_text(node), 'maven')]
+    
+    def _function_ts(self, node, file_path: str, class_name: Optional[str],
+                     captures: Dict[str, List], docs: Dict) -> Optional[Function]:
+        """Build a function entry from a method or constructor declaration."""
+        name_node = self._capture(captures, 'name')
+        signature = self._signature(node, self._capture(captures, 'body'), self._signature_start(node))
+        function = self._function(node, file_path, node_text(name_node), signature, class_name, self._doc(node, docs))
+        # Every Java method belongs to a type
+        return function._replace(is_method=True)
     
-    def extract_dependencies(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def _class_ts(self, node, file_path: str, kind: str,
+                  captures: Dict[str, List], docs: Dict) -> Optional[Class]:
+        """Build a class entry from a type declaration."""
+        name_node = self._capture(captures, 'name')
+        inherits = None
+        implements = []
+        
+        superclass = node.child_by_field_name('superclass')
+        if superclass is not None and superclass.named_children:
+            inherits = _type_name(superclass.named_children[0])
+        
+        for child in node.named_children:
+            if child.type == 'super_interfaces':
+                implements = [node_text(item) for item in self._type_list(child)]
+            elif child.type == 'extends_interfaces':
+                # An interface's first parent, as in the regex path
+                parents = self._type_list(child)
+                inherits = _type_name(parents[0]) if parents else None
+        
+        return self._class(node, file_path, node_text(name_node), kind, inherits, implements, self._doc(node, docs))
+    
+    def _type_list(self, node) -> List:
+        """Return the type nodes listed in an implements or extends clause."""
+        for child in node.named_children:
+            if child.type == 'type_list':
+                return child.named_children
+        return []
+    
+    def _signature_start(self, node) -> int:
+        """Return where a declaration's signature starts, past any leading annotations."""
+        first = node.children[0]
+        if first.type != 'modifiers':
+            return node.start_byte
+        for modifier in first.children:
+            if modifier.type not in ('marker_annotation', 'annotation'):
+                return modifier.start_byte
+        return first.end_byte
+    
+    def extract_dependencies(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Dependency]:
         """Extract Java import statements."""
+        if index is None:
+            index = LineIndex(content)
         dependencies = []
         
-        patterns = [
-            r'import\s+(?:static\s+)?([a-zA-Z_][a-zA-Z0-9_.]*)',
-            r'package\s+([a-zA-Z_][a-zA-Z0-9_.]*)'
-        ]
-        
-        for line in content.splitlines():
-            line = line.strip()
-            for pattern in patterns:
-                match = re.search(pattern, line)
-                if match:
-                    dep_name = match.group(1)
-                    dependencies.append({
-                        'language': 'java',
-                        'name': dep_name,
-                        'version': None,
-                        'source': 'maven'
-                    })
+        for _, _, match in scan_first(index, self.DEPENDENCY_PATTERNS):
+            dep_name = match.group(1)
+            dependencies.append(Dependency(
+                language='java',
+                name=dep_name,
+                version=None,
+                source='maven'
+            ))
         
         return dependencies
     
-    def extract_functions(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_functions(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Function]:
         """Extract Java method definitions."""
         functions = []
-        lines = content.splitlines()
+        if index is None:
+            index = LineIndex(content)
         
-        # Java method pattern
-        method_pattern = r'^\s*(?:public|private|protected)?\s*(?:static)?\s*(?:final)?\s*(?:\w+\s+)?(\w+)\s*\([^)]*\)\s*(?:throws\s+\w+)?\s*{'
-        
-        for i, line in enumerate(lines):
-            match = re.search(method_pattern, line)
-            if match:
-                method_name = match.group(1)
-                
-                # Skip constructors and common non-method patterns
-                if method_name in ['if', 'for', 'while', 'switch', 'try', 'catch']:
-                    continue
-                
-                signature = line.strip()
-                if len(signature) > 100:
-                    signature = signature[:97] + "..."
-                
-                functions.append({
-                    'language': 'java',
-                    'file': file_path,
-                    'name': method_name,
-                    'signature': signature,
-                    'line_start': i + 1,
-                    'line_end': i + 1,
-                    'docstring': None,
-                    'is_method': True,
-                    'class_name': None
-                })
+        for i, _, match in scan_first(index, self.FUNCTION_PATTERNS):
+            method_name = match.group(1)
+            
+            # Skip constructors and common non-method patterns
+            if method_name in ['if', 'for', 'while', 'switch', 'try', 'catch']:
+                continue
+            
+            signature = index.line(i).strip()
+            if len(signature) > 100:
+                signature = signature[:97] + "..."
+            
+            functions.append(Function(
+                language='java',
+                file=file_path,
+                name=method_name,
+                signature=signature,
+                line_start=i + 1,
+                line_end=i + 1,
+                docstring=None,
+                is_method=True,
+                class_name=None
+            ))
         
         return functions
     
-    def extract_classes(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_classes(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Class]:
         """Extract Java class definitions."""
         classes = []
-        lines = content.splitlines()
-        
-        # Java class patterns
-        patterns = [
-            (r'^\s*(?:public|private|protected)?\s*(?:static)?\s*(?:final)?\s*class\s+(\w+)', 'class'),
-            (r'^\s*(?:public|private|protected)?\s*(?:static)?\s*interface\s+(\w+)', 'interface'),
-            (r'^\s*(?:public|private|protected)?\s*(?:static)?\s*enum\s+(\w+)', 'enum'),
-            (r'^\s*(?:public|private|protected)?\s*(?:static)?\s*@interface\s+(\w+)', 'annotation')
-        ]
+        if index is None:
+            index = LineIndex(content)
         
-        for i, line in enumerate(lines):
-            for pattern, kind in patterns:
-                match = re.search(pattern, line)
-                if match:
-                    class_name = match.group(1)
-                    
-                    # Extract inheritance/implementation
-                    inherits = None
-                    implements = []
-                    
-                    if 'extends' in line:
-                        extends_match = re.search(r'extends\s+(\w+)', line)
-                        if extends_match:
-                            inherits = extends_match.group(1)
-                    
-                    if 'implements' in line:
-                        implements_match = re.search(r'implements\s+([^{]+)', line)
-                        if implements_match:
-                            impl_text = implements_match.group(1).strip()
-                            implements = [iface.strip() for iface in impl_text.split(',')]
-                    
-                    classes.append({
-                        'language': 'java',
-                        'file': file_path,
-                        'name': class_name,
-                        'kind': kind,
-                        'inherits': inherits,
-                        'implements': implements,
-                        'line_start': i + 1,
-                        'line_end': i + 1,
-                        'doc': None
-                    })
+        for i, position, match in scan_first(index, self.CLASS_PATTERNS):
+            class_name = match.group(1)
+            kind = self.CLASS_KINDS[position]
+            line = index.line(i)
+            
+            # Extract inheritance/implementation
+            inherits = None
+            implements = []
+            
+            if 'extends' in line:
+                extends_match = EXTENDS_PATTERN.search(line)
+                if extends_match:
+                    inherits = extends_match.group(1)
+            
+            if 'implements' in line:
+                implements_match = IMPLEMENTS_PATTERN.search(line)
+                if implements_match:
+                    impl_text = implements_match.group(1).strip()
+                    implements = [iface.strip() for iface in impl_text.split(',')]
+            
+            classes.append(Class(
+                language='java',
+                file=file_path,
+                name=class_name,
+                kind=kind,
+                inherits=inherits,
+                implements=implements,
+                line_start=i + 1,
+                line_end=i + 1,
+                doc=None
+            ))
         
-        return classes
\ No newline at end of file
+        return classes
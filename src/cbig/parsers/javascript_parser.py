@@ -1,129 +1,235 @@
 """JavaScript/TypeScript language parser."""
 
 import re
-from typing import Dict, List, Any
-from cbig.parsers.generic_parser import GenericParser
+from typing import Dict, List, Any, Optional
+from cbig.core.models import Dependency, Function, Class
+from cbig.parsers.scanner import LineIndex, compile_patterns, scan_first
+from cbig.parsers.tree_sitter_parser import TreeSitterParser, node_text
 
+try:
+    import tree_sitter_javascript as tsjavascript
+    TREE_SITTER_JAVASCRIPT_AVAILABLE = True
+except ImportError:
+    TREE_SITTER_JAVASCRIPT_AVAILABLE = False
 
-class JavaScriptParser(GenericParser):
+# TypeScript support is optional; without it .ts/.tsx files use regex extraction
+try:
+    import tree_sitter_typescript as tstypescript
+    TREE_SITTER_TYPESCRIPT_AVAILABLE = True
+except ImportError:
+    TREE_SITTER_TYPESCRIPT_AVAILABLE = False
+
+EXTENDS_PATTERN = re.compile(r'extends\s+(\w+)')
+IMPLEMENTS_PATTERN = re.compile(r'implements\s+([^{]+)')
+
+TYPESCRIPT_SUFFIXES = ('.ts', '.mts', '.cts')
+TSX_SUFFIXES = ('.tsx',)
+
+# Values that make a variable declarator or object pair a function
+FUNCTION_VALUES = frozenset({'arrow_function', 'function_expression', 'function', 'generator_function'})
+
+
+class JavaScriptParser(TreeSitterParser):
     """Parser for JavaScript and TypeScript source code."""
     
+    DEPENDENCY_PATTERNS = compile_patterns([
+        r'import[^\S\n]+.*?[^\S\n]+from[^\S\n]+[\'"]([^\'"\n]+)[\'"]',
+        r'import[^\S\n]+[\'"]([^\'"\n]+)[\'"]',
+        r'require[^\S\n]*\([^\S\n]*[\'"]([^\'"\n]+)[\'"][^\S\n]*\)',
+        r'import[^\S\n]*\([^\S\n]*[\'"]([^\'"\n]+)[\'"][^\S\n]*\)'
+    ])
+    
+    FUNCTION_PATTERNS = compile_patterns([
+        r'^[^\S\n]*+function[^\S\n]++(\w+)[^\S\n]*+\(',
+        r'^[^\S\n]*+(?:const|let|var)[^\S\n]++(\w+)[^\S\n]*+=[^\S\n]*+(?:async[^\S\n]++)?function',
+        r'^[^\S\n]*+(?:const|let|var)[^\S\n]++(\w+)[^\S\n]*+=[^\S\n]*+(?:async[^\S\n]++)?\(',
+        r'^[^\S\n]*+(\w+)[^\S\n]*+:[^\S\n]*+(?:async[^\S\n]++)?function',
+        r'^[^\S\n]*+(?:async[^\S\n]++)?(\w+)[^\S\n]*+\([^)\n]*\)[^\S\n]*+{',
+        r'^[^\S\n]*+(?:export[^\S\n]++)?(?:async[^\S\n]++)?function[^\S\n]++(\w+)',
+    ])
+    
+    CLASS_PATTERNS = compile_patterns([
+        r'^[^\S\n]*+(?:export[^\S\n]++)?class[^\S\n]++(\w+)',
+        r'^[^\S\n]*+(?:export[^\S\n]++)?interface[^\S\n]++(\w+)',
+        r'^[^\S\n]*+(?:export[^\S\n]++)?type[^\S\n]++(\w+)',
+        r'^[^\S\n]*+(?:export[^\S\n]++)?enum[^\S\n]++(\w+)'
+    ])
+    CLASS_KINDS = ('class', 'interface', 'type', 'enum')
+    
+    # Declarations whose JSDoc sits above an enclosing statement
+    DOC_WRAPPERS = frozenset({'export_statement', 'lexical_declaration', 'variable_declaration'})
+    
     def __init__(self):
-        super().__init__("javascript")
+        super().__init__("javascript", tsjavascript.language if TREE_SITTER_JAVASCRIPT_AVAILABLE else None)
+        
+        self.typescript_grammar = None
+        self.tsx_grammar = None
+        if self.tree_sitter_enabled and TREE_SITTER_TYPESCRIPT_AVAILABLE:
+            self.typescript_grammar = self._load_grammar(tstypescript.language_typescript, "typescript")
+            self.tsx_grammar = self._load_grammar(tstypescript.language_tsx, "typescript")
+    
+    def _backend(self) -> str:
+        backend = super()._backend()
+        if self.tree_sitter_enabled and (self.typescript_grammar is None or self.tsx_grammar is None):
+            # TypeScript files still go through regex extraction
+            backend += "-js-only"
+        return backend
+    
+    def _select_grammar(self, file_path: str):
+        """Pick the grammar by extension; JSX is part of the JavaScript grammar."""
+        lowered = file_path.lower()
+        if lowered.endswith(TSX_SUFFIXES):
+            return self.tsx_grammar
+        if lowered.endswith(TYPESCRIPT_SUFFIXES):
+            return self.typescript_grammar
+        return self.grammar
     
-    def extract_dependencies(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def _dependencies_ts(self, node, captures: Dict[str, List]) -> List[Dependency]:
+        """Build the dependency of an import, re-export, require() or import() call."""
+        name = node_text(node)[1:-1]
+        # Skip relative imports
+        if not name or name.startswith('.'):
+            return []
+        return [self._dependency(name, 'npm')]
+    
+    def _function_ts(self, node, file_path: str, class_name: Optional[str],
+                     captures: Dict[str, List], docs: Dict) -> Optional[Function]:
+        """Build a function entry from a declaration, method, or function-valued variable or property."""
+        node_type = node.type
+        outer = node
+        
+        if node_type in ('variable_declarator', 'pair'):
+            value = self._capture(captures, 'value')
+            if value.type not in FUNCTION_VALUES:
+                return None
+            body = value.child_by_field_name('body')
+            if node_type == 'variable_declarator' and node.parent.named_child_count == 1:
+                # Report the whole `const name = ...` declaration
+                outer = node.parent
+        else:
+            body = self._capture(captures, 'body')
+            if node_type == 'method_definition' and node.parent is not None and node.parent.type != 'class_body':
+                # Object literal shorthand methods do not belong to a class
+                class_name = None
+        
+        name_node = self._capture(captures, 'name')
+        name = node_text(name_node)
+        if name_node.type == 'string':
+            name = name[1:-1]
+        if not name:
+            return None
+        
+        return self._function(outer, file_path, name, self._signature(outer, body), class_name, self._doc(outer, docs))
+    
+    def _class_ts(self, node, file_path: str, kind: str,
+                  captures: Dict[str, List], docs: Dict) -> Optional[Class]:
+        """Build a class entry from a class, interface, type alias or enum declaration."""
+        inherits = None
+        implements = []
+        
+        for child in node.named_children:
+            if child.type == 'class_heritage':
+                for clause in child.named_children:
+                    if clause.type == 'extends_clause':
+                        value = clause.child_by_field_name('value')
+                        inherits = node_text(value if value is not None else clause.named_children[0])
+                    elif clause.type == 'implements_clause':
+                        implements = [node_text(item) for item in clause.named_children]
+                    else:
+                        # JavaScript: `extends <expression>`
+                        inherits = node_text(clause)
+            elif child.type == 'extends_type_clause' and child.named_children:
+                inherits = node_text(child.named_children[0])
+        
+        name = node_text(self._capture(captures, 'name'))
+        return self._class(node, file_path, name, kind, inherits, implements, self._doc(node, docs))
+    
+    def extract_dependencies(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Dependency]:
         """Extract JavaScript/TypeScript import statements."""
+        if index is None:
+            index = LineIndex(content)
         dependencies = []
         
-        patterns = [
-            r'import\s+.*?\s+from\s+[\'"]([^\'"]+)[\'"]',
-            r'import\s+[\'"]([^\'"]+)[\'"]',
-            r'require\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)',
-            r'import\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)'
-        ]
-        
-        for line in content.splitlines():
-            line = line.strip()
-            for pattern in patterns:
-                match = re.search(pattern, line)
-                if match:
-                    dep_name = match.group(1)
-                    # Skip relative imports
-                    if not dep_name.startswith('.'):
-                        dependencies.append({
-                            'language': 'javascript',
-                            'name': dep_name,
-                            'version': None,
-                            'source': 'npm'
-                        })
+        for _, _, match in scan_first(index, self.DEPENDENCY_PATTERNS):
+            dep_name = match.group(1)
+            # Skip relative imports
+            if not dep_name.startswith('.'):
+                dependencies.append(Dependency(
+                    language='javascript',
+                    name=dep_name,
+                    version=None,
+                    source='npm'
+                ))
         
         return dependencies
     
-    def extract_functions(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_functions(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Function]:
         """Extract JavaScript/TypeScript function definitions."""
         functions = []
-        lines = content.splitlines()
+        if index is None:
+            index = LineIndex(content)
         
-        patterns = [
-            r'^\s*function\s+(\w+)\s*\(',
-            r'^\s*(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?function',
-            r'^\s*(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\(',
-            r'^\s*(\w+)\s*:\s*(?:async\s+)?function',
-            r'^\s*(?:async\s+)?(\w+)\s*\([^)]*\)\s*{',
-            r'^\s*(?:export\s+)?(?:async\s+)?function\s+(\w+)',
-        ]
-        
-        for i, line in enumerate(lines):
-            for pattern in patterns:
-                match = re.search(pattern, line)
-                if match:
-                    func_name = match.group(1)
-                    
-                    # Skip common keywords
-                    if func_name in ['if', 'for', 'while', 'switch', 'try', 'catch', 'class']:
-                        continue
-                    
-                    signature = line.strip()
-                    if len(signature) > 100:
-                        signature = signature[:97] + "..."
-                    
-                    functions.append({
-                        'language': 'javascript',
-                        'file': file_path,
-                        'name': func_name,
-                        'signature': signature,
-                        'line_start': i + 1,
-                        'line_end': i + 1,
-                        'docstring': None,
-                        'is_method': False,
-                        'class_name': None
-                    })
+        for i, _, match in scan_first(index, self.FUNCTION_PATTERNS):
+            func_name = match.group(1)
+            
+            # Skip common keywords
+            if func_name in ['if', 'for', 'while', 'switch', 'try', 'catch', 'class']:
+                continue
+            
+            signature = index.line(i).strip()
+            if len(signature) > 100:
+                signature = signature[:97] + "..."
+            
+            functions.append(Function(
+                language='javascript',
+                file=file_path,
+                name=func_name,
+                signature=signature,
+                line_start=i + 1,
+                line_end=i + 1,
+                docstring=None,
+                is_method=False,
+                class_name=None
+            ))
         
         return functions
     
-    def extract_classes(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_classes(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Class]:
         """Extract JavaScript/TypeScript class definitions."""
         classes = []
-        lines = content.splitlines()
-        
-        patterns = [
-            (r'^\s*(?:export\s+)?class\s+(\w+)', 'class'),
-            (r'^\s*(?:export\s+)?interface\s+(\w+)', 'interface'),
-            (r'^\s*(?:export\s+)?type\s+(\w+)', 'type'),
-            (r'^\s*(?:export\s+)?enum\s+(\w+)', 'enum')
-        ]
+        if index is None:
+            index = LineIndex(content)
         
-        for i, line in enumerate(lines):
-            for pattern, kind in patterns:
-                match = re.search(pattern, line)
-                if match:
-                    class_name = match.group(1)
-                    
-                    # Extract inheritance
-                    inherits = None
-                    implements = []
-                    
-                    if 'extends' in line:
-                        extends_match = re.search(r'extends\s+(\w+)', line)
-                        if extends_match:
-                            inherits = extends_match.group(1)
-                    
-                    if 'implements' in line:
-                        implements_match = re.search(r'implements\s+([^{]+)', line)
-                        if implements_match:
-                            impl_text = implements_match.group(1).strip()
-                            implements = [iface.strip() for iface in impl_text.split(',')]
-                    
-                    classes.append({
-                        'language': 'javascript',
-                        'file': file_path,
-                        'name': class_name,
-                        'kind': kind,
-                        'inherits': inherits,
-                        'implements': implements,
-                        'line_start': i + 1,
-                        'line_end': i + 1,
-                        'doc': None
-                    })
+        for i, position, match in scan_first(index, self.CLASS_PATTERNS):
+            class_name = match.group(1)
+            kind = self.CLASS_KINDS[position]
+            line = index.line(i)
+            
+            # Extract inheritance
+            inherits = None
+            implements = []
+            
+            if 'extends' in line:
+                extends_match = EXTENDS_PATTERN.search(line)
+                if extends_match:
+                    inherits = extends_match.group(1)
+            
+            if 'implements' in line:
+                implements_match = IMPLEMENTS_PATTERN.search(line)
+                if implements_match:
+                    impl_text = implements_match.group(1).strip()
+                    implements = [iface.strip() for iface in impl_text.split(',')]
+            
+            classes.append(Class(
+                language='javascript',
+                file=file_path,
+                name=class_name,
+                kind=kind,
+                inherits=inherits,
+                implements=implements,
+                line_start=i + 1,
+                line_end=i + 1,
+                doc=None
+            ))
         
-        return classes
\ No newline at end of file
+        return classes
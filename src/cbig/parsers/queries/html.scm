@@ -0,0 +1,6 @@
+; HTML extraction query; HTMLParser handles these captures itself.
+
+[(start_tag) (self_closing_tag)] @tag
+(style_element (raw_text) @style)
+(script_element (raw_text) @script)
+(comment) @comment
@@ -0,0 +1,21 @@
+; Java extraction query; see TreeSitterParser for the capture names.
+
+(package_declaration [(scoped_identifier) (identifier)] @dependency)
+(import_declaration [(scoped_identifier) (identifier)] @dependency)
+
+(method_declaration name: (identifier) @name body: (_)? @body) @function
+(constructor_declaration name: (identifier) @name body: (_) @body) @function
+
+(class_declaration name: (identifier) @name) @class.class
+(interface_declaration name: (identifier) @name) @class.interface
+(enum_declaration name: (identifier) @name) @class.enum
+(annotation_type_declaration name: (identifier) @name) @class.annotation
+(record_declaration name: (identifier) @name) @class.record
+
+; Javadoc directly above a declaration
+((block_comment) @doc
+  .
+  (_) @doc.target
+  (#match? @doc "^/\\*\\*"))
+
+[(line_comment) (block_comment)] @comment
@@ -0,0 +1,15 @@
+; Python extraction query; see TreeSitterParser for the capture names.
+
+(import_statement name: (dotted_name) @dependency)
+(import_from_statement) @dependency
+
+(function_definition name: (identifier) @name parameters: (parameters) @parameters) @function
+(class_definition name: (identifier) @name superclasses: (argument_list)? @superclasses) @class.class
+
+; The first string statement of a body is its docstring
+(function_definition
+  body: (block (expression_statement (string) @doc))) @doc.target
+(class_definition
+  body: (block (expression_statement (string) @doc))) @doc.target
+
+(comment) @comment
@@ -0,0 +1,18 @@
+; Rust extraction query; see TreeSitterParser for the capture names.
+
+(use_declaration argument: (_) @dependency)
+(extern_crate_declaration name: (identifier) @dependency)
+
+(function_item name: (identifier) @name body: (_) @body) @function
+(function_signature_item name: (identifier) @name) @function
+
+(struct_item name: (type_identifier) @name) @class.struct
+(enum_item name: (type_identifier) @name) @class.enum
+(trait_item name: (type_identifier) @name bounds: (trait_bounds)? @bounds) @class.trait
+(union_item name: (type_identifier) @name) @class.union
+(type_item name: (type_identifier) @name) @class.type
+
+; Methods in an impl block belong to the implementing type
+(impl_item trait: (_)? @trait type: (_) @name) @scope
+
+[(line_comment) (block_comment)] @comment
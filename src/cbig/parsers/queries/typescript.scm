@@ -0,0 +1,32 @@
+; TypeScript and TSX extraction query; see TreeSitterParser for the capture names.
+
+(import_statement source: (string) @dependency)
+(export_statement source: (string) @dependency)
+(call_expression
+  function: (identifier) @require
+  arguments: (arguments . (string) @dependency)
+  (#eq? @require "require"))
+(call_expression
+  function: (import)
+  arguments: (arguments . (string) @dependency))
+
+(function_declaration name: (_) @name body: (_) @body) @function
+(generator_function_declaration name: (_) @name body: (_) @body) @function
+(method_definition name: (_) @name body: (_) @body) @function
+; Kept only when the value is a function
+(variable_declarator name: (_) @name value: (_) @value) @function
+(pair key: (_) @name value: (_) @value) @function
+
+(class_declaration name: (_) @name) @class.class
+(abstract_class_declaration name: (_) @name) @class.class
+(interface_declaration name: (_) @name) @class.interface
+(type_alias_declaration name: (_) @name) @class.type
+(enum_declaration name: (_) @name) @class.enum
+
+; JSDoc directly above a declaration
+((comment) @doc
+  .
+  (_) @doc.target
+  (#match? @doc "^/\\*\\*"))
+
+(comment) @comment
@@ -19,10 +19,18 @@ class ParserRegistry:
     
     def __init__(self):
         self._parsers: Dict[str, BaseParser] = {}
+        # Shared by every language without a specific parser
+        self._generic_parser = GenericParser()
         self._initialize_parsers()
     
     def _initialize_parsers(self):
-        """Initialize all available parsers."""
+        """
+        Initialize all available parsers.
+        
+        Languages mapped to the same class share one instance, so each
+        grammar and query is loaded once. Parsers are shared by all worker
+        threads; tree-sitter backends keep a parser per thread internally.
+        """
         parser_classes = {
             'python': PythonParser,
             'java': JavaParser,
@@ -34,14 +42,17 @@ class ParserRegistry:
             'swift': GenericParser,  # Swift will use generic parser for now
         }
         
+        instances: Dict[type, BaseParser] = {GenericParser: self._generic_parser}
         for language, parser_class in parser_classes.items():
-            try:
-                self._parsers[language] = parser_class()
-                logger.debug(f"Initialized parser for {language}")
-            except Exception as e:
-                logger.warning(f"Failed to initialize parser for {language}: {e}")
-                # Fall back to generic parser
-                self._parsers[language] = GenericParser()
+            if parser_class not in instances:
+                try:
+                    instances[parser_class] = parser_class()
+                    logger.debug(f"Initialized parser for {language}")
+                except Exception as e:
+                    logger.warning(f"Failed to initialize parser for {language}: {e}")
+                    # Fall back to generic parser
+                    instances[parser_class] = self._generic_parser
+            self._parsers[language] = instances[parser_class]
     
     def get_parser(self, language: str) -> Optional[BaseParser]:
         """Get parser for a specific language."""
@@ -49,7 +60,7 @@ class ParserRegistry:
         if not parser:
             # Fall back to generic parser
             logger.debug(f"No specific parser for {language}, using generic parser")
-            return GenericParser()
+            return self._generic_parser
         return parser
     
     def list_supported_languages(self) -> list:
@@ -1,116 +1,214 @@
 """Rust language parser."""
 
-import re
-from typing import Dict, List, Any
-from cbig.parsers.generic_parser import GenericParser
+from typing import Dict, List, Any, Optional
+from cbig.core.models import Dependency, Function, Class
+from cbig.parsers.scanner import LineIndex, compile_patterns, scan_first
+from cbig.parsers.tree_sitter_parser import TreeSitterParser, node_text, clean_block_doc
 
+try:
+    import tree_sitter_rust as tsrust
+    TREE_SITTER_RUST_AVAILABLE = True
+except ImportError:
+    TREE_SITTER_RUST_AVAILABLE = False
 
-class RustParser(GenericParser):
+
+def _type_name(node) -> Optional[str]:
+    """Return a type's name without its type arguments."""
+    if node is None:
+        return None
+    if node.type == 'generic_type':
+        node = node.child_by_field_name('type')
+    return node_text(node)
+
+
+def _root_segments(node) -> List[str]:
+    """Return the first path segment of each path a use declaration imports."""
+    node_type = node.type
+    if node_type in ('scoped_identifier', 'scoped_use_list'):
+        path = node.child_by_field_name('path')
+        if path is not None:
+            return _root_segments(path)
+        if node_type == 'scoped_use_list':
+            return _root_segments(node.child_by_field_name('list'))
+        return []
+    if node_type == 'use_as_clause':
+        return _root_segments(node.child_by_field_name('path'))
+    if node_type == 'use_list':
+        roots = []
+        for child in node.named_children:
+            roots.extend(_root_segments(child))
+        return roots
+    if node_type == 'use_wildcard':
+        return _root_segments(node.named_children[0]) if node.named_children else []
+    return [node_text(node)]
+
+
+class RustParser(TreeSitterParser):
     """Parser for Rust source code."""
     
+    DEPENDENCY_PATTERNS = compile_patterns([
+        r'use[^\S\n]+([a-zA-Z_][a-zA-Z0-9_:]*)',
+        r'extern[^\S\n]+crate[^\S\n]+([a-zA-Z_][a-zA-Z0-9_]*)',
+    ])
+    
+    FUNCTION_PATTERNS = compile_patterns([
+        r'^[^\S\n]*+(?:pub[^\S\n]++)?(?:async[^\S\n]++)?fn[^\S\n]++(\w+)[^\S\n]*+\(',
+        r'^[^\S\n]*+(?:pub[^\S\n]++)?(?:unsafe[^\S\n]++)?(?:extern[^\S\n]++)?(?:async[^\S\n]++)?fn[^\S\n]++(\w+)[^\S\n]*+\(',
+    ])
+    
+    CLASS_PATTERNS = compile_patterns([
+        r'^[^\S\n]*+(?:pub[^\S\n]++)?struct[^\S\n]++(\w+)',
+        r'^[^\S\n]*+(?:pub[^\S\n]++)?enum[^\S\n]++(\w+)',
+        r'^[^\S\n]*+(?:pub[^\S\n]++)?trait[^\S\n]++(\w+)',
+        r'^[^\S\n]*+(?:pub[^\S\n]++)?union[^\S\n]++(\w+)',
+        r'^[^\S\n]*+(?:pub[^\S\n]++)?type[^\S\n]++(\w+)'
+    ])
+    CLASS_KINDS = ('struct', 'enum', 'trait', 'union', 'type')
+    
     def __init__(self):
-        super().__init__("rust")
+        super().__init__("rust", tsrust.language if TREE_SITTER_RUST_AVAILABLE else None)
+    
+    def _dependencies_ts(self, node, captures: Dict[str, List]) -> List[Dependency]:
+        """Build the root crate dependencies of a use or extern crate declaration."""
+        return [self._dependency(root, 'cargo') for root in _root_segments(node)]
+    
+    def _class_ts(self, node, file_path: str, kind: str,
+                  captures: Dict[str, List], docs: Dict) -> Optional[Class]:
+        """Build a class entry from a struct, enum, trait, union or type alias."""
+        if kind == 'type' and node.parent is not None and node.parent.type == 'declaration_list':
+            # Associated types of impl blocks are not standalone types
+            return None
+        
+        implements = []
+        bounds = self._capture(captures, 'bounds')
+        if bounds is not None:
+            # Supertraits
+            implements = [node_text(bound) for bound in bounds.named_children]
+        
+        name = node_text(self._capture(captures, 'name'))
+        return self._class(node, file_path, name, kind, None, implements, self._doc(node, docs))
+    
+    def _scope_ts(self, node, captures: Dict[str, List]) -> Optional[str]:
+        """Methods in an impl block belong to the implementing type."""
+        return _type_name(self._capture(captures, 'name'))
+    
+    def _finish_ts(self, result: Dict[str, Any], scopes: List):
+        """List each trait implemented by an `impl Trait for Type` block on the type."""
+        types = {}
+        for cls in result['classes']:
+            types.setdefault(cls.name, cls)
+        
+        for _, captures in scopes:
+            trait = _type_name(self._capture(captures, 'trait'))
+            cls = types.get(_type_name(self._capture(captures, 'name')))
+            if trait and cls is not None and trait not in cls.implements:
+                cls.implements.append(trait)
     
-    def extract_dependencies(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def _doc(self, node, docs: Dict) -> Optional[str]:
+        """
+        Return the outer doc comment (/// or /** */) above an item, looking past attributes.
+        
+        A /// doc spans one node per line, so it is read from the item's
+        siblings rather than from @doc captures.
+        """
+        lines = []
+        previous = node.prev_sibling
+        while previous is not None and previous.type == 'attribute_item':
+            previous = previous.prev_sibling
+        
+        while previous is not None and previous.type == 'line_comment':
+            text = node_text(previous)
+            if not text.startswith('///') or text.startswith('////'):
+                break
+            lines.append(text[3:].strip())
+            previous = previous.prev_sibling
+        
+        if lines:
+            return '\n'.join(reversed(lines))
+        if previous is not None and previous.type == 'block_comment':
+            text = node_text(previous)
+            if text.startswith('/**') and text != '/**/':
+                return clean_block_doc(text)
+        return None
+    
+    def extract_dependencies(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Dependency]:
         """Extract Rust use statements and external crates."""
+        if index is None:
+            index = LineIndex(content)
         dependencies = []
         
-        patterns = [
-            r'use\s+([a-zA-Z_][a-zA-Z0-9_:]*)',
-            r'extern\s+crate\s+([a-zA-Z_][a-zA-Z0-9_]*)',
-        ]
-        
-        for line in content.splitlines():
-            line = line.strip()
-            for pattern in patterns:
-                match = re.search(pattern, line)
-                if match:
-                    dep_name = match.group(1)
-                    # Extract root crate name
-                    root_crate = dep_name.split('::')[0]
-                    dependencies.append({
-                        'language': 'rust',
-                        'name': root_crate,
-                        'version': None,
-                        'source': 'cargo'
-                    })
+        for _, _, match in scan_first(index, self.DEPENDENCY_PATTERNS):
+            dep_name = match.group(1)
+            # Extract root crate name
+            root_crate = dep_name.split('::')[0]
+            dependencies.append(Dependency(
+                language='rust',
+                name=root_crate,
+                version=None,
+                source='cargo'
+            ))
         
         return dependencies
     
-    def extract_functions(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_functions(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Function]:
         """Extract Rust function definitions."""
         functions = []
-        lines = content.splitlines()
+        if index is None:
+            index = LineIndex(content)
         
-        patterns = [
-            r'^\s*(?:pub\s+)?(?:async\s+)?fn\s+(\w+)\s*\(',
-            r'^\s*(?:pub\s+)?(?:unsafe\s+)?(?:extern\s+)?(?:async\s+)?fn\s+(\w+)\s*\(',
-        ]
-        
-        for i, line in enumerate(lines):
-            for pattern in patterns:
-                match = re.search(pattern, line)
-                if match:
-                    func_name = match.group(1)
-                    
-                    signature = line.strip()
-                    if len(signature) > 100:
-                        signature = signature[:97] + "..."
-                    
-                    functions.append({
-                        'language': 'rust',
-                        'file': file_path,
-                        'name': func_name,
-                        'signature': signature,
-                        'line_start': i + 1,
-                        'line_end': i + 1,
-                        'docstring': None,
-                        'is_method': False,
-                        'class_name': None
-                    })
+        for i, _, match in scan_first(index, self.FUNCTION_PATTERNS):
+            func_name = match.group(1)
+            
+            signature = index.line(i).strip()
+            if len(signature) > 100:
+                signature = signature[:97] + "..."
+            
+            functions.append(Function(
+                language='rust',
+                file=file_path,
+                name=func_name,
+                signature=signature,
+                line_start=i + 1,
+                line_end=i + 1,
+                docstring=None,
+                is_method=False,
+                class_name=None
+            ))
         
         return functions
     
-    def extract_classes(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+    def extract_classes(self, content: str, file_path: str, index: Optional[LineIndex] = None) -> List[Class]:
         """Extract Rust struct, enum, and trait definitions."""
         classes = []
-        lines = content.splitlines()
-        
-        patterns = [
-            (r'^\s*(?:pub\s+)?struct\s+(\w+)', 'struct'),
-            (r'^\s*(?:pub\s+)?enum\s+(\w+)', 'enum'),
-            (r'^\s*(?:pub\s+)?trait\s+(\w+)', 'trait'),
-            (r'^\s*(?:pub\s+)?union\s+(\w+)', 'union'),
-            (r'^\s*(?:pub\s+)?type\s+(\w+)', 'type')
-        ]
+        if index is None:
+            index = LineIndex(content)
         
-        for i, line in enumerate(lines):
-            for pattern, kind in patterns:
-                match = re.search(pattern, line)
-                if match:
-                    item_name = match.group(1)
-                    
-                    # Extract trait bounds or inheritance-like info
-                    inherits = None
-                    implements = []
-                    
-                    if ':' in line and kind in ['struct', 'enum']:
-                        # Look for trait implementations
-                        colon_part = line.split(':', 1)[1].split('{')[0].strip()
-                        if colon_part:
-                            traits = [t.strip() for t in colon_part.split('+')]
-                            implements = traits
-                    
-                    classes.append({
-                        'language': 'rust',
-                        'file': file_path,
-                        'name': item_name,
-                        'kind': kind,
-                        'inherits': inherits,
-                        'implements': implements,
-                        'line_start': i + 1,
-                        'line_end': i + 1,
-                        'doc': None
-                    })
+        for i, position, match in scan_first(index, self.CLASS_PATTERNS):
+            item_name = match.group(1)
+            kind = self.CLASS_KINDS[position]
+            line = index.line(i)
+            
+            # Extract trait bounds or inheritance-like info
+            inherits = None
+            implements = []
+            
+            if ':' in line and kind in ['struct', 'enum']:
+                # Look for trait implementations
+                colon_part = line.split(':', 1)[1].split('{')[0].strip()
+                if colon_part:
+                    traits = [t.strip() for t in colon_part.split('+')]
+                    implements = traits
+            
+            classes.append(Class(
+                language='rust',
+                file=file_path,
+                name=item_name,
+                kind=kind,
+                inherits=inherits,
+                implements=implements,
+                line_start=i + 1,
+                line_end=i + 1,
+                doc=None
+            ))
         
-        return classes
\ No newline at end of file
+        return classes
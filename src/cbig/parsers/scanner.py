@@ -0,0 +1,98 @@
+"""Whole-file regex scanning helpers for the line-oriented regex parsers."""
+
+import re
+from bisect import bisect_right
+from typing import Iterator, List, Sequence, Tuple, Pattern
+
+# Line boundaries recognized by str.splitlines() besides "\n"
+_OTHER_LINE_BREAKS = re.compile('[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+
+def compile_patterns(patterns: Sequence[str], flags: int = 0) -> List[Pattern]:
+    """
+    Compile line patterns for scanning a whole file.
+
+    Patterns must not match across a newline: use [^\\S\\n] rather than \\s
+    for whitespace and exclude "\\n" from negated classes. A leading ^ is
+    turned into a literal "\\n", which the regex engine can skip to directly
+    instead of testing every position for a line start; LineIndex text
+    starts with a "\\n" so the first line matches too.
+    """
+    compiled = []
+    for pattern in patterns:
+        if pattern.startswith('^'):
+            pattern = '\n' + pattern[1:]
+        compiled.append(re.compile(pattern, flags))
+    return compiled
+
+
+class LineIndex:
+    """
+    A file's lines as one "\\n"-joined string plus the offset of each line.
+
+    Lines are exactly those of content.splitlines(), so line numbers match
+    a per-line loop. The text starts with a sentinel "\\n" (see
+    compile_patterns). Offsets map to lines by bisecting the line starts.
+    """
+
+    __slots__ = ("text", "starts")
+
+    def __init__(self, content: str):
+        if _OTHER_LINE_BREAKS.search(content):
+            content = '\n'.join(content.splitlines())
+        self.text = '\n' + content
+        self.starts = []
+        find = self.text.find
+        pos = 0
+        while pos != -1:
+            self.starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+
+    def line_of(self, offset: int) -> int:
+        """Return the 0-based line holding a character offset."""
+        return bisect_right(self.starts, offset) - 1
+
+    def line_of_match(self, match: re.Match) -> int:
+        """Return the 0-based line of a match; anchored matches start at the preceding newline."""
+        return self.line_of(match.end())
+
+    def line(self, line_no: int) -> str:
+        """Return the text of a 0-based line, without its newline."""
+        start = self.starts[line_no]
+        if line_no + 1 < len(self.starts):
+            return self.text[start:self.starts[line_no + 1] - 1]
+        return self.text[start:]
+
+
+def scan_first(index: LineIndex, patterns: Sequence[Pattern]) -> Iterator[Tuple[int, int, re.Match]]:
+    """
+    Yield (line, pattern position, match) for the first match of each pattern on each line.
+
+    Equivalent to calling pattern.search(line) for every line and every
+    pattern, in line order then pattern order, but each pattern runs once
+    over the whole file.
+    """
+    hits = []
+    for position, pattern in enumerate(patterns):
+        last_line = -1
+        for match in pattern.finditer(index.text):
+            line_no = index.line_of_match(match)
+            if line_no != last_line:
+                hits.append((line_no, position, match))
+                last_line = line_no
+    hits.sort(key=lambda hit: (hit[0], hit[1]))
+    return iter(hits)
+
+
+def scan_all(index: LineIndex, patterns: Sequence[Pattern]) -> Iterator[Tuple[int, int, re.Match]]:
+    """
+    Yield (line, pattern position, match) for every match, as per-line findall would.
+
+    Matches come in line order, then pattern order, then position.
+    """
+    hits = []
+    for position, pattern in enumerate(patterns):
+        for match in pattern.finditer(index.text):
+            hits.append((index.line_of_match(match), position, match.start(), match))
+    hits.sort(key=lambda hit: hit[:3])
+    return ((line_no, position, match) for line_no, position, _, match in hits)
@@ -0,0 +1,447 @@
+"""Tree-sitter backend shared by the language parsers."""
+
+import re
+import threading
+from importlib import resources
+from typing import Dict, List, Any, Callable, Optional, Tuple, Union
+import logging
+
+try:
+    import tree_sitter
+    TREE_SITTER_AVAILABLE = True
+except ImportError:
+    TREE_SITTER_AVAILABLE = False
+
+from cbig.core.models import Dependency, Function, Class, Comment
+from cbig.parsers.base import decode_source, normalize_newlines
+from cbig.parsers.generic_parser import GenericParser
+
+logger = logging.getLogger(__name__)
+
+MAX_SIGNATURE_LENGTH = 100
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Capture names that make a query match a reported construct; "class.<kind>" reports a class
+DEPENDENCY = 'dependency'
+FUNCTION = 'function'
+SCOPE = 'scope'
+COMMENT = 'comment'
+CLASS_PREFIX = 'class.'
+
+# A doc comment or docstring and the definition it documents
+DOC = 'doc'
+DOC_TARGET = 'doc.target'
+
+
+def node_text(node) -> str:
+    """Return the source text of a node, dropping invalid UTF-8 as decode_source does."""
+    return node.text.decode('utf-8', errors='ignore')
+
+
+def line_start(node) -> int:
+    """Return the 1-based line a node starts on."""
+    return node.start_point[0] + 1
+
+
+def line_end(node) -> int:
+    """Return the 1-based line a node ends on, ignoring a trailing newline it includes."""
+    row, column = node.end_point
+    if column == 0 and row > node.start_point[0]:
+        row -= 1
+    return row + 1
+
+
+def clean_block_doc(text: str) -> str:
+    """Strip the /** */ delimiters and leading asterisks from a doc comment."""
+    text = text[3:-2] if text.endswith('*/') else text[3:]
+    lines = [line.strip() for line in text.splitlines()]
+    lines = [line[1:].strip() if line.startswith('*') else line for line in lines]
+    return '\n'.join(lines).strip()
+
+
+def compile_query(language: "tree_sitter.Language", source: str) -> "tree_sitter.Query":
+    """Compile a query; tree-sitter 0.25 replaced Language.query() with the Query constructor."""
+    if hasattr(tree_sitter, 'QueryCursor'):
+        return tree_sitter.Query(language, source)
+    return language.query(source)
+
+
+def query_matches(query: "tree_sitter.Query", node) -> List[Tuple[int, Dict[str, List]]]:
+    """
+    Run a query over a node and return (pattern index, {capture name: [nodes]}) per match.
+
+    tree-sitter 0.25 moved execution to QueryCursor; earlier versions run on
+    the Query itself and may return single nodes instead of lists.
+    """
+    if hasattr(tree_sitter, 'QueryCursor'):
+        return tree_sitter.QueryCursor(query).matches(node)
+    return [
+        (index, {name: nodes if isinstance(nodes, list) else [nodes] for name, nodes in captures.items()})
+        for index, captures in query.matches(node)
+    ]
+
+
+def read_query(name: str) -> str:
+    """Return the source of queries/<name>.scm."""
+    return resources.files('cbig.parsers').joinpath('queries', f'{name}.scm').read_text(encoding='utf-8')
+
+
+class Grammar:
+    """
+    A tree-sitter language with its extraction query.
+
+    A tree_sitter.Parser holds per-parse state and must not be shared
+    between threads, so each thread that parses gets its own parser on first
+    use and reuses it for every later file. The compiled query is shared,
+    since each run gets a fresh QueryCursor; before tree-sitter 0.25 the
+    query carried its own cursor and is compiled per thread as well.
+    """
+
+    __slots__ = ("language", "_query_source", "_query", "_local")
+
+    def __init__(self, language_factory: Callable[[], Any], query_name: str):
+        self.language = tree_sitter.Language(language_factory())
+        self._query_source = read_query(query_name)
+        self._query = compile_query(self.language, self._query_source)
+        self._local = threading.local()
+
+    @property
+    def parser(self) -> "tree_sitter.Parser":
+        """This thread's parser."""
+        parser = getattr(self._local, 'parser', None)
+        if parser is None:
+            parser = self._local.parser = tree_sitter.Parser(self.language)
+        return parser
+
+    @property
+    def query(self) -> "tree_sitter.Query":
+        """The extraction query, safe to run from this thread."""
+        if hasattr(tree_sitter, 'QueryCursor'):
+            return self._query
+        query = getattr(self._local, 'query', None)
+        if query is None:
+            query = self._local.query = compile_query(self.language, self._query_source)
+        return query
+
+    def parse(self, data: Union[bytes, memoryview]):
+        return self.parser.parse(data)
+
+    def matches(self, node) -> List[Tuple[int, Dict[str, List]]]:
+        return query_matches(self.query, node)
+
+
+class TreeSitterParser(GenericParser):
+    """
+    GenericParser with a Tree-sitter backend driven by a query file.
+
+    queries/<language>.scm captures what to report and the C query engine
+    finds it: @dependency, @function, @class.<kind>, @scope (not reported,
+    but names the functions inside it) and @comment nodes, with helper
+    captures such as @name and @body in the same pattern. @doc/@doc.target
+    pairs attach doc comments and docstrings to definitions. The _*_ts
+    hooks turn captured nodes into entries; subclasses override them where
+    a language needs more than the captures. When the grammar is missing
+    or a parse fails, the regex extractors of the subclass are used instead.
+    """
+
+    # Parent node types to look through when finding a definition's doc comment
+    DOC_WRAPPERS = frozenset()
+
+    # Comments with this prefix on consecutive lines form one block
+    LINE_COMMENT_PREFIX = '//'
+
+    def __init__(self, language: str, language_factory: Optional[Callable[[], Any]] = None,
+                 query_name: Optional[str] = None):
+        super().__init__(language)
+        self.grammar = self._load_grammar(language_factory, query_name or language)
+        self.tree_sitter_enabled = self.grammar is not None
+        if not self.tree_sitter_enabled:
+            logger.warning(f"Tree-sitter not available for {language}, falling back to regex parsing")
+
+    def _load_grammar(self, language_factory: Optional[Callable[[], Any]], query_name: str) -> Optional[Grammar]:
+        """Build a Grammar, or None if tree-sitter, the grammar or its query is unusable."""
+        if not TREE_SITTER_AVAILABLE or language_factory is None:
+            return None
+        try:
+            grammar = Grammar(language_factory, query_name)
+            logger.debug(f"Tree-sitter {query_name} parser initialized")
+            return grammar
+        except Exception as e:
+            logger.warning(f"Failed to initialize Tree-sitter {query_name} parser: {e}")
+            return None
+
+    def get_version(self) -> str:
+        # Tree-sitter and regex extraction give different results
+        return f"{self.version}+{self._backend()}"
+
+    def _backend(self) -> str:
+        return "tree-sitter" if self.tree_sitter_enabled else "regex"
+
+    def _select_grammar(self, file_path: str) -> Optional[Grammar]:
+        """Return the grammar for a file, or None to use regex extraction."""
+        return self.grammar
+
+    def parse(self, content: str, file_path: str) -> Dict[str, Any]:
+        """Parse source code, with Tree-sitter when a grammar is available."""
+        grammar = self._select_grammar(file_path) if self.tree_sitter_enabled else None
+        if grammar is not None:
+            return self._parse_with_tree_sitter(grammar, content.encode('utf-8'), file_path)
+        else:
+            return self._parse_with_regex(content, file_path)
+
+    def parse_bytes(self, data: Union[bytes, memoryview], file_path: str) -> Dict[str, Any]:
+        """Parse raw bytes; Tree-sitter reads them directly and only extracted text is decoded."""
+        grammar = self._select_grammar(file_path) if self.tree_sitter_enabled else None
+        if grammar is not None:
+            return self._parse_with_tree_sitter(grammar, normalize_newlines(data), file_path)
+        else:
+            return self._parse_with_regex(decode_source(data), file_path)
+
+    def _parse_with_tree_sitter(self, grammar: Grammar, data: Union[bytes, memoryview], file_path: str) -> Dict[str, Any]:
+        """Parse using Tree-sitter for accurate AST parsing."""
+        try:
+            tree = grammar.parse(data)
+            return self._extract_ts(grammar, tree, file_path)
+        except Exception as e:
+            logger.error(f"Tree-sitter parsing failed for {file_path}: {e}")
+            return self._parse_with_regex(decode_source(data), file_path)
+
+    def _parse_with_regex(self, content: str, file_path: str) -> Dict[str, Any]:
+        """Fallback line-based regex parsing."""
+        return super().parse(content, file_path)
+
+    def _extract_ts(self, grammar: Grammar, tree, file_path: str) -> Dict[str, Any]:
+        """
+        Extract dependencies, functions, classes and comments from the query matches.
+
+        Matches are visited in document order, outer before inner. Functions
+        nested inside a reported function are not reported; methods carry
+        the name of their innermost enclosing class or scope.
+        """
+        dependencies = []
+        functions = []
+        classes = []
+        comment_nodes = []
+        scopes = []
+
+        captured, docs = self._collect_matches(grammar, tree)
+
+        # Enclosing scopes as (end byte, name) and the end of the enclosing reported function
+        class_stack = []
+        function_end = -1
+
+        for start, _, _, role, node, captures in captured:
+            while class_stack and class_stack[-1][0] <= start:
+                class_stack.pop()
+
+            if role == DEPENDENCY:
+                dependencies.extend(self._dependencies_ts(node, captures))
+            elif role == COMMENT:
+                comment_nodes.append(node)
+            elif role == FUNCTION:
+                if start >= function_end:
+                    class_name = class_stack[-1][1] if class_stack else None
+                    function = self._function_ts(node, file_path, class_name, captures, docs)
+                    if function:
+                        functions.append(function)
+                        function_end = node.end_byte
+            elif role == SCOPE:
+                scopes.append((node, captures))
+                scope_name = self._scope_ts(node, captures)
+                if scope_name:
+                    class_stack.append((node.end_byte, scope_name))
+            else:
+                cls = self._class_ts(node, file_path, role, captures, docs)
+                if cls:
+                    classes.append(cls)
+                    class_stack.append((node.end_byte, cls.name))
+
+        result = {
+            'dependencies': dependencies,
+            'functions': functions,
+            'classes': classes,
+            'comments': self._comment_blocks(comment_nodes, file_path)
+        }
+        self._finish_ts(result, scopes)
+        return result
+
+    def _collect_matches(self, grammar: Grammar, tree):
+        """
+        Run the grammar's query and split the matches into reported constructs and docs.
+
+        Returns the constructs as (start, -end, order, role, node, captures)
+        sorted into document order, outer nodes first, and the first doc
+        node of each target keyed by node id.
+        """
+        captured = []
+        docs = {}
+        for order, (_, captures) in enumerate(grammar.matches(tree.root_node)):
+            targets = captures.get(DOC_TARGET)
+            if targets:
+                doc = captures[DOC][0]
+                known = docs.get(targets[0].id)
+                if known is None or doc.start_byte < known.start_byte:
+                    docs[targets[0].id] = doc
+                continue
+
+            for name, nodes in captures.items():
+                if name in (DEPENDENCY, FUNCTION, SCOPE, COMMENT):
+                    role = name
+                elif name.startswith(CLASS_PREFIX):
+                    role = name[len(CLASS_PREFIX):]
+                else:
+                    continue
+                for node in nodes:
+                    captured.append((node.start_byte, -node.end_byte, order, role, node, captures))
+                break
+
+        captured.sort(key=lambda item: item[:3])
+        return captured, docs
+
+    def _capture(self, captures: Dict[str, List], name: str):
+        """Return the first node of a capture, or None."""
+        nodes = captures.get(name)
+        return nodes[0] if nodes else None
+
+    def _dependencies_ts(self, node, captures: Dict[str, List]) -> List[Dependency]:
+        """Build the dependencies named by a @dependency node."""
+        return [self._dependency(node_text(node), None)]
+
+    def _function_ts(self, node, file_path: str, class_name: Optional[str],
+                     captures: Dict[str, List], docs: Dict) -> Optional[Function]:
+        """Build a function entry from a @function node and its @name and @body."""
+        name_node = self._capture(captures, 'name')
+        if name_node is None:
+            return None
+        signature = self._signature(node, self._capture(captures, 'body'))
+        return self._function(node, file_path, node_text(name_node), signature, class_name, self._doc(node, docs))
+
+    def _class_ts(self, node, file_path: str, kind: str,
+                  captures: Dict[str, List], docs: Dict) -> Optional[Class]:
+        """Build a class entry from a @class.<kind> node and its @name."""
+        name_node = self._capture(captures, 'name')
+        if name_node is None:
+            return None
+        return self._class(node, file_path, node_text(name_node), kind, None, [], self._doc(node, docs))
+
+    def _scope_ts(self, node, captures: Dict[str, List]) -> Optional[str]:
+        """Return the class name a @scope node gives the functions inside it."""
+        name_node = self._capture(captures, 'name')
+        return node_text(name_node) if name_node is not None else None
+
+    def _finish_ts(self, result: Dict[str, Any], scopes: List):
+        """Adjust the result once every match has been seen."""
+        pass
+
+    def _doc(self, node, docs: Dict) -> Optional[str]:
+        """Return the doc comment of a definition, looking through DOC_WRAPPERS parents."""
+        target = node
+        while True:
+            doc = docs.get(target.id)
+            if doc is not None:
+                return self._doc_text(doc, target)
+            parent = target.parent
+            if parent is None or parent.type not in self.DOC_WRAPPERS:
+                return None
+            target = parent
+
+    def _doc_text(self, doc, target) -> Optional[str]:
+        """Return the text of a /** */ comment that ends right above its target."""
+        if doc.end_point[0] < target.start_point[0] - 1:
+            return None
+        text = node_text(doc)
+        if text == '/**/':
+            return None
+        return clean_block_doc(text)
+
+    def _dependency(self, name: str, source: Optional[str]) -> Dependency:
+        return Dependency(
+            language=self.language,
+            name=name,
+            version=None,
+            source=source
+        )
+
+    def _function(self, node, file_path: str, name: str, signature: str,
+                  class_name: Optional[str], docstring: Optional[str]) -> Function:
+        return Function(
+            language=self.language,
+            file=file_path,
+            name=name,
+            signature=signature,
+            line_start=line_start(node),
+            line_end=line_end(node),
+            docstring=docstring,
+            is_method=class_name is not None,
+            class_name=class_name
+        )
+
+    def _class(self, node, file_path: str, name: str, kind: str, inherits: Optional[str],
+               implements: List[str], doc: Optional[str]) -> Class:
+        return Class(
+            language=self.language,
+            file=file_path,
+            name=name,
+            kind=kind,
+            inherits=inherits,
+            implements=implements,
+            line_start=line_start(node),
+            line_end=line_end(node),
+            doc=doc
+        )
+
+    def _signature(self, node, body=None, start_byte: Optional[int] = None) -> str:
+        """Return a declaration's text up to its body, on one line and truncated like the regex path."""
+        start = node.start_byte if start_byte is None else start_byte
+        end = body.start_byte if body is not None else node.end_byte
+        text = node.text[start - node.start_byte:end - node.start_byte]
+        signature = _WHITESPACE.sub(' ', text.decode('utf-8', errors='ignore')).strip()
+        if body is None:
+            signature = signature.rstrip(';').rstrip()
+        if len(signature) > MAX_SIGNATURE_LENGTH:
+            signature = signature[:MAX_SIGNATURE_LENGTH - 3] + "..."
+        return signature
+
+    def _comment_blocks(self, nodes: List, file_path: str) -> List[Comment]:
+        """
+        Build comment entries from comment nodes in document order.
+
+        Line comments on consecutive lines are joined into one block.
+        Like the regex path, only blocks spanning two or more lines are kept.
+        """
+        comments = []
+        block_lines = []
+        block_start = block_end = 0
+        block_is_line = False
+
+        for node in nodes:
+            text = node_text(node).strip()
+            start, end = line_start(node), line_end(node)
+            is_line = bool(self.LINE_COMMENT_PREFIX) and text.startswith(self.LINE_COMMENT_PREFIX)
+
+            if block_lines and is_line and block_is_line and start == block_end + 1:
+                block_lines.append(text)
+                block_end = end
+                continue
+
+            if block_lines:
+                self._save_ts_comment(comments, block_lines, block_start, block_end, file_path)
+            block_lines = [line.strip() for line in text.splitlines()]
+            block_start, block_end = start, end
+            block_is_line = is_line
+
+        if block_lines:
+            self._save_ts_comment(comments, block_lines, block_start, block_end, file_path)
+
+        return comments
+
+    def _save_ts_comment(self, comments: List, lines: List[str], start: int, end: int, file_path: str):
+        if end > start:
+            comments.append(Comment(
+                language=self.language,
+                file=file_path,
+                line_start=start,
+                line_end=end,
+                text='\n'.join(lines)
+            ))